@@ -4,8 +4,10 @@ AI Agent module for expense tracking.
 
 from .expenses_agent import parse_expense
 from .analytics_agent import generate_analytics
+from .fused_agent import parse_message
 
 __all__ = [
     'parse_expense',
-    'generate_analytics'
+    'generate_analytics',
+    'parse_message'
 ]
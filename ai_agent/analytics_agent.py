@@ -1,28 +1,27 @@
 """
 Module for generating expense analytics using LangChain and OpenAI gpt-4o-mini.
 """
+import asyncio
 import json
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any, Literal
 
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 
-from db.database import get_db_session
+from db.database import session_scope
 from db.queries import (
     get_expenses_by_category, 
-    get_total_expenses, 
-    get_expenses_by_period,
-    get_budget_limit,
-    get_remaining_budget,
-    check_budget_limit,
-    get_all_limits,
-    get_expense_sum_by_category
+    get_category_totals,
+    get_budget_status
 )
-from config import EXPENSE_CATEGORIES, AUTHOR_USER_ID, OPENAI_API_KEY
+from db import async_queries
+from config import EXPENSE_CATEGORIES, AUTHOR_USER_ID, OPENAI_API_KEY, DB_ASYNC_ENABLED
+from tools.llm_cache import stage_cache
+from tools.openai_clients import get_chat_model
+from tools.tracing import span
 
 # Logging configuration
 logging.basicConfig(
@@ -32,11 +31,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Create the LLM
-llm = ChatOpenAI(
-    model="gpt-4o-mini",
-    temperature=0.0,
-    api_key=OPENAI_API_KEY
-)
+llm = get_chat_model("gpt-4o-mini", temperature=0.0)
 
 def _get_period_from_text(text: str) -> Tuple[datetime, Optional[datetime]]:
     """
@@ -129,7 +124,7 @@ category_prompt = ChatPromptTemplate.from_messages([
 # Create the chain for category extraction
 category_chain = category_prompt | llm | category_parser
 
-def _extract_category_from_text(text: str) -> Optional[str]:
+async def _extract_category_from_text(text: str) -> Optional[str]:
     """
     Uses LangChain to determine category from query text.
     
@@ -142,12 +137,17 @@ def _extract_category_from_text(text: str) -> Optional[str]:
     if not OPENAI_API_KEY:
         return None
     
+    cached = await stage_cache.get("analytics_category", text, llm.model_name, category_template)
+    if cached is not None:
+        # An empty string marks a query without a category
+        return cached or None
+    
     try:
         # Log the request
         logger.info(f"Sending request to LangChain for category extraction: '{text}'")
         
         # Run the chain
-        result = category_chain.invoke({"message": text})
+        result = await category_chain.ainvoke({"message": text})
         
         # Log the result
         logger.info(f"LangChain category response: {result}")
@@ -155,7 +155,9 @@ def _extract_category_from_text(text: str) -> Optional[str]:
         # Extract and validate the category
         category = result.get("category")
         if category in EXPENSE_CATEGORIES:
+            await stage_cache.set("analytics_category", text, llm.model_name, category_template, category)
             return category
+        await stage_cache.set("analytics_category", text, llm.model_name, category_template, "")
         
     except Exception as e:
         logger.error(f"Error determining category from LangChain: {e}")
@@ -230,7 +232,7 @@ analytics_type_prompt = ChatPromptTemplate.from_messages([
 # Create the chain for analytics type extraction
 analytics_type_chain = analytics_type_prompt | llm | analytics_type_parser
 
-def _extract_analytics_type(text: str) -> str:
+async def _extract_analytics_type(text: str) -> str:
     """
     Uses LangChain to determine analytics type from query text.
     
@@ -243,12 +245,16 @@ def _extract_analytics_type(text: str) -> str:
     if not OPENAI_API_KEY:
         return "summary"
     
+    cached = await stage_cache.get("analytics_type", text, llm.model_name, analytics_type_template)
+    if cached is not None:
+        return cached
+    
     try:
         # Log the request
         logger.info(f"Sending request to LangChain for analytics type extraction: '{text}'")
         
         # Run the chain
-        result = analytics_type_chain.invoke({"message": text})
+        result = await analytics_type_chain.ainvoke({"message": text})
         
         # Log the result
         logger.info(f"LangChain analytics type response: {result}")
@@ -256,6 +262,7 @@ def _extract_analytics_type(text: str) -> str:
         # Extract and validate the analytics type
         analytics_type = result.get("type")
         if analytics_type in ["category", "limit", "summary"]:
+            await stage_cache.set("analytics_type", text, llm.model_name, analytics_type_template, analytics_type)
             return analytics_type
         
     except Exception as e:
@@ -263,89 +270,193 @@ def _extract_analytics_type(text: str) -> str:
     
     return "summary"
 
-def generate_analytics(message: str) -> str:
+async def generate_analytics(
+    message: str,
+    analytics_type: Optional[str] = None,
+    category: Optional[str] = None,
+    period_hint: Optional[str] = None
+) -> str:
     """
     Generate expense analytics based on message.
     
     Args:
         message: Message text with analytics request
+        analytics_type: Already extracted analytics type (skips the LLM extraction of type and category)
+        category: Already extracted category, used together with analytics_type
+        period_hint: Period phrase in English (e.g. "last month") used instead of the message text
         
     Returns:
         Analytics text
     """
     try:
-        db = get_db_session()
+        # 1. Determine period
+        start_date, end_date = _get_period_from_text(period_hint if period_hint is not None else message)
+        period_text = _format_period_text(start_date, end_date)
         
-        try:
-            # 1. Determine period
-            start_date, end_date = _get_period_from_text(message)
-            period_text = _format_period_text(start_date, end_date)
-            
-            # 2. Determine category (if any)
-            category = _extract_category_from_text(message)
-            
-            # 3. Determine analytics type
-            analytics_type = _extract_analytics_type(message)
-            
-            response = ""
-            
-            if analytics_type == "category" and category:
-                # Category-specific analytics
-                expenses = get_expenses_by_category(db, AUTHOR_USER_ID, category, start_date, end_date)
-                total = sum(expense.amount for expense in expenses) if expenses else 0
-                
-                response = f"📊 <b>Витрати на {category} за {period_text}</b>\n\n"
-                
-                if not expenses:
-                    response += f"Не знайдено витрат на {category} за цей період.\n"
-                else:
-                    response += f"Загальна сума: {total:.2f} грн\n"
-                    
-                    # Add individual expenses
-                    for expense in expenses:
-                        response += f"• {expense.amount:.2f} грн - {expense.description}\n"
-            
-            elif analytics_type == "limit":
-                # Budget limit analytics
-                limits = get_all_limits(db, AUTHOR_USER_ID)
-                
-                response = f"💰 <b>Ліміти бюджету за {period_text}</b>\n\n"
-                
-                for budget_limit in limits:
-                    remaining = get_remaining_budget(db, AUTHOR_USER_ID, budget_limit.category)
-                    limit_amount = float(budget_limit.limit_amount)
-                    percentage = (float(remaining) / limit_amount) * 100 if limit_amount > 0 else 0
-                    
-                    response += f"• {budget_limit.category}: {remaining:.2f} грн / {limit_amount:.2f} грн ({percentage:.1f}% залишку)\n"
-            
-            else:
-                # General analytics
-                expenses_by_cat = {}
-                for category in EXPENSE_CATEGORIES:
-                    expenses = get_expenses_by_category(db, AUTHOR_USER_ID, category, start_date, end_date)
-                    if expenses:
-                        expenses_by_cat[category] = sum(expense.amount for expense in expenses)
-                
-                # Calculate total expenses
-                total_expenses = sum(expenses_by_cat.values()) if expenses_by_cat else 0
-                
-                # Form message
-                response = f"📊 <b>Загальна аналітика витрат за {period_text}</b>\n\n"
-                
-                if not expenses_by_cat:
-                    response += "Не знайдено витрат за цей період.\n"
-                else:
-                    # Add category breakdown
-                    for category, amount in expenses_by_cat.items():
-                        percentage = (float(amount) / float(total_expenses)) * 100 if total_expenses > 0 else 0
-                        response += f"• {category}: {amount:.2f} грн ({percentage:.1f}%)\n"
-                    
-                    response += f"\n💰 <b>Загальні витрати</b>: {total_expenses:.2f} грн\n"
-            
-            return response
-        finally:
-            db.close()
+        if analytics_type is None:
+            # 2. Determine category (if any) and 3. analytics type, both requests in flight at once
+            with span("analytics_extract"):
+                category, analytics_type = await asyncio.gather(
+                    _extract_category_from_text(message),
+                    _extract_analytics_type(message)
+                )
+        
+        with span("db_analytics"):
+            if DB_ASYNC_ENABLED:
+                return await _build_analytics_report_async(analytics_type, category, start_date, end_date, period_text)
+            # Synchronous database work runs in a worker thread
+            return await asyncio.to_thread(
+                _build_analytics_report, analytics_type, category, start_date, end_date, period_text
+            )
     
     except Exception as e:
         logger.error(f"Error generating analytics: {e}")
-        return "Вибачте, сталася помилка при генерації аналітики. Спробуйте ще раз." 
\ No newline at end of file
+        return "Вибачте, сталася помилка при генерації аналітики. Спробуйте ще раз."
+
+def _build_analytics_report(
+    analytics_type: str,
+    category: Optional[str],
+    start_date: datetime,
+    end_date: Optional[datetime],
+    period_text: str
+) -> str:
+    """
+    Query the database and format the analytics report (blocking).
+    
+    Args:
+        analytics_type: Analytics type: "category", "limit", "summary"
+        category: Category for category-specific analytics
+        start_date: Start date
+        end_date: End date (optional)
+        period_text: Formatted period text
+        
+    Returns:
+        Analytics text
+    """
+    with session_scope() as db:
+        if analytics_type == "category" and category:
+            expenses = get_expenses_by_category(db, AUTHOR_USER_ID, category, start_date, end_date)
+            return _format_category_report(category, period_text, expenses)
+        
+        if analytics_type == "limit":
+            # Limits and this month's spending in a single query
+            return _format_limit_report(period_text, get_budget_status(db, AUTHOR_USER_ID))
+        
+        # Per-category sums in a single aggregate query
+        return _format_summary_report(period_text, get_category_totals(db, AUTHOR_USER_ID, start_date, end_date))
+
+async def _build_analytics_report_async(
+    analytics_type: str,
+    category: Optional[str],
+    start_date: datetime,
+    end_date: Optional[datetime],
+    period_text: str
+) -> str:
+    """
+    Query the database through the asyncio API and format the analytics report.
+    
+    Args:
+        analytics_type: Analytics type: "category", "limit", "summary"
+        category: Category for category-specific analytics
+        start_date: Start date
+        end_date: End date (optional)
+        period_text: Formatted period text
+        
+    Returns:
+        Analytics text
+    """
+    # Imported lazily: the async engine needs the asyncpg/aiosqlite driver
+    from db.async_database import async_session_scope
+    
+    async with async_session_scope() as db:
+        if analytics_type == "category" and category:
+            expenses = await async_queries.get_expenses_by_category(db, AUTHOR_USER_ID, category, start_date, end_date)
+            return _format_category_report(category, period_text, expenses)
+        
+        if analytics_type == "limit":
+            return _format_limit_report(period_text, await async_queries.get_budget_status(db, AUTHOR_USER_ID))
+        
+        totals = await async_queries.get_category_totals(db, AUTHOR_USER_ID, start_date, end_date)
+        return _format_summary_report(period_text, totals)
+
+def _format_category_report(category: str, period_text: str, expenses: List) -> str:
+    """
+    Format category-specific analytics.
+    
+    Args:
+        category: Expense category
+        period_text: Formatted period text
+        expenses: Expenses of the category in the period
+        
+    Returns:
+        Analytics text
+    """
+    total = sum(expense.amount for expense in expenses) if expenses else 0
+    
+    response = f"📊 <b>Витрати на {category} за {period_text}</b>\n\n"
+    
+    if not expenses:
+        response += f"Не знайдено витрат на {category} за цей період.\n"
+    else:
+        response += f"Загальна сума: {total:.2f} грн\n"
+        
+        # Add individual expenses
+        for expense in expenses:
+            response += f"• {expense.amount:.2f} грн - {expense.description}\n"
+    
+    return response
+
+def _format_limit_report(period_text: str, statuses: List[Dict[str, Any]]) -> str:
+    """
+    Format budget limit analytics.
+    
+    Args:
+        period_text: Formatted period text
+        statuses: Budget status of every category with a limit
+        
+    Returns:
+        Analytics text
+    """
+    response = f"💰 <b>Ліміти бюджету за {period_text}</b>\n\n"
+    
+    for status in statuses:
+        response += (
+            f"• {status['category']}: {status['remaining']:.2f} грн / {status['limit']:.2f} грн "
+            f"({status['percentage']:.1f}% залишку)\n"
+        )
+    
+    return response
+
+def _format_summary_report(period_text: str, category_totals: List[Tuple[str, float, int]]) -> str:
+    """
+    Format general analytics.
+    
+    Args:
+        period_text: Formatted period text
+        category_totals: (category, sum, count) of categories with expenses
+        
+    Returns:
+        Analytics text
+    """
+    totals = {category: total for category, total, _ in category_totals}
+    expenses_by_cat = {
+        category: totals[category] for category in EXPENSE_CATEGORIES if category in totals
+    }
+    
+    # Calculate total expenses
+    total_expenses = sum(expenses_by_cat.values()) if expenses_by_cat else 0
+    
+    # Form message
+    response = f"📊 <b>Загальна аналітика витрат за {period_text}</b>\n\n"
+    
+    if not expenses_by_cat:
+        response += "Не знайдено витрат за цей період.\n"
+    else:
+        # Add category breakdown
+        for category, amount in expenses_by_cat.items():
+            percentage = (float(amount) / float(total_expenses)) * 100 if total_expenses > 0 else 0
+            response += f"• {category}: {amount:.2f} грн ({percentage:.1f}%)\n"
+        
+        response += f"\n💰 <b>Загальні витрати</b>: {total_expenses:.2f} грн\n"
+    
+    return response
@@ -1,17 +1,21 @@
 """
 Module for parsing and processing expense-related messages using LangChain.
 """
+import asyncio
 import logging
 from typing import Dict, Optional, Any
-from db.database import get_db_session
-from db.queries import save_expense, check_budget_limit
+from db.database import session_scope
+from db.queries import save_expense_with_budget
+from db import async_queries
 
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field, validator
 
-from config import OPENAI_API_KEY, EXPENSE_CATEGORIES
+from config import OPENAI_API_KEY, EXPENSE_CATEGORIES, DB_ASYNC_ENABLED
+from tools.llm_cache import stage_cache
+from tools.openai_clients import get_chat_model
+from tools.tracing import span
 
 # Logging configuration
 logging.basicConfig(
@@ -36,11 +40,7 @@ class ExpenseOutput(BaseModel):
 output_parser = JsonOutputParser(pydantic_model=ExpenseOutput)
 
 # Create the LLM
-llm = ChatOpenAI(
-    model="gpt-4o-mini",
-    temperature=0.0,
-    api_key=OPENAI_API_KEY
-)
+llm = get_chat_model("gpt-4o-mini", temperature=0.0)
 
 # Create the prompt template
 system_template = f"""
@@ -77,7 +77,7 @@ class ExpenseParser:
     def __init__(self):
         self.expense_categories = EXPENSE_CATEGORIES
     
-    def parse_expense(self, message: str) -> Optional[Dict[str, Any]]:
+    async def parse_expense(self, message: str) -> Optional[Dict[str, Any]]:
         """
         Parse expense from message using LangChain and OpenAI gpt-4o-mini.
         
@@ -90,13 +90,16 @@ class ExpenseParser:
         if not OPENAI_API_KEY:
             logger.error("OpenAI API key not configured")
             return None
-
+        
         try:
-            # Log the request
-            logger.info(f"Sending request to LangChain for expense parsing: '{message}'")
-            
-            # Run the chain
-            result = expense_chain.invoke({"message": message})
+            result = await stage_cache.get("expense", message, llm.model_name, system_template)
+            if result is None:
+                # Log the request
+                logger.info(f"Sending request to LangChain for expense parsing: '{message}'")
+                
+                # Run the chain
+                result = await expense_chain.ainvoke({"message": message})
+                await stage_cache.set("expense", message, llm.model_name, system_template, result)
             
             # Log the result
             logger.info(f"LangChain response: {result}")
@@ -128,7 +131,7 @@ class ExpenseParser:
 # Create a singleton instance
 expense_parser = ExpenseParser()
 
-def parse_expense(message: str) -> Optional[Dict[str, Any]]:
+async def parse_expense(message: str) -> Optional[Dict[str, Any]]:
     """
     Parse expense from message.
     
@@ -139,15 +142,67 @@ def parse_expense(message: str) -> Optional[Dict[str, Any]]:
         Dictionary with expense information or None if expense couldn't be recognized
     """
     try:
-        return expense_parser.parse_expense(message)
+        return await expense_parser.parse_expense(message)
     except Exception as e:
         logger.error(f"Error parsing expense: {e}")
         return None
 
-def save_expenses(expense: dict, user_id: int, text: str) -> str:
+async def save_expenses(expense: dict, user_id: int, text: str) -> str:
     """
     Save expense to database and format response message.
     
+    With DB_ASYNC_ENABLED the database is awaited through the asyncio API;
+    otherwise the synchronous database work runs in a worker thread
+    to keep the event loop free for other updates.
+    
+    Args:
+        expense: Dictionary containing expense details (amount, category, description)
+        user_id: User ID
+        text: Original text message
+        
+    Returns:
+        str: Formatted message in HTML format
+    """
+    with span("db_save"):
+        if DB_ASYNC_ENABLED:
+            return await _save_expenses_async(expense, user_id, text)
+        return await asyncio.to_thread(_save_expenses_sync, expense, user_id, text)
+
+async def _save_expenses_async(expense: dict, user_id: int, text: str) -> str:
+    """
+    Save expense through the asyncio database API and format response message.
+    
+    Args:
+        expense: Dictionary containing expense details (amount, category, description)
+        user_id: User ID
+        text: Original text message
+        
+    Returns:
+        str: Formatted message in HTML format
+    """
+    # Imported lazily: the async engine needs the asyncpg/aiosqlite driver
+    from db.async_database import async_session_scope
+    
+    logger.info(f"Recognized expense: {expense}")
+    try:
+        async with async_session_scope() as db:
+            _, is_over, remaining = await async_queries.save_expense_with_budget(
+                db,
+                user_id,
+                expense["category"],
+                expense["amount"],
+                expense["description"],
+                text  # transcript - original text in Ukrainian
+            )
+        return _format_saved_expense(expense, is_over, remaining)
+    except Exception as e:
+        logger.error(f"Error saving expense: {e}")
+        return f"Сталася помилка при збереженні витрати: {str(e)}"
+
+def _save_expenses_sync(expense: dict, user_id: int, text: str) -> str:
+    """
+    Save expense to database and format response message (blocking).
+    
     Args:
         expense: Dictionary containing expense details (amount, category, description)
         user_id: User ID
@@ -157,39 +212,51 @@ def save_expenses(expense: dict, user_id: int, text: str) -> str:
         str: Formatted message in HTML format
     """
     logger.info(f"Recognized expense: {expense}")
-    db = get_db_session()
     try:
         # Get data from parsing
         amount = expense["amount"]
         category = expense["category"]
         description = expense["description"]
         
-        # Check budget limit
-        is_over, remaining = check_budget_limit(db, user_id, category, amount)
-        
-        # Save expense
-        saved_expense = save_expense(
-            db, 
-            user_id, 
-            category, 
-            amount, 
-            description,
-            text  # transcript - original text in Ukrainian
-        )
-        
-        # Format and send message
-        message = f"✅ Збережено витрату: <b>{expense['amount']:.2f} грн</b> ({expense['category']})\n"
-        message += f"📝 Опис: {expense['description']}\n"
+        # The connection returns to the pool as soon as the database work is done
+        with session_scope() as db:
+            # Save expense and get the remaining budget after it in one transaction
+            _, is_over, remaining = save_expense_with_budget(
+                db, 
+                user_id, 
+                category, 
+                amount, 
+                description,
+                text  # transcript - original text in Ukrainian
+            )
         
-        if is_over:
-            message += f"\n⚠️ <b>Увага!</b> Ви перевищили ліміт у категорії <b>{category}</b>.\n"
-            message += f"Перевищення на: <b>{abs(remaining):.2f} грн</b>"
-        else:
-            message += f"\n💰 Залишок у категорії <b>{category}</b>: <b>{remaining:.2f} грн</b>"
-        
-        return message
+        return _format_saved_expense(expense, is_over, remaining)
     except Exception as e:
         logger.error(f"Error saving expense: {e}")
         return f"Сталася помилка при збереженні витрати: {str(e)}"
-    finally:
-        db.close() 
\ No newline at end of file
+
+def _format_saved_expense(expense: dict, is_over: bool, remaining: Optional[float]) -> str:
+    """
+    Format the response message about a saved expense.
+    
+    Args:
+        expense: Dictionary containing expense details (amount, category, description)
+        is_over: Whether the category limit is exceeded
+        remaining: Remaining category budget after the expense (None without a limit)
+        
+    Returns:
+        str: Formatted message in HTML format
+    """
+    category = expense["category"]
+    message = f"✅ Збережено витрату: <b>{expense['amount']:.2f} грн</b> ({category})\n"
+    message += f"📝 Опис: {expense['description']}\n"
+    
+    if remaining is None:
+        message += f"\nℹ️ Ліміт для категорії <b>{category}</b> не встановлено"
+    elif is_over:
+        message += f"\n⚠️ <b>Увага!</b> Ви перевищили ліміт у категорії <b>{category}</b>.\n"
+        message += f"Перевищення на: <b>{abs(remaining):.2f} грн</b>"
+    else:
+        message += f"\n💰 Залишок у категорії <b>{category}</b>: <b>{remaining:.2f} грн</b>"
+    
+    return message
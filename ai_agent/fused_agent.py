@@ -0,0 +1,186 @@
+"""
+Module for single-call message understanding using LangChain and OpenAI gpt-4o-mini.
+
+The fused pipeline sends the original Ukrainian text once and receives intent,
+expense fields and analytics parameters in a single structured response,
+replacing the staged translate -> classify -> parse chain.
+"""
+import logging
+from typing import Dict, Optional, Any, Literal
+
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import JsonOutputParser
+from pydantic import BaseModel, Field, ValidationError
+
+from config import OPENAI_API_KEY, EXPENSE_CATEGORIES
+from ai_agent.expenses_agent import ExpenseOutput
+from tools.llm_cache import stage_cache
+from tools.openai_clients import get_chat_model
+
+# Logging configuration
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Periods understood by analytics_agent._get_period_from_text
+PERIOD_HINTS = [
+    "today",
+    "yesterday",
+    "this week",
+    "last week",
+    "this month",
+    "last month",
+    "this year",
+    "last year"
+]
+
+# Define the output schema for fused message parsing
+class FusedOutput(BaseModel):
+    intent: Literal["expense", "analytics", "unknown"] = Field(description="The classified intent of the message")
+    amount: Optional[float] = Field(description="The numeric value (float) of the expense")
+    category: Optional[str] = Field(description="The expense category")
+    description: Optional[str] = Field(description="A brief description of the expense in English")
+    analytics_type: Optional[Literal["category", "limit", "summary"]] = Field(description="The type of analytics request")
+    period: Optional[str] = Field(description="The period the analytics request refers to")
+
+# Create the output parser
+output_parser = JsonOutputParser(pydantic_model=FusedOutput)
+
+# Create the LLM
+llm = get_chat_model("gpt-4o-mini", temperature=0.0)
+
+# Create the prompt template
+system_template = f"""
+You are an assistant of a personal expense tracker. Users write in Ukrainian.
+Analyze the message and return a single JSON object with the following keys:
+
+1. "intent": one of "expense", "analytics", "unknown"
+   - "expense" - the user reports an already completed purchase or payment ("купив", "витратив", "заплатив")
+   - "analytics" - the user asks for information about their expenses ("скільки", "покажи", "який залишок")
+   - "unknown" - anything else
+2. "amount": numeric value of the expense, or null
+3. "category": one of {', '.join(EXPENSE_CATEGORIES)}, or null.
+   For an expense without category information use "Others".
+   For an analytics request set it only when a specific category is mentioned.
+4. "description": a brief description of the expense in English, or null
+5. "analytics_type": for analytics requests one of
+   - "category" - expenses for a specific category
+   - "limit" - budget limits, remaining budget, how much can still be spent
+   - "summary" - overall analytics, total expenses, general report
+   otherwise null
+6. "period": for analytics requests one of {', '.join(f'"{period}"' for period in PERIOD_HINTS)}, otherwise null
+
+Return the result in JSON format without any additional text or explanations.
+
+Example of successful JSON:
+{{{{
+    "intent": "expense",
+    "amount": 300,
+    "category": "Foods",
+    "description": "Grocery shopping",
+    "analytics_type": null,
+    "period": null
+}}}}
+"""
+
+prompt = ChatPromptTemplate.from_messages([
+    ("system", system_template),
+    ("user", "{message}")
+])
+
+# Create the chain
+fused_chain = prompt | llm | output_parser
+
+def _validate_expense(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate expense fields the same way as the staged pipeline (ExpenseOutput).
+    
+    An unknown or missing category becomes "Others"; an amount that is not a positive
+    number is dropped, so the message is reported as unrecognized instead of being saved.
+    
+    Args:
+        result: Raw fused LLM response
+        
+    Returns:
+        Dictionary with keys amount, category, description
+    """
+    category = result.get("category")
+    if category not in EXPENSE_CATEGORIES:
+        category = "Others"
+    
+    try:
+        expense = ExpenseOutput(
+            amount=result.get("amount"),
+            category=category,
+            description=result.get("description")
+        )
+    except ValidationError as e:
+        logger.warning(f"Invalid expense in fused response: {e}")
+        return {"amount": None, "category": category, "description": None}
+    
+    amount = expense.amount if expense.amount is not None and expense.amount > 0 else None
+    return {"amount": amount, "category": expense.category, "description": expense.description}
+
+async def parse_message(message: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse intent, expense and analytics parameters from message in one LLM request.
+    
+    Args:
+        message: Message text in Ukrainian
+        
+    Returns:
+        Dictionary with keys intent, amount, category, description, analytics_type, period
+        or None if the request failed
+    """
+    if not OPENAI_API_KEY:
+        logger.error("OpenAI API key not configured")
+        return None
+    
+    try:
+        result = await stage_cache.get("fused", message, llm.model_name, system_template)
+        if result is None:
+            # Log the request
+            logger.info(f"Sending request to LangChain for fused parsing: '{message}'")
+            
+            # Run the chain
+            result = await fused_chain.ainvoke({"message": message})
+            await stage_cache.set("fused", message, llm.model_name, system_template, result)
+        
+        # Log the result
+        logger.info(f"LangChain fused response: {result}")
+        
+        intent = result.get("intent")
+        if intent not in ["expense", "analytics", "unknown"]:
+            intent = "unknown"
+        
+        category = result.get("category")
+        if category not in EXPENSE_CATEGORIES:
+            category = None
+        amount = result.get("amount")
+        description = result.get("description")
+        if intent == "expense":
+            expense = _validate_expense(result)
+            amount, category, description = expense["amount"], expense["category"], expense["description"]
+        
+        analytics_type = result.get("analytics_type")
+        if analytics_type not in ["category", "limit", "summary"]:
+            analytics_type = "summary"
+        
+        period = result.get("period")
+        if period not in PERIOD_HINTS:
+            period = None
+        
+        return {
+            "intent": intent,
+            "amount": amount,
+            "category": category,
+            "description": description,
+            "analytics_type": analytics_type,
+            "period": period
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in fused parsing: {e}")
+        return None
@@ -0,0 +1,380 @@
+"""
+Module for deterministic local expense parsing without LLM requests.
+
+Handles the most common short messages like "Купив продукти за 300 гривень" or "таксі 200 грн"
+with regexes, Ukrainian number words, currency suffixes and a keyword-to-category map.
+Results below the confidence threshold are left to the LLM pipeline.
+"""
+import logging
+import re
+import threading
+from typing import Dict, List, Optional, Any, Tuple
+
+from config import EXPENSE_CATEGORIES, LOCAL_PARSER_CONFIDENCE_THRESHOLD
+
+# Logging configuration
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Word stems mapped to expense categories (Ukrainian and English)
+CATEGORY_KEYWORDS = {
+    "Foods": [
+        "продукт", "їж", "їда", "харч", "обід", "вечер", "сніданок", "кав", "каф", "ресторан",
+        "супермаркет", "атб", "сільпо", "новус", "хліб", "молок", "м'яс", "овоч", "фрукт", "піц",
+        "food", "grocer", "lunch", "dinner", "breakfast", "coffee", "cafe", "restaurant", "supermarket", "pizza"
+    ],
+    "Shopping": [
+        "одяг", "взутт", "куртк", "сукн", "штан", "футболк", "кросівк", "шопінг", "покупк",
+        "телефон", "ноутбук", "техн", "електрон",
+        "clothes", "shoes", "shopping", "phone", "laptop", "electronics"
+    ],
+    "Housing": [
+        "оренд", "квартир", "комунал", "світло", "електроенерг", "опален", "інтернет", "меблі",
+        "rent", "apartment", "utilities", "electricity", "internet", "furniture"
+    ],
+    "Transportation": [
+        "таксі", "автобус", "метро", "бензин", "пальн", "проїзд", "маршрутк", "трамва", "тролейбус",
+        "потяг", "поїзд", "uber", "bolt", "uklon",
+        "taxi", "bus", "subway", "gasoline", "fuel", "train", "ticket"
+    ],
+    "Entertainment": [
+        "кіно", "театр", "концерт", "клуб", "розваг", "боулінг", "спортзал", "басейн",
+        "cinema", "movie", "theater", "concert", "club", "bowling", "gym"
+    ]
+}
+
+# Verbs that mark an already completed expense
+EXPENSE_VERBS = [
+    "купив", "купила", "купили", "витратив", "витратила", "витратили", "заплатив", "заплатила",
+    "заплатили", "оплатив", "оплатила", "сплатив", "сплатила",
+    "bought", "spent", "paid", "purchased"
+]
+
+# Words that mark a question or an analytics request
+QUESTION_WORDS = [
+    "скільки", "покажи", "показати", "який", "яка", "які", "залишок", "ліміт", "звіт", "аналітик",
+    "how", "show", "what", "remaining", "limit", "report"
+]
+
+# Modal, future and negation words: planned or cancelled purchases are left to the LLM
+NON_EXPENSE_MARKERS = [
+    "не", "ні", "треба", "потрібно", "потрібен", "потрібна", "хочу", "хочемо", "хотів", "хотіла",
+    "планую", "збираюсь", "збираюся", "буду", "будемо", "завтра", "післязавтра",
+    "заплачу", "куплю", "купимо", "оплачу", "сплачу", "витрачу", "замовлю",
+    "not", "don't", "didn't", "need", "want", "will", "plan", "going", "tomorrow",
+    # Periods of analytics requests ("витрати на кафе за 2 тижні")
+    "день", "дні", "днів", "тиждень", "тижні", "тижнів", "місяць", "місяці", "місяців", "рік", "роки", "років"
+]
+
+# Stems of analytics nouns ("витрати") and of sales, refunds, income and loans; words that are
+# EXPENSE_VERBS ("витратив") are not rejected
+NON_EXPENSE_STEMS = ["витрат", "продав", "поверну", "отримав", "позичив", "зарплат"]
+
+# Currency suffixes (Ukrainian hryvnia)
+CURRENCY_PATTERN = r"(?:грн\.?|гривень|гривні|гривня|гривню|гривн\w*|uah|₴|hryvn\w*)"
+
+# Numbers with optional thousands separators and decimal part, e.g. "1 500", "235,50"
+NUMBER_PATTERN = r"\d{1,3}(?:[  ]\d{3})+(?:[.,]\d{1,2})?|\d+(?:[.,]\d{1,2})?"
+
+# Multipliers written after a number, e.g. "2 тис", "1.5 тисячі"
+THOUSAND_PATTERN = r"(?:тис\.?|тисяч[аі]?|k)"
+
+AMOUNT_REGEX = re.compile(
+    rf"(?<![\w.,])(?P<number>{NUMBER_PATTERN})(?:\s*(?P<thousand>{THOUSAND_PATTERN}))?(?:\s*(?P<currency>{CURRENCY_PATTERN}))?(?!\w)",
+    re.IGNORECASE
+)
+
+# Dates like "15.03" or "15/03/2024" that would otherwise be read as amounts
+DATE_REGEX = re.compile(r"(?<![\w.,/])(?:0?[1-9]|[12]\d|3[01])[./](?:0[1-9]|1[0-2])(?:[./]\d{2,4})?(?![\w.,/])")
+
+# Ukrainian number words
+UNITS = {
+    "один": 1, "одна": 1, "одну": 1, "два": 2, "дві": 2, "три": 3, "чотири": 4, "п'ять": 5,
+    "шість": 6, "сім": 7, "вісім": 8, "дев'ять": 9, "десять": 10, "одинадцять": 11,
+    "дванадцять": 12, "тринадцять": 13, "чотирнадцять": 14, "п'ятнадцять": 15,
+    "шістнадцять": 16, "сімнадцять": 17, "вісімнадцять": 18, "дев'ятнадцять": 19
+}
+TENS = {
+    "двадцять": 20, "тридцять": 30, "сорок": 40, "п'ятдесят": 50, "шістдесят": 60,
+    "сімдесят": 70, "вісімдесят": 80, "дев'яносто": 90
+}
+HUNDREDS = {
+    "сто": 100, "двісті": 200, "триста": 300, "чотириста": 400, "п'ятсот": 500,
+    "шістсот": 600, "сімсот": 700, "вісімсот": 800, "дев'ятсот": 900
+}
+THOUSANDS = {"тисяча": 1000, "тисячу": 1000, "тисячі": 1000, "тисяч": 1000}
+
+# Words removed when building a description
+FILLER_WORDS = {"за", "на", "в", "у", "з", "із", "і", "та", "for", "on", "at", "in", "the", "a", "and"}
+
+# Confidence weights
+WEIGHT_AMOUNT = 0.5
+WEIGHT_SINGLE_AMOUNT = 0.1
+WEIGHT_CURRENCY = 0.15
+WEIGHT_VERB = 0.15
+WEIGHT_CATEGORY = 0.2
+# Upper bound of confidence when the amount is ambiguous (several numbers or a date in the message)
+MAX_AMBIGUOUS_CONFIDENCE = WEIGHT_AMOUNT
+
+class LocalParserStats:
+    """Thread-safe counters of local parser hits and LLM fallbacks."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fallbacks = 0
+    
+    def record(self, hit: bool):
+        """Record one parse attempt."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.fallbacks += 1
+    
+    @property
+    def total(self) -> int:
+        return self.hits + self.fallbacks
+    
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.total if self.total else 0.0
+    
+    @property
+    def fallback_rate(self) -> float:
+        return self.fallbacks / self.total if self.total else 0.0
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Return counters and rates as a dictionary."""
+        return {
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "hit_rate": self.hit_rate,
+            "fallback_rate": self.fallback_rate
+        }
+
+class LocalExpenseParser:
+    """Class for parsing expense information from short messages with local rules."""
+    
+    def __init__(self, confidence_threshold: float = LOCAL_PARSER_CONFIDENCE_THRESHOLD):
+        self.expense_categories = EXPENSE_CATEGORIES
+        self.confidence_threshold = confidence_threshold
+        self.stats = LocalParserStats()
+    
+    def analyze(self, message: str) -> Dict[str, Any]:
+        """
+        Extract expense fields and estimate how confident the extraction is.
+        
+        Args:
+            message: Message text in Ukrainian or English
+            
+        Returns:
+            Dictionary with amount, category, description and confidence (0.0 - 1.0)
+        """
+        text = _normalize(message)
+        result = {"amount": None, "category": None, "description": None, "confidence": 0.0}
+        
+        # Questions and analytics requests are never treated as expenses
+        words = re.findall(r"[\w']+", text)
+        if "?" in text or any(word in QUESTION_WORDS for word in words):
+            return result
+        
+        # Planned, wished-for or cancelled purchases, analytics over periods, sales, refunds,
+        # income and loans are not completed expenses
+        if _has_non_expense_marker(words):
+            return result
+        
+        # A number next to a noun is not enough: an expense verb or a currency is required
+        has_verb = any(word in EXPENSE_VERBS for word in words)
+        amounts, currency_index, amount_spans = _extract_amounts(text)
+        if not amounts or not (has_verb or currency_index is not None):
+            return result
+        
+        amount = amounts[currency_index if currency_index is not None else 0]
+        if amount <= 0:
+            return result
+        
+        categories = _match_categories(words)
+        confidence = WEIGHT_AMOUNT
+        if len(amounts) == 1:
+            confidence += WEIGHT_SINGLE_AMOUNT
+        if currency_index is not None:
+            confidence += WEIGHT_CURRENCY
+        if has_verb:
+            confidence += WEIGHT_VERB
+        if len(categories) == 1:
+            confidence += WEIGHT_CATEGORY
+        if len(amounts) > 1 or DATE_REGEX.search(text):
+            # Quantities, unit prices and dates compete with the amount: leave the choice to the LLM
+            confidence = min(confidence, MAX_AMBIGUOUS_CONFIDENCE)
+        
+        category = categories[0] if len(categories) == 1 else "Others"
+        if category not in self.expense_categories:
+            category = "Others"
+        
+        result.update({
+            "amount": amount,
+            "category": category,
+            "description": _build_description(message, amount_spans),
+            "confidence": round(min(confidence, 1.0), 2)
+        })
+        return result
+    
+    def parse_expense(self, message: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse expense from message if the local rules are confident enough.
+        
+        Args:
+            message: Message text in Ukrainian or English
+            
+        Returns:
+            Dictionary with expense information or None if the LLM should handle the message
+        """
+        try:
+            result = self.analyze(message)
+        except Exception as e:
+            logger.error(f"Error in local expense parsing: {e}")
+            result = {"confidence": 0.0}
+        
+        hit = result["confidence"] >= self.confidence_threshold
+        self.stats.record(hit)
+        
+        if not hit:
+            logger.info(f"Local parser is not confident ({result['confidence']:.2f}), falling back to LLM")
+            return None
+        
+        expense_data = {
+            "amount": result["amount"],
+            "category": result["category"],
+            "description": result["description"]
+        }
+        logger.info(f"Locally parsed expense ({result['confidence']:.2f}): {expense_data}")
+        return expense_data
+
+def _normalize(message: str) -> str:
+    """Lowercase the message and unify apostrophes (keeps character positions)."""
+    return re.sub(r"[’ʼ`]", "'", message.lower())
+
+def _has_non_expense_marker(words: List[str]) -> bool:
+    """Whether the words mark a message that is not a completed expense (see NON_EXPENSE_MARKERS and NON_EXPENSE_STEMS)."""
+    return any(
+        word in NON_EXPENSE_MARKERS
+        or (word not in EXPENSE_VERBS and any(word.startswith(stem) for stem in NON_EXPENSE_STEMS))
+        for word in words
+    )
+
+def _extract_amounts(text: str) -> Tuple[List[float], Optional[int], List[Tuple[int, int]]]:
+    """
+    Find all amounts in the text, written with digits or Ukrainian number words.
+    
+    Returns:
+        (amounts, currency_index, spans): Found amounts, index of the first amount with a currency
+        suffix (None if there is none), and character spans of the amounts in the text
+    """
+    amounts = []
+    spans = []
+    currency_index = None
+    
+    for match in AMOUNT_REGEX.finditer(text):
+        number = re.sub(r"[  ]", "", match.group("number")).replace(",", ".")
+        value = float(number)
+        if match.group("thousand"):
+            value *= 1000
+        if currency_index is None and match.group("currency"):
+            currency_index = len(amounts)
+        amounts.append(value)
+        spans.append(match.span())
+    
+    if not amounts:
+        value, span = _parse_number_words(text)
+        if value:
+            currency = re.match(rf"\s*{CURRENCY_PATTERN}", text[span[1]:], re.IGNORECASE)
+            if currency:
+                currency_index = 0
+                span = (span[0], span[1] + currency.end())
+            amounts.append(float(value))
+            spans.append(span)
+    
+    return amounts, currency_index, spans
+
+def _parse_number_words(text: str) -> Tuple[int, Tuple[int, int]]:
+    """
+    Parse the first number written with Ukrainian words, e.g. "дві тисячі п'ятсот".
+    
+    Returns:
+        (value, span): Parsed value (0 if none) and its character span in the text
+    """
+    total = 0
+    current = 0
+    start = end = None
+    
+    for match in re.finditer(r"[\w']+", text):
+        word = match.group()
+        if word in UNITS or word in TENS or word in HUNDREDS:
+            current += UNITS.get(word) or TENS.get(word) or HUNDREDS.get(word)
+        elif word in THOUSANDS:
+            total += (current or 1) * 1000
+            current = 0
+        elif start is not None:
+            break
+        else:
+            continue
+        if start is None:
+            start = match.start()
+        end = match.end()
+    
+    if start is None:
+        return 0, (0, 0)
+    return total + current, (start, end)
+
+def _match_categories(words: List[str]) -> List[str]:
+    """Return categories whose keywords occur in the words, in EXPENSE_CATEGORIES order."""
+    matched = []
+    for category, stems in CATEGORY_KEYWORDS.items():
+        if any(word.startswith(stem) for word in words for stem in stems):
+            matched.append(category)
+    return matched
+
+def _build_description(message: str, amount_spans: List[Tuple[int, int]]) -> Optional[str]:
+    """
+    Build a short description from the message without amounts, currency, verbs and filler words.
+    """
+    text = message
+    for start, end in sorted(amount_spans, reverse=True):
+        text = text[:start] + " " + text[end:]
+    
+    words = [
+        word for word in re.findall(r"[\w'’ʼ]+", text)
+        if _normalize(word) not in EXPENSE_VERBS and _normalize(word) not in FILLER_WORDS
+    ]
+    if not words:
+        return None
+    description = " ".join(words)
+    return description[0].upper() + description[1:]
+
+# Create a singleton instance
+local_expense_parser = LocalExpenseParser()
+
+def parse_expense_locally(message: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse expense from message with local rules.
+    
+    Args:
+        message: Message text
+        
+    Returns:
+        Dictionary with expense information or None if the LLM should handle the message
+    """
+    return local_expense_parser.parse_expense(message)
+
+def get_local_parser_stats() -> Dict[str, Any]:
+    """
+    Get hit and fallback counters of the local parser.
+    
+    Returns:
+        Dictionary with hits, fallbacks, hit_rate and fallback_rate
+    """
+    return local_expense_parser.stats.as_dict()
@@ -0,0 +1,7 @@
+"""
+Offline benchmarks of the message pipeline.
+
+Run with a local stand-in for the OpenAI API and a throwaway database:
+
+    python -m benchmarks.pipeline_benchmark --messages 200 --concurrency 16
+"""
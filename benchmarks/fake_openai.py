@@ -0,0 +1,259 @@
+"""
+Local HTTP stand-in for the OpenAI chat and audio endpoints.
+
+Responses are deterministic: the server recognizes the pipeline stage by its system prompt
+and answers from the scenario table, so benchmarks measure the pipeline itself
+with a configurable API latency instead of the network and the model.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+# Logging configuration
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class Scenario:
+    """Synthetic user message with the answers the model would give for it."""
+    ukrainian: str
+    english: str
+    intent: str
+    amount: Optional[float] = None
+    category: Optional[str] = None
+    description: Optional[str] = None
+    analytics_type: Optional[str] = None
+    period: Optional[str] = None
+
+SCENARIOS = [
+    Scenario("Купив продукти за 300 гривень", "I bought groceries for 300 hryvnias",
+             "expense", 300, "Foods", "Groceries"),
+    Scenario("Заплатив за таксі двісті", "I paid two hundred for a taxi",
+             "expense", 200, "Transportation", "Taxi"),
+    Scenario("Сходили з друзями в кіно, віддав 450", "Went to the cinema with friends, paid 450",
+             "expense", 450, "Entertainment", "Cinema with friends"),
+    Scenario("Оплатив інтернет на місяць", "Paid for the internet for a month",
+             "expense", 250, "Housing", "Internet"),
+    Scenario("Нові кросівки обійшлися в 3200", "New sneakers cost 3200",
+             "expense", 3200, "Shopping", "Sneakers"),
+    Scenario("Скільки я витратив на їжу цього місяця?", "How much did I spend on food this month?",
+             "analytics", category="Foods", analytics_type="category", period="this month"),
+    Scenario("Який залишок бюджету на транспорт?", "What is the remaining budget for transportation?",
+             "analytics", category="Transportation", analytics_type="limit", period="this month"),
+    Scenario("Покажи загальні витрати за минулий місяць", "Show total expenses for last month",
+             "analytics", analytics_type="summary", period="last month"),
+    Scenario("Привіт, як справи?", "Hi, how are you?", "unknown"),
+]
+
+_BY_TEXT: Dict[str, Scenario] = {}
+for _scenario in SCENARIOS:
+    _BY_TEXT[_scenario.ukrainian] = _scenario
+    _BY_TEXT[_scenario.english] = _scenario
+
+def synthetic_audio(scenario: Scenario) -> bytes:
+    """
+    Build a fake voice message for a scenario; the fake transcription endpoint returns its text.
+    
+    Args:
+        scenario: Scenario to "speak"
+        
+    Returns:
+        Bytes to upload as an audio file
+    """
+    return b"OggS" + scenario.ukrainian.encode("utf-8")
+
+def _scenario_for(text: str) -> Optional[Scenario]:
+    return _BY_TEXT.get(text.strip())
+
+def _chat_answer(system_prompt: str, user_message: str) -> str:
+    """Answer of the model for a pipeline stage recognized by its system prompt."""
+    scenario = _scenario_for(user_message)
+    if system_prompt.startswith("You are a translator"):
+        return scenario.english if scenario else user_message
+    if "classify the user's intent" in system_prompt:
+        return json.dumps({"intention": scenario.intent if scenario else "unknown"})
+    if "extract expense information" in system_prompt:
+        if not scenario or scenario.intent != "expense":
+            return json.dumps({"amount": None, "category": None, "description": None})
+        return json.dumps({"amount": scenario.amount, "category": scenario.category,
+                           "description": scenario.description})
+    if "identify expense categories" in system_prompt:
+        return json.dumps({"category": scenario.category if scenario else None})
+    if "type of analytics request" in system_prompt:
+        return json.dumps({"type": (scenario and scenario.analytics_type) or "summary"})
+    if "personal expense tracker" in system_prompt:
+        if not scenario:
+            return json.dumps({"intent": "unknown", "amount": None, "category": None,
+                               "description": None, "analytics_type": None, "period": None})
+        return json.dumps({"intent": scenario.intent, "amount": scenario.amount,
+                           "category": scenario.category, "description": scenario.description,
+                           "analytics_type": scenario.analytics_type, "period": scenario.period})
+    return ""
+
+class FakeOpenAIServer:
+    """
+    Threaded HTTP server imitating the OpenAI API with configurable latency.
+    
+    Args:
+        chat_latency: Mean latency of chat completions in seconds
+        audio_latency: Mean latency of audio transcriptions/translations in seconds
+        jitter: Maximum random deviation added to each latency in seconds
+        error_rate: Share of requests answered with HTTP 500
+        host: Interface to listen on
+        port: Port (0 - any free port)
+    """
+    
+    def __init__(
+        self,
+        chat_latency: float = 0.3,
+        audio_latency: float = 1.0,
+        jitter: float = 0.1,
+        error_rate: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        self.chat_latency = chat_latency
+        self.audio_latency = audio_latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(0)
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+    
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        logger.info(f"Fake OpenAI server listening on {self.base_url}")
+        return self
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+    
+    def _delay(self, latency: float):
+        with self._lock:
+            deviation = self._random.uniform(-self.jitter, self.jitter)
+            failed = self._random.random() < self.error_rate
+        time.sleep(max(latency + deviation, 0.0))
+        return failed
+    
+    def _count(self, endpoint: str):
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+    
+    def _handler_class(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def _read_body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            
+            def do_GET(self):
+                if self.path.startswith("/v1/models/"):
+                    model = self.path.rsplit("/", 1)[-1]
+                    server._count("models")
+                    self._send(200, json.dumps({
+                        "id": model, "object": "model", "created": 0, "owned_by": "benchmark"
+                    }).encode())
+                else:
+                    self._send(404, b'{"error": {"message": "not found"}}')
+            
+            def do_POST(self):
+                body = self._read_body()
+                if self.path == "/v1/chat/completions":
+                    server._count("chat")
+                    if server._delay(server.chat_latency):
+                        self._send(500, b'{"error": {"message": "injected error"}}')
+                        return
+                    self._send(200, json.dumps(_chat_completion(json.loads(body))).encode())
+                elif self.path in ("/v1/audio/transcriptions", "/v1/audio/translations"):
+                    endpoint = self.path.rsplit("/", 1)[-1]
+                    server._count(endpoint)
+                    if server._delay(server.audio_latency):
+                        self._send(500, b'{"error": {"message": "injected error"}}')
+                        return
+                    audio, fields = _parse_multipart(self.headers.get("Content-Type", ""), body)
+                    text = _audio_answer(audio, english=endpoint == "translations")
+                    if fields.get("response_format") == "text":
+                        self._send(200, text.encode("utf-8"), "text/plain; charset=utf-8")
+                    else:
+                        self._send(200, json.dumps({"text": text}).encode())
+                else:
+                    self._send(404, b'{"error": {"message": "not found"}}')
+        
+        return Handler
+
+def _chat_completion(request: dict) -> dict:
+    messages = request.get("messages", [])
+    system_prompt = next((m["content"] for m in messages if m["role"] == "system"), "").strip()
+    user_message = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+    content = _chat_answer(system_prompt, user_message)
+    return {
+        "id": "chatcmpl-benchmark",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "gpt-4o-mini"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    }
+
+def _parse_multipart(content_type: str, body: bytes) -> Tuple[bytes, Dict[str, str]]:
+    """Extract the uploaded file and the text fields of a multipart/form-data request."""
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    audio, fields = b"", {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if part.get_filename():
+            audio = part.get_payload(decode=True)
+        elif name:
+            fields[name] = part.get_content().strip()
+    return audio, fields
+
+def _audio_answer(audio: bytes, english: bool) -> str:
+    text = audio[4:].decode("utf-8", errors="ignore") if audio.startswith(b"OggS") else ""
+    scenario = _scenario_for(text)
+    if scenario is None:
+        return text
+    return scenario.english if english else scenario.ukrainian
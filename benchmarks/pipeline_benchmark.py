@@ -0,0 +1,231 @@
+"""
+End-to-end throughput benchmark of the message pipeline without network access.
+
+Starts the fake OpenAI server, points the OpenAI clients and the database at local
+stand-ins (a throwaway SQLite database), then drives process_text_with_nlp and
+voice_message_handler with synthetic Telegram updates and reports throughput
+and per-stage latency.
+
+Usage:
+    python -m benchmarks.pipeline_benchmark --messages 200 --concurrency 16 --chat-latency 0.3
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_openai import FakeOpenAIServer, SCENARIOS, Scenario, synthetic_audio
+
+# Replies that mean the pipeline failed to handle a message
+ERROR_REPLY_PREFIXES = ("Вибачте, сталася помилка", "Вибачте, щось пішло не так")
+
+class SyntheticFile:
+    """Stand-in for telegram.File with the synthetic audio of a scenario."""
+    
+    def __init__(self, content: bytes):
+        self.content = content
+        self.file_size = len(content)
+    
+    async def download_to_drive(self, custom_path=None):
+        path = Path(custom_path)
+        path.write_bytes(self.content)
+        return path
+    
+    async def download_to_memory(self, out, **kwargs):
+        out.write(self.content)
+    
+    async def download_as_bytearray(self, buf=None, **kwargs):
+        return bytearray(self.content)
+
+class SyntheticVoice:
+    def __init__(self, scenario: Scenario, index: int):
+        self.content = synthetic_audio(scenario)
+        self.file_id = f"voice-{index}"
+        self.file_unique_id = f"voice-unique-{index}"
+        self.file_size = len(self.content)
+        self.duration = 3
+    
+    async def get_file(self):
+        return SyntheticFile(self.content)
+
+class SyntheticMessage:
+    """Stand-in for telegram.Message that records replies instead of sending them."""
+    
+    def __init__(self, text: Optional[str] = None, voice: Optional[SyntheticVoice] = None):
+        self.text = text
+        self.voice = voice
+        self.replies: List[str] = []
+    
+    async def reply_text(self, text: str, **kwargs):
+        self.replies.append(text)
+
+class SyntheticUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+class SyntheticUpdate:
+    def __init__(self, user_id: int, message: SyntheticMessage):
+        self.effective_user = SyntheticUser(user_id)
+        self.message = message
+
+def _quantile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[max(math.ceil(q * len(values)) - 1, 0)]
+
+def _configure_environment(args, server: FakeOpenAIServer, workdir: str):
+    """Point config at the fake server and a throwaway database before the bot modules are imported."""
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["OPENAI_API_KEY"] = "sk-benchmark"
+    os.environ["OPENAI_WARMUP_ENABLED"] = "false"
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{Path(workdir) / 'benchmark.sqlite3'}"
+    os.environ["AUTHOR_USER_ID"] = str(args.user_id)
+    os.environ.setdefault("TELEGRAM_BOT_TOKEN", "benchmark")
+    os.environ["NLP_PIPELINE_MODE"] = args.mode
+    os.environ["TRANSCRIPTION_STRATEGY"] = args.transcription_strategy
+    os.environ["LOCAL_PARSER_ENABLED"] = "true" if args.local_parser else "false"
+    os.environ["LLM_CACHE_ENABLED"] = "true" if args.cache else "false"
+    os.environ["LLM_CACHE_PATH"] = str(Path(workdir) / "llm_cache.sqlite3")
+    os.environ["TRANSCRIPT_CACHE_PATH"] = str(Path(workdir) / "transcripts.sqlite3")
+    os.environ["TRANSCRIPT_CACHE_ENABLED"] = "true" if args.cache else "false"
+    # Synthetic audio is a few bytes of text, the size check would reject every voice message
+    os.environ["AUDIO_PREFLIGHT_ENABLED"] = "false"
+
+async def _run(args) -> Dict:
+    from db.database import init_db, session_scope
+    from db.queries import seed_test_data
+    from telegram_bot.handlers import voice_message_handler
+    from telegram_bot.message_processor import process_text_with_nlp
+    from tools.openai_clients import close_clients
+    from tools.tracing import message_trace, metrics
+    
+    init_db()
+    with session_scope() as db:
+        seed_test_data(db, args.user_id)
+    
+    async def handle_text(update: SyntheticUpdate):
+        with message_trace("text"):
+            await process_text_with_nlp(update, update.message.text)
+    
+    async def handle_voice(update: SyntheticUpdate):
+        await voice_message_handler(update, None)
+    
+    rng = random.Random(args.seed)
+    jobs = []
+    for index in range(args.messages):
+        scenario = rng.choice(SCENARIOS)
+        if rng.random() < args.voice_ratio:
+            message = SyntheticMessage(voice=SyntheticVoice(scenario, index))
+            jobs.append((handle_voice, SyntheticUpdate(args.user_id, message)))
+        else:
+            message = SyntheticMessage(text=scenario.ukrainian)
+            jobs.append((handle_text, SyntheticUpdate(args.user_id, message)))
+    
+    metrics.reset()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+    errors = 0
+    
+    async def run_job(handler, update):
+        nonlocal errors
+        async with semaphore:
+            started_at = time.perf_counter()
+            try:
+                await handler(update)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started_at)
+            if any(reply.startswith(ERROR_REPLY_PREFIXES) for reply in update.message.replies):
+                errors += 1
+    
+    started_at = time.perf_counter()
+    await asyncio.gather(*(run_job(handler, update) for handler, update in jobs))
+    elapsed = time.perf_counter() - started_at
+    await close_clients()
+    
+    stages = {}
+    for (stage, intent), histogram in sorted(metrics.histograms().items()):
+        stages[f"{stage}[{intent}]"] = histogram.snapshot()
+    
+    return {
+        "messages": args.messages,
+        "concurrency": args.concurrency,
+        "mode": args.mode,
+        "elapsed_seconds": elapsed,
+        "messages_per_second": args.messages / elapsed if elapsed else 0.0,
+        "errors": errors,
+        "latency": {
+            "p50": _quantile(latencies, 0.5),
+            "p95": _quantile(latencies, 0.95),
+            "p99": _quantile(latencies, 0.99)
+        },
+        "stages": stages
+    }
+
+def _print_report(result: Dict, requests: Dict[str, int]):
+    print()
+    print(f"Mode: {result['mode']}, messages: {result['messages']}, concurrency: {result['concurrency']}")
+    print(f"Elapsed: {result['elapsed_seconds']:.2f}s, throughput: {result['messages_per_second']:.2f} msg/s, "
+          f"errors: {result['errors']}")
+    latency = result["latency"]
+    print(f"Message latency: p50={latency['p50'] * 1000:.0f}ms p95={latency['p95'] * 1000:.0f}ms "
+          f"p99={latency['p99'] * 1000:.0f}ms")
+    print(f"OpenAI requests: {requests}")
+    print()
+    print(f"{'stage[intent]':<36} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, snapshot in result["stages"].items():
+        print(f"{name:<36} {snapshot['count']:>6} {snapshot['p50'] * 1000:>9.1f} "
+              f"{snapshot['p95'] * 1000:>9.1f} {snapshot['p99'] * 1000:>9.1f}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the message pipeline")
+    parser.add_argument("--messages", type=int, default=200, help="Number of synthetic messages")
+    parser.add_argument("--concurrency", type=int, default=16, help="Messages processed at once")
+    parser.add_argument("--voice-ratio", type=float, default=0.5, help="Share of voice messages")
+    parser.add_argument("--chat-latency", type=float, default=0.3, help="Fake chat completion latency, seconds")
+    parser.add_argument("--audio-latency", type=float, default=1.0, help="Fake Whisper latency, seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Maximum random latency deviation, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake API requests that fail")
+    parser.add_argument("--mode", choices=["staged", "fused"], default="staged", help="NLP pipeline mode")
+    parser.add_argument("--transcription-strategy", choices=["transcribe", "translate"], default="transcribe")
+    parser.add_argument("--local-parser", action=argparse.BooleanOptionalAction, default=True,
+                        help="Enable the local rule-based expense parser")
+    parser.add_argument("--cache", action=argparse.BooleanOptionalAction, default=False,
+                        help="Enable the LLM stage and transcript caches (repeated messages become cache hits)")
+    parser.add_argument("--database-url", help="Database URL (defaults to a temporary SQLite file)")
+    parser.add_argument("--user-id", type=int, default=1, help="Telegram user id of synthetic messages")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the message mix")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as workdir, FakeOpenAIServer(
+        chat_latency=args.chat_latency,
+        audio_latency=args.audio_latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate
+    ) as server:
+        _configure_environment(args, server, workdir)
+        result = asyncio.run(_run(args))
+        result["openai_requests"] = dict(server.requests)
+    
+    _print_report(result, result["openai_requests"])
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(result, indent=2))
+    return result
+
+if __name__ == "__main__":
+    main()
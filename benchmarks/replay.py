@@ -0,0 +1,205 @@
+"""
+Replay of recorded Telegram traffic against the bot handlers.
+
+Reads a log written with UPDATE_RECORD_PATH, builds the application with setup_bot()
+on a stubbed Bot API and feeds the updates through the update queue at the recorded
+pace multiplied by --speed. OpenAI requests go to the local fake server unless --live-openai
+is given; the database is a throwaway SQLite file unless --database-url is given.
+
+Usage:
+    python -m benchmarks.replay updates.jsonl --speed 10
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_openai import FakeOpenAIServer, SCENARIOS, synthetic_audio
+from benchmarks.stub_telegram import StubBotRequest
+
+def _quantile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[max(math.ceil(q * len(values)) - 1, 0)]
+
+def _synthetic_voice(file_id: str) -> bytes:
+    """Recorded voice files are not stored; every file_id maps to a stable synthetic phrase."""
+    return synthetic_audio(SCENARIOS[sum(file_id.encode()) % len(SCENARIOS)])
+
+def _configure_environment(args, records: List[Dict], workdir: str, server: FakeOpenAIServer = None):
+    """Configure the bot for replay before its modules are imported."""
+    if server is not None:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ["OPENAI_API_KEY"] = "sk-replay"
+    os.environ["OPENAI_WARMUP_ENABLED"] = "false"
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{Path(workdir) / 'replay.sqlite3'}"
+    os.environ["TELEGRAM_BOT_TOKEN"] = "123456:replay"
+    os.environ["UPDATE_RECORD_PATH"] = ""
+    os.environ["LLM_CACHE_PATH"] = str(Path(workdir) / "llm_cache.sqlite3")
+    os.environ["TRANSCRIPT_CACHE_PATH"] = str(Path(workdir) / "transcripts.sqlite3")
+    if args.max_concurrent_updates:
+        os.environ["MAX_CONCURRENT_UPDATES"] = str(args.max_concurrent_updates)
+    # Handlers only serve the bot author, so replayed messages are attributed to the most active sender
+    author = Counter(record["user_id"] for record in records).most_common(1)[0][0]
+    os.environ["AUTHOR_USER_ID"] = str(args.author_user_id or author)
+
+async def _replay(args, records: List[Dict]) -> Dict:
+    from telegram import Update
+    from telegram.ext import TypeHandler
+    from db.database import init_db, session_scope
+    from db.queries import seed_test_data
+    from config import AUTHOR_USER_ID
+    from telegram_bot.bot import setup_bot
+    from tools.openai_clients import close_clients
+    from tools.update_recorder import update_payload
+    
+    init_db()
+    with session_scope() as db:
+        seed_test_data(db, AUTHOR_USER_ID)
+    
+    request = StubBotRequest(_synthetic_voice, latency=args.telegram_latency)
+    application = setup_bot(request=request)
+    
+    enqueued_at: Dict[int, float] = {}
+    latencies: List[float] = []
+    failures = 0
+    done = asyncio.Event()
+    
+    async def on_processed(update, context):
+        # Group 100 runs after the bot handlers of the same update
+        started_at = enqueued_at.pop(update.update_id, None)
+        if started_at is not None:
+            latencies.append(time.perf_counter() - started_at)
+        if not enqueued_at and len(latencies) + failures >= len(records):
+            done.set()
+    
+    async def on_error(update, context):
+        nonlocal failures
+        if isinstance(update, Update) and enqueued_at.pop(update.update_id, None) is not None:
+            failures += 1
+            if not enqueued_at and len(latencies) + failures >= len(records):
+                done.set()
+    
+    application.add_handler(TypeHandler(Update, on_processed), group=100)
+    application.add_error_handler(on_error)
+    
+    await application.initialize()
+    await application.start()
+    
+    first_recorded = records[0]["t"]
+    started_at = time.perf_counter()
+    for index, record in enumerate(records):
+        # Keep the recorded inter-arrival gaps, compressed by the speed factor
+        delay = (record["t"] - first_recorded) / args.speed - (time.perf_counter() - started_at)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        payload = update_payload(dict(record, update_id=index + 1))
+        update = Update.de_json(payload, application.bot)
+        enqueued_at[update.update_id] = time.perf_counter()
+        await application.update_queue.put(update)
+    send_duration = time.perf_counter() - started_at
+    
+    try:
+        await asyncio.wait_for(done.wait(), timeout=args.timeout)
+    except asyncio.TimeoutError:
+        pass
+    elapsed = time.perf_counter() - started_at
+    timed_out = len(enqueued_at)
+    
+    await application.stop()
+    await application.shutdown()
+    await close_clients()
+    
+    handled = len(latencies)
+    return {
+        "updates": len(records),
+        "speed": args.speed,
+        "recorded_duration_seconds": records[-1]["t"] - first_recorded,
+        "send_duration_seconds": send_duration,
+        "elapsed_seconds": elapsed,
+        "throughput_per_second": handled / elapsed if elapsed else 0.0,
+        "latency": {
+            "p50": _quantile(latencies, 0.5),
+            "p95": _quantile(latencies, 0.95),
+            "p99": _quantile(latencies, 0.99),
+            "max": max(latencies, default=0.0)
+        },
+        "handled": handled,
+        "handler_errors": failures,
+        "error_replies": request.error_replies,
+        "timed_out": timed_out,
+        "error_rate": (failures + request.error_replies + timed_out) / len(records),
+        "bot_api_calls": dict(request.calls)
+    }
+
+def _print_report(result: Dict):
+    latency = result["latency"]
+    print()
+    print(f"Replayed {result['updates']} updates at {result['speed']}x "
+          f"(recorded over {result['recorded_duration_seconds']:.1f}s, sent in {result['send_duration_seconds']:.1f}s)")
+    print(f"Elapsed: {result['elapsed_seconds']:.2f}s, throughput: {result['throughput_per_second']:.2f} updates/s")
+    print(f"Latency: p50={latency['p50'] * 1000:.0f}ms p95={latency['p95'] * 1000:.0f}ms "
+          f"p99={latency['p99'] * 1000:.0f}ms max={latency['max'] * 1000:.0f}ms")
+    print(f"Errors: handler={result['handler_errors']} error_replies={result['error_replies']} "
+          f"timed_out={result['timed_out']} rate={result['error_rate']:.2%}")
+    print(f"Bot API calls: {result['bot_api_calls']}")
+    if "openai_requests" in result:
+        print(f"OpenAI requests: {result['openai_requests']}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded Telegram updates against the bot handlers")
+    parser.add_argument("log", help="Log written by the bot with UPDATE_RECORD_PATH")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed factor, e.g. 1, 10, 100")
+    parser.add_argument("--limit", type=int, help="Replay only the first N updates")
+    parser.add_argument("--max-concurrent-updates", type=int, help="Override MAX_CONCURRENT_UPDATES")
+    parser.add_argument("--author-user-id", type=int, help="User id to attribute replayed messages to")
+    parser.add_argument("--telegram-latency", type=float, default=0.05, help="Stub Bot API latency, seconds")
+    parser.add_argument("--live-openai", action="store_true", help="Send OpenAI requests to the configured API")
+    parser.add_argument("--chat-latency", type=float, default=0.3, help="Fake chat completion latency, seconds")
+    parser.add_argument("--audio-latency", type=float, default=1.0, help="Fake Whisper latency, seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Maximum random fake latency deviation, seconds")
+    parser.add_argument("--database-url", help="Database URL (defaults to a temporary SQLite file)")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds to wait for outstanding updates")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    from tools.update_recorder import read_records
+    records = list(read_records(args.log))[:args.limit]
+    if not records:
+        print("No updates to replay")
+        return None
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.live_openai:
+            _configure_environment(args, records, workdir)
+            result = asyncio.run(_replay(args, records))
+        else:
+            with FakeOpenAIServer(
+                chat_latency=args.chat_latency,
+                audio_latency=args.audio_latency,
+                jitter=args.jitter
+            ) as server:
+                _configure_environment(args, records, workdir, server)
+                result = asyncio.run(_replay(args, records))
+                result["openai_requests"] = dict(server.requests)
+    
+    _print_report(result)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(result, indent=2))
+    return result
+
+if __name__ == "__main__":
+    main()
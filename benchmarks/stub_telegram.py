@@ -0,0 +1,95 @@
+"""
+Stub of the Telegram Bot API for load testing.
+
+Answers the methods used by the bot locally, records sent messages and serves
+voice file downloads, so handlers run unchanged without network access.
+"""
+import asyncio
+import json
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from telegram.request import BaseRequest, RequestData
+
+# Replies that mean the bot failed to handle a message
+ERROR_REPLY_PREFIXES = ("Вибачте, сталася помилка", "Вибачте, щось пішло не так")
+
+class StubBotRequest(BaseRequest):
+    """
+    Telegram request backend that never leaves the process.
+    
+    Args:
+        voice_content: Callable returning audio bytes for a voice file_id
+        latency: Simulated Bot API latency in seconds
+    """
+    
+    def __init__(self, voice_content: Callable[[str], bytes], latency: float = 0.0):
+        self.voice_content = voice_content
+        self.latency = latency
+        self.sent_messages: List[Dict] = []
+        self.calls: Dict[str, int] = {}
+        self._next_message_id = 1_000_000
+    
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return None
+    
+    async def initialize(self):
+        pass
+    
+    async def shutdown(self):
+        pass
+    
+    @property
+    def error_replies(self) -> int:
+        return sum(1 for message in self.sent_messages if message["text"].startswith(ERROR_REPLY_PREFIXES))
+    
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: RequestData = None,
+        read_timeout=None,
+        write_timeout=None,
+        connect_timeout=None,
+        pool_timeout=None
+    ) -> Tuple[int, bytes]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        
+        if "/file/bot" in url:
+            # Download of a file returned by getFile
+            self._count("download")
+            return 200, self.voice_content(url.rsplit("/", 1)[-1])
+        
+        endpoint = url.rsplit("/", 1)[-1]
+        self._count(endpoint)
+        parameters = request_data.parameters if request_data else {}
+        return 200, json.dumps({"ok": True, "result": self._result(endpoint, parameters)}).encode()
+    
+    def _count(self, endpoint: str):
+        self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+    
+    def _result(self, endpoint: str, parameters: Dict):
+        if endpoint == "getMe":
+            return {
+                "id": 1, "is_bot": True, "first_name": "Replay", "username": "replay_bot",
+                "can_join_groups": False, "can_read_all_group_messages": False,
+                "supports_inline_queries": False
+            }
+        if endpoint == "getFile":
+            file_id = parameters["file_id"]
+            return {"file_id": file_id, "file_unique_id": file_id, "file_path": f"voice/{file_id}"}
+        if endpoint in ("sendMessage", "editMessageText"):
+            self._next_message_id += 1
+            text = parameters.get("text", "")
+            self.sent_messages.append({"chat_id": parameters.get("chat_id"), "text": text, "time": time.time()})
+            return {
+                "message_id": self._next_message_id,
+                "date": int(time.time()),
+                "chat": {"id": parameters.get("chat_id"), "type": "private"},
+                "text": text
+            }
+        if endpoint == "getUpdates":
+            return []
+        return True
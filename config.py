@@ -14,13 +14,112 @@ DB_PORT = int(os.getenv("DB_PORT", "5432"))
 DB_NAME = os.getenv("DB_NAME", "voice_expense_tracker")
 DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
+# Full database URL, overrides the DB_* settings (e.g. "sqlite:///benchmark.sqlite3" for a throwaway database)
+DATABASE_URL = os.getenv("DATABASE_URL") or None
+# Connection pool: sessions borrow connections from a shared pool, dead connections are detected before use
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# PostgreSQL statement timeout in milliseconds (0 disables it)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "5000"))
+# Bot handlers use the asyncio database API (asyncpg, or aiosqlite for SQLite) instead of sync sessions in worker threads
+DB_ASYNC_ENABLED = os.getenv("DB_ASYNC_ENABLED", "false").lower() == "true"
+# Bulk expense import from CSV: rows loaded per transaction and the largest file accepted from Telegram
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+IMPORT_MAX_FILE_BYTES = int(os.getenv("IMPORT_MAX_FILE_BYTES", str(20 * 1024 * 1024)))
 
 # Telegram bot configuration
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 AUTHOR_USER_ID = int(os.getenv("AUTHOR_USER_ID"))
 
+# Update processing: updates from different users run concurrently, each user's updates in order
+MAX_CONCURRENT_UPDATES = int(os.getenv("MAX_CONCURRENT_UPDATES", "8"))
+MAX_PENDING_UPDATES = int(os.getenv("MAX_PENDING_UPDATES", "1000"))
+
 # OpenAI configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+# Shared OpenAI HTTP connection pool
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "60"))
+OPENAI_CONNECT_TIMEOUT_SECONDS = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", "5"))
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "50"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+OPENAI_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY_SECONDS", "60"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+OPENAI_WARMUP_ENABLED = os.getenv("OPENAI_WARMUP_ENABLED", "true").lower() == "true"
+
+# Voice recognition strategy: "transcribe" (Ukrainian transcript, then text translation)
+# or "translate" (Whisper translation endpoint produces English directly)
+TRANSCRIPTION_STRATEGY = os.getenv("TRANSCRIPTION_STRATEGY", "transcribe").lower()
+# With the "translate" strategy, also request the Ukrainian transcript to store with expenses.
+# This sends every voice message to Whisper twice (transcription + translation), doubling audio
+# API cost; when disabled the English translation is stored as the transcript
+STORE_ORIGINAL_TRANSCRIPT = os.getenv("STORE_ORIGINAL_TRANSCRIPT", "false").lower() == "true"
+# Voice messages up to this size are kept in memory, larger ones are spilled to a temporary file
+VOICE_IN_MEMORY_MAX_BYTES = int(os.getenv("VOICE_IN_MEMORY_MAX_BYTES", str(10 * 1024 * 1024)))
+# Long voice messages are split at pauses into chunks transcribed in parallel (requires pydub and ffmpeg)
+LONG_AUDIO_CHUNKING_ENABLED = os.getenv("LONG_AUDIO_CHUNKING_ENABLED", "true").lower() == "true"
+LONG_AUDIO_THRESHOLD_SECONDS = float(os.getenv("LONG_AUDIO_THRESHOLD_SECONDS", "60"))
+TRANSCRIPTION_CHUNK_SECONDS = float(os.getenv("TRANSCRIPTION_CHUNK_SECONDS", "30"))
+TRANSCRIPTION_CHUNK_MAX_SECONDS = float(os.getenv("TRANSCRIPTION_CHUNK_MAX_SECONDS", "45"))
+TRANSCRIPTION_CHUNK_OVERLAP_MS = int(os.getenv("TRANSCRIPTION_CHUNK_OVERLAP_MS", "500"))
+TRANSCRIPTION_CHUNK_CONCURRENCY = int(os.getenv("TRANSCRIPTION_CHUNK_CONCURRENCY", "4"))
+# Voice messages recognized concurrently and the number allowed to wait for a free worker
+TRANSCRIPTION_WORKERS = int(os.getenv("TRANSCRIPTION_WORKERS", "4"))
+TRANSCRIPTION_QUEUE_MAX_SIZE = int(os.getenv("TRANSCRIPTION_QUEUE_MAX_SIZE", "20"))
+# Speech-to-text backend: "openai" (Whisper API), "local" (faster-whisper on CPU)
+# or "auto" (local for clips up to LOCAL_TRANSCRIPTION_MAX_SECONDS, the API otherwise)
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND", "openai").lower()
+LOCAL_TRANSCRIPTION_MAX_SECONDS = float(os.getenv("LOCAL_TRANSCRIPTION_MAX_SECONDS", "10"))
+# Use the local model when the Whisper API request fails
+TRANSCRIPTION_FALLBACK_ENABLED = os.getenv("TRANSCRIPTION_FALLBACK_ENABLED", "true").lower() == "true"
+LOCAL_WHISPER_MODEL = os.getenv("LOCAL_WHISPER_MODEL", "small")
+LOCAL_WHISPER_COMPUTE_TYPE = os.getenv("LOCAL_WHISPER_COMPUTE_TYPE", "int8")
+LOCAL_WHISPER_WORKERS = int(os.getenv("LOCAL_WHISPER_WORKERS", "1"))
+LOCAL_WHISPER_CPU_THREADS = int(os.getenv("LOCAL_WHISPER_CPU_THREADS", "2"))
+
+# Audio preflight: skip too short or near-silent voice messages, trim silence before upload
+AUDIO_PREFLIGHT_ENABLED = os.getenv("AUDIO_PREFLIGHT_ENABLED", "true").lower() == "true"
+VOICE_MIN_DURATION_SECONDS = float(os.getenv("VOICE_MIN_DURATION_SECONDS", "1"))
+VOICE_MIN_FILE_SIZE_BYTES = int(os.getenv("VOICE_MIN_FILE_SIZE_BYTES", "1000"))
+VOICE_SILENCE_THRESHOLD_DBFS = float(os.getenv("VOICE_SILENCE_THRESHOLD_DBFS", "-45"))
+VOICE_MIN_SPEECH_MS = int(os.getenv("VOICE_MIN_SPEECH_MS", "300"))
+VOICE_TRIM_MIN_MS = int(os.getenv("VOICE_TRIM_MIN_MS", "1000"))
+
+# NLP pipeline mode: "staged" (translate -> classify -> parse) or "fused" (single LLM request)
+NLP_PIPELINE_MODE = os.getenv("NLP_PIPELINE_MODE", "staged").lower()
+
+# Skip translation for English or language-neutral text detected locally
+LANGUAGE_DETECTION_ENABLED = os.getenv("LANGUAGE_DETECTION_ENABLED", "true").lower() == "true"
+
+# Local rule-based expense parser that runs before the LLM pipeline
+LOCAL_PARSER_ENABLED = os.getenv("LOCAL_PARSER_ENABLED", "true").lower() == "true"
+LOCAL_PARSER_CONFIDENCE_THRESHOLD = float(os.getenv("LOCAL_PARSER_CONFIDENCE_THRESHOLD", "0.8"))
+
+# Cache of LLM stage outputs (in-memory LRU + SQLite on disk)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", str(ROOT_DIR / "cache" / "llm_cache.sqlite3"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "2048"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "100000"))
+
+# Cache of voice message transcripts keyed by Telegram file_unique_id and audio hash
+TRANSCRIPT_CACHE_ENABLED = os.getenv("TRANSCRIPT_CACHE_ENABLED", "true").lower() == "true"
+TRANSCRIPT_CACHE_PATH = os.getenv("TRANSCRIPT_CACHE_PATH", str(ROOT_DIR / "cache" / "transcripts.sqlite3"))
+TRANSCRIPT_CACHE_TTL_SECONDS = int(os.getenv("TRANSCRIPT_CACHE_TTL_SECONDS", str(90 * 24 * 3600)))
+TRANSCRIPT_CACHE_MEMORY_SIZE = int(os.getenv("TRANSCRIPT_CACHE_MEMORY_SIZE", "1024"))
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "50000"))
+
+# Pipeline latency metrics: comma-separated exporters ("log", "prometheus")
+METRICS_EXPORTERS = [name.strip() for name in os.getenv("METRICS_EXPORTERS", "log").split(",") if name.strip()]
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+METRICS_LOG_INTERVAL_SECONDS = float(os.getenv("METRICS_LOG_INTERVAL_SECONDS", "300"))
+
+# Log of incoming updates for replay-based load testing (disabled when empty)
+UPDATE_RECORD_PATH = os.getenv("UPDATE_RECORD_PATH") or None
 
 # Budget limits (in Ukrainian hryvnia)
 DEFAULT_BUDGET_LIMITS = {
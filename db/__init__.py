@@ -3,14 +3,20 @@ Database module for Voice Expense Tracker.
 Contains database connection, models, and CRUD operations.
 """
 
-from db.database import get_db_session, init_db, engine
-from db.models import Base, Expense, BudgetLimit
+from db.database import get_db_session, session_scope, get_pool_stats, init_db, engine
+from db.models import Base, Expense, BudgetLimit, MonthlyCategoryTotal
 from db.queries import (
     save_expense,
+    save_expense_with_budget,
     get_expenses_by_category,
     get_expenses_by_period,
+    get_category_totals,
+    get_monthly_category_total,
+    rebuild_monthly_totals,
+    verify_monthly_totals,
     get_budget_limit,
     check_budget_limit,
+    get_budget_status,
     get_remaining_budget,
     get_all_limits,
     seed_test_data
@@ -18,16 +24,25 @@ from db.queries import (
 
 __all__ = [
     'get_db_session',
+    'session_scope',
+    'get_pool_stats',
     'init_db',
     'engine',
     'Base',
     'Expense',
     'BudgetLimit',
+    'MonthlyCategoryTotal',
     'save_expense',
+    'save_expense_with_budget',
     'get_expenses_by_category',
     'get_expenses_by_period',
+    'get_category_totals',
+    'get_monthly_category_total',
+    'rebuild_monthly_totals',
+    'verify_monthly_totals',
     'get_budget_limit',
     'check_budget_limit',
+    'get_budget_status',
     'get_remaining_budget',
     'get_all_limits',
     'seed_test_data'
@@ -0,0 +1,210 @@
+"""
+Асинхронні операції з базою даних Voice Expense Tracker для обробників бота.
+
+Повторюють відповідні функції db/queries.py і виконують ті самі запити (db/statements.py),
+але через AsyncSession, тож не блокують цикл подій.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import Expense
+from db.statements import (
+    new_expense,
+    monthly_total_upsert,
+    expenses_by_category_query,
+    category_totals_query,
+    category_totals_from_rows,
+    monthly_total_query,
+    budget_status_query,
+    budget_status_from_rows,
+    budget_check,
+    save_expense_statements,
+    saved_expense_from_rows
+)
+
+async def save_expense(
+    db: AsyncSession,
+    user_id: int,
+    category: str,
+    amount: float,
+    description: str,
+    transcript: str
+) -> Expense:
+    """
+    Зберігає нову витрату у базу даних разом з оновленням місячного підсумку категорії.
+    
+    Args:
+        db: Асинхронна сесія бази даних
+        user_id: ID користувача в Telegram
+        category: Категорія витрати (одна з фіксованих)
+        amount: Сума витрати
+        description: Опис витрати
+        transcript: Оригінальний текст з голосового повідомлення
+        
+    Returns:
+        Об'єкт витрати
+    """
+    expense = new_expense(user_id, category, amount, description, transcript)
+    db.add(expense)
+    # Місячний підсумок оновлюється в тій самій транзакції, що й вставка витрати
+    await db.execute(monthly_total_upsert(db.bind.dialect.name, user_id, category, expense.created_at, amount))
+    await db.commit()
+    return expense
+
+async def save_expense_with_budget(
+    db: AsyncSession,
+    user_id: int,
+    category: str,
+    amount: float,
+    description: str,
+    transcript: str
+) -> Tuple[int, bool, Optional[float]]:
+    """
+    Зберігає витрату, оновлює місячний підсумок категорії і повертає новий залишок бюджету
+    в одній транзакції (у PostgreSQL - одним запитом). Замінює пару check_budget_limit + save_expense.
+    
+    Args:
+        db: Асинхронна сесія бази даних
+        user_id: ID користувача в Telegram
+        category: Категорія витрати (одна з фіксованих)
+        amount: Сума витрати
+        description: Опис витрати
+        transcript: Оригінальний текст з голосового повідомлення
+        
+    Returns:
+        (expense_id, is_over_limit, remaining): ID витрати, чи перевищено ліміт після витрати,
+        залишок бюджету категорії (або None якщо ліміт не встановлено)
+    """
+    statements = save_expense_statements(db.bind.dialect.name, user_id, category, amount, description, transcript)
+    rows = [(await db.execute(statement)).one() for statement in statements]
+    await db.commit()
+    return saved_expense_from_rows(rows)
+
+async def get_expenses_by_category(
+    db: AsyncSession,
+    user_id: int,
+    category: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> List[Expense]:
+    """
+    Отримує витрати користувача за категорією.
+    
+    Args:
+        db: Асинхронна сесія бази даних
+        user_id: ID користувача в Telegram
+        category: Категорія витрати
+        start_date: Початкова дата для фільтрації
+        end_date: Кінцева дата для фільтрації
+        
+    Returns:
+        Список витрат
+    """
+    result = await db.execute(expenses_by_category_query(user_id, category, start_date, end_date))
+    return list(result.scalars())
+
+async def get_category_totals(
+    db: AsyncSession,
+    user_id: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> List[Tuple[str, float, int]]:
+    """
+    Отримує суми та кількість витрат користувача за категоріями за період одним запитом.
+    
+    Args:
+        db: Асинхронна сесія бази даних
+        user_id: ID користувача в Telegram
+        start_date: Початкова дата для фільтрації
+        end_date: Кінцева дата для фільтрації
+        
+    Returns:
+        Список (категорія, сума, кількість) для категорій з витратами
+    """
+    return category_totals_from_rows(await db.execute(category_totals_query(user_id, start_date, end_date)))
+
+async def get_monthly_category_total(
+    db: AsyncSession,
+    user_id: int,
+    category: str,
+    year: Optional[int] = None,
+    month: Optional[int] = None
+) -> float:
+    """
+    Отримує суму витрат за категорією за місяць з таблиці місячних підсумків.
+    
+    Args:
+        db: Асинхронна сесія бази даних
+        user_id: ID користувача в Telegram
+        category: Категорія витрати
+        year: Рік (якщо не вказаний, поточний)
+        month: Місяць (якщо не вказаний, поточний)
+        
+    Returns:
+        Сума витрат
+    """
+    result = (await db.execute(monthly_total_query(user_id, category, year, month))).scalar()
+    return float(result) if result else 0.0
+
+async def get_budget_status(
+    db: AsyncSession,
+    user_id: int,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    category: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Отримує стан бюджету за місяць для всіх категорій з лімітами одним запитом.
+    
+    Args:
+        db: Асинхронна сесія бази даних
+        user_id: ID користувача в Telegram
+        year: Рік (якщо не вказаний, поточний)
+        month: Місяць (якщо не вказаний, поточний)
+        category: Опціональна категорія для фільтрації
+        
+    Returns:
+        Список словників з category, limit, spent, remaining та percentage (залишок у відсотках від ліміту)
+    """
+    return budget_status_from_rows(await db.execute(budget_status_query(user_id, year, month, category)))
+
+async def check_budget_limit(
+    db: AsyncSession,
+    user_id: int,
+    category: str,
+    amount: float
+) -> Tuple[bool, Optional[float]]:
+    """
+    Перевіряє, чи перевищить нова витрата ліміт бюджету.
+    
+    Args:
+        db: Асинхронна сесія бази даних
+        user_id: ID користувача в Telegram
+        category: Категорія витрати
+        amount: Сума нової витрати
+        
+    Returns:
+        (is_over_limit, remaining): Чи перевищить ліміт, залишок (або None якщо ліміт не встановлено)
+    """
+    return budget_check(await get_budget_status(db, user_id, category=category), amount)
+
+async def get_remaining_budget(
+    db: AsyncSession,
+    user_id: int,
+    category: str
+) -> Optional[float]:
+    """
+    Отримує залишок бюджету для категорії на поточний місяць.
+    
+    Args:
+        db: Асинхронна сесія бази даних
+        user_id: ID користувача в Telegram
+        category: Категорія витрати
+        
+    Returns:
+        Залишок бюджету або None, якщо ліміт не встановлено
+    """
+    statuses = await get_budget_status(db, user_id, category=category)
+    return statuses[0]["remaining"] if statuses else None
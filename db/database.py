@@ -1,29 +1,56 @@
 """
 Database connection setup for Voice Expense Tracker.
 """
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from config import DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD
+from sqlalchemy.orm import Session, sessionmaker
+from config import (
+    DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD, DATABASE_URL as CONFIGURED_DATABASE_URL,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT_SECONDS, DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_PRE_PING, DB_STATEMENT_TIMEOUT_MS
+)
+
+if CONFIGURED_DATABASE_URL:
+    # Повний рядок підключення з конфігурації (наприклад, тимчасова база для бенчмарків)
+    DATABASE_URL = CONFIGURED_DATABASE_URL
+else:
+    # Перевірка необхідних параметрів
+    required_params = {
+        'DB_HOST': DB_HOST,
+        'DB_PORT': DB_PORT,
+        'DB_NAME': DB_NAME,
+        'DB_USER': DB_USER,
+        'DB_PASSWORD': DB_PASSWORD
+    }
 
-# Перевірка необхідних параметрів
-required_params = {
-    'DB_HOST': DB_HOST,
-    'DB_PORT': DB_PORT,
-    'DB_NAME': DB_NAME,
-    'DB_USER': DB_USER,
-    'DB_PASSWORD': DB_PASSWORD
-}
+    for param_name, value in required_params.items():
+        if not value:
+            raise ValueError(f"Помилка: не встановлено {param_name} у файлі .env.local")
 
-for param_name, value in required_params.items():
-    if not value:
-        raise ValueError(f"Помилка: не встановлено {param_name} у файлі .env.local")
+    # Рядок підключення до бази даних
+    DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-# Рядок підключення до бази даних
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Параметри пулу з'єднань: сесії з різних потоків (asyncio.to_thread) повторно використовують з'єднання
+engine_options = {"pool_pre_ping": DB_POOL_PRE_PING}
+if DATABASE_URL.startswith("sqlite"):
+    # SQLite-з'єднання використовуються з робочих потоків
+    engine_options["connect_args"] = {"check_same_thread": False}
+else:
+    engine_options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=DB_POOL_RECYCLE_SECONDS
+    )
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        # Обмеження тривалості запиту на боці PostgreSQL
+        engine_options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
 
 # Створення движка бази даних
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **engine_options)
 
 # Створення сесії
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -31,19 +58,51 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Базовий клас для моделей
 Base = declarative_base()
 
-def get_db_session():
+def get_db_session() -> Session:
     """
     Створює сесію для взаємодії з базою даних.
+    Викликач відповідає за закриття сесії (db.close()), краще використовувати session_scope().
+    """
+    return SessionLocal()
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    Надає сесію на час виконання блоку: у разі помилки транзакція відкочується,
+    наприкінці сесія закривається і з'єднання повертається до пулу.
+    
+    Yields:
+        Сесія бази даних
     """
     db = SessionLocal()
     try:
-        return db
+        yield db
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
+def get_pool_stats() -> Dict[str, int]:
+    """
+    Повертає стан пулу з'єднань.
+    
+    Returns:
+        Словник з розміром пулу, кількістю виданих, вільних і додаткових з'єднань (None, якщо пул їх не рахує)
+    """
+    pool = engine.pool
+    stats = {}
+    for name, attribute in (("size", "size"), ("checked_out", "checkedout"), ("checked_in", "checkedin"), ("overflow", "overflow")):
+        # У деяких пулах (SingletonThreadPool) це звичайні атрибути, а не методи
+        value = getattr(pool, attribute, None)
+        stats[name] = value() if callable(value) else value
+    return stats
+
 def init_db():
     """
-    Ініціалізує базу даних, створює таблиці.
+    Ініціалізує базу даних, створює таблиці та застосовує нові міграції схеми.
     """
     from db.models import Base
+    from db.migrations import run_migrations
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
@@ -0,0 +1,63 @@
+"""
+Команди обслуговування бази даних Voice Expense Tracker.
+
+    python -m db.manage rebuild-rollups [--user-id ID]   # перерахувати місячні підсумки з таблиці витрат
+    python -m db.manage verify-rollups [--user-id ID]    # порівняти місячні підсумки з таблицею витрат
+"""
+import argparse
+import sys
+
+from db.database import session_scope
+from db.queries import rebuild_monthly_totals, verify_monthly_totals
+
+def rebuild_rollups(user_id=None) -> int:
+    """
+    Перераховує місячні підсумки категорій з таблиці витрат.
+    
+    Args:
+        user_id: ID користувача (якщо не вказаний, для всіх користувачів)
+        
+    Returns:
+        Кількість рядків місячних підсумків
+    """
+    with session_scope() as db:
+        return rebuild_monthly_totals(db, user_id)
+
+def verify_rollups(user_id=None) -> list:
+    """
+    Перевіряє місячні підсумки категорій на відповідність таблиці витрат.
+    
+    Args:
+        user_id: ID користувача (якщо не вказаний, для всіх користувачів)
+        
+    Returns:
+        Список розбіжностей
+    """
+    with session_scope() as db:
+        return verify_monthly_totals(db, user_id)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Database maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (
+        ("rebuild-rollups", "Recompute monthly category totals from expenses"),
+        ("verify-rollups", "Compare monthly category totals with expenses")
+    ):
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument("--user-id", type=int, help="Only this Telegram user")
+    args = parser.parse_args(argv)
+    
+    if args.command == "rebuild-rollups":
+        rows = rebuild_rollups(args.user_id)
+        print(f"Rebuilt {rows} monthly category totals")
+        return 0
+    
+    mismatches = verify_rollups(args.user_id)
+    for mismatch in mismatches:
+        print(f"{mismatch['user_id']} {mismatch['category']} {mismatch['month']}: "
+              f"expected {mismatch['expected']}, stored {mismatch['stored']}")
+    print(f"{len(mismatches)} mismatched monthly category totals")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
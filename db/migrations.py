@@ -0,0 +1,177 @@
+"""
+Міграції схеми бази даних Voice Expense Tracker.
+
+Нові таблиці створює init_db() (Base.metadata.create_all), а зміни наявних таблиць
+(індекси, нові колонки) застосовуються міграціями з цього модуля. Номери застосованих
+міграцій зберігаються у таблиці schema_migrations.
+
+Запуск вручну:
+    python -m db.migrations          # застосувати нові міграції
+    python -m db.migrations --list   # показати стан міграцій
+"""
+import argparse
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select
+from sqlalchemy.engine import Engine
+
+# Налаштування логування
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class Migration:
+    """Міграція схеми: номер, опис і SQL-інструкції."""
+    version: int
+    description: str
+    statements: Tuple[str, ...] = ()
+    # Індекси у PostgreSQL створюються CONCURRENTLY, без блокування запису в таблицю
+    concurrent_indexes: bool = False
+    # Міграція даних, що виконується після SQL-інструкцій
+    function: Optional[Callable[[Engine], None]] = None
+
+def _backfill_monthly_totals(engine: Engine):
+    """Створює таблицю місячних підсумків і заповнює її з наявних витрат."""
+    from sqlalchemy.orm import Session
+    from db.models import MonthlyCategoryTotal
+    from db.queries import rebuild_monthly_totals
+    
+    MonthlyCategoryTotal.__table__.create(bind=engine, checkfirst=True)
+    with Session(engine) as db:
+        rows = rebuild_monthly_totals(db)
+    logger.info(f"Monthly category totals rebuilt: {rows} rows")
+
+def _add_expense_import_hash(engine: Engine):
+    """Додає колонку import_hash до витрат та унікальний індекс (user_id, import_hash)."""
+    from sqlalchemy import inspect
+    
+    columns = {column["name"] for column in inspect(engine).get_columns("expenses")}
+    if "import_hash" not in columns:
+        with engine.begin() as connection:
+            connection.exec_driver_sql("ALTER TABLE expenses ADD COLUMN import_hash VARCHAR(64)")
+    
+    concurrently = "CONCURRENTLY" if engine.dialect.name == "postgresql" else ""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql(
+            f"CREATE UNIQUE INDEX {concurrently} IF NOT EXISTS ux_expenses_user_id_import_hash "
+            "ON expenses (user_id, import_hash)"
+        )
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        version=1,
+        description="Composite indexes on expenses (user_id, created_at) and (user_id, category, created_at)",
+        statements=(
+            "CREATE INDEX {concurrently} IF NOT EXISTS ix_expenses_user_id_created_at "
+            "ON expenses (user_id, created_at)",
+            "CREATE INDEX {concurrently} IF NOT EXISTS ix_expenses_user_id_category_created_at "
+            "ON expenses (user_id, category, created_at)",
+        ),
+        concurrent_indexes=True
+    ),
+    Migration(
+        version=2,
+        description="Monthly category totals rollup, backfilled from expenses",
+        function=_backfill_monthly_totals
+    ),
+    Migration(
+        version=3,
+        description="Import hash of expenses for deduplicated bulk imports",
+        function=_add_expense_import_hash
+    ),
+]
+
+_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime(timezone=False), nullable=False),
+)
+
+def get_applied_versions(engine: Engine) -> List[int]:
+    """
+    Повертає номери застосованих міграцій.
+    
+    Args:
+        engine: Движок бази даних
+    
+    Returns:
+        Відсортований список номерів міграцій
+    """
+    _metadata.create_all(bind=engine)
+    with engine.connect() as connection:
+        return sorted(connection.execute(select(schema_migrations.c.version)).scalars())
+
+def _apply(engine: Engine, migration: Migration):
+    """Виконує інструкції міграції і записує її номер."""
+    is_postgres = engine.dialect.name == "postgresql"
+    concurrently = "CONCURRENTLY" if is_postgres and migration.concurrent_indexes else ""
+    statements = [statement.format(concurrently=concurrently) for statement in migration.statements]
+    
+    if concurrently:
+        # CREATE INDEX CONCURRENTLY не можна виконувати всередині транзакції
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            for statement in statements:
+                connection.exec_driver_sql(statement)
+    elif statements:
+        with engine.begin() as connection:
+            for statement in statements:
+                connection.exec_driver_sql(statement)
+    
+    if migration.function is not None:
+        migration.function(engine)
+    
+    with engine.begin() as connection:
+        connection.execute(schema_migrations.insert().values(
+            version=migration.version,
+            description=migration.description,
+            applied_at=datetime.now()
+        ))
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    Застосовує міграції, які ще не були застосовані, у порядку номерів.
+    
+    Args:
+        engine: Движок бази даних
+    
+    Returns:
+        Номери застосованих зараз міграцій
+    """
+    applied = set(get_applied_versions(engine))
+    newly_applied = []
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        if migration.version in applied:
+            continue
+        logger.info(f"Applying migration {migration.version}: {migration.description}")
+        _apply(engine, migration)
+        newly_applied.append(migration.version)
+    return newly_applied
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("--list", action="store_true", help="Show migrations and whether they are applied")
+    args = parser.parse_args()
+    
+    from db.database import engine
+    if args.list:
+        applied = set(get_applied_versions(engine))
+        for migration in MIGRATIONS:
+            status = "applied" if migration.version in applied else "pending"
+            print(f"{migration.version:>4}  {status:<8} {migration.description}")
+        return
+    
+    versions = run_migrations(engine)
+    print(f"Applied migrations: {versions}" if versions else "Database schema is up to date")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 """
 Database models for Voice Expense Tracker.
 """
-from sqlalchemy import Column, Integer, String, Numeric, BigInteger, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Numeric, BigInteger, Text, Date, DateTime, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 
@@ -20,6 +20,17 @@ class Expense(Base):
     description = Column(Text, nullable=True)
     transcript = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=False))
+    # Хеш рядка імпортованої виписки, щоб повторний імпорт того самого файлу не дублював витрати
+    import_hash = Column(String(64), nullable=True)
+    
+    __table_args__ = (
+        # Складені індекси для вибірок витрат користувача за період (і за категорію за період),
+        # для наявних баз створюються міграцією 1 (db/migrations.py)
+        Index("ix_expenses_user_id_created_at", "user_id", "created_at"),
+        Index("ix_expenses_user_id_category_created_at", "user_id", "category", "created_at"),
+        # Міграція 3
+        Index("ux_expenses_user_id_import_hash", "user_id", "import_hash", unique=True),
+    )
     
     def __repr__(self):
         return f"<Expense(id={self.id}, user_id={self.user_id}, category={self.category}, amount={self.amount})>"
@@ -42,3 +53,20 @@ class BudgetLimit(Base):
         # Унікальний індекс, щоб у користувача міг бути лише один ліміт для кожної категорії
         {"sqlite_autoincrement": True},
     )
+
+class MonthlyCategoryTotal(Base):
+    """
+    Сума і кількість витрат користувача за категорією за місяць.
+    Оновлюється разом зі збереженням витрати, тож перевірка ліміту читає один рядок замість агрегації витрат.
+    """
+    __tablename__ = "monthly_category_totals"
+    
+    user_id = Column(BigInteger, primary_key=True)
+    category = Column(String, primary_key=True)
+    # Перший день місяця
+    month = Column(Date, primary_key=True)
+    total = Column(Numeric, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<MonthlyCategoryTotal(user_id={self.user_id}, category={self.category}, month={self.month}, total={self.total})>"
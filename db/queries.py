@@ -2,12 +2,25 @@
 CRUD операції для роботи з базою даних Voice Expense Tracker.
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import extract, func, and_
+from sqlalchemy import Date, cast, func, select
 from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import List, Optional, Dict, Any, Tuple
 
-from db.models import Expense, BudgetLimit
+from db.models import Expense, BudgetLimit, MonthlyCategoryTotal
+from db.statements import (
+    new_expense,
+    monthly_total_upsert,
+    expenses_by_category_query,
+    category_totals_query,
+    category_totals_from_rows,
+    monthly_total_query,
+    budget_status_query,
+    budget_status_from_rows,
+    budget_check,
+    save_expense_statements,
+    saved_expense_from_rows
+)
 
 # Операції з витратами
 def save_expense(
@@ -32,19 +45,65 @@ def save_expense(
     Returns:
         Об'єкт витрати
     """
-    expense = Expense(
-        user_id=user_id,
-        category=category,
-        amount=amount,
-        description=description,
-        transcript=transcript,
-        created_at=datetime.now()
-    )
+    expense = new_expense(user_id, category, amount, description, transcript)
     db.add(expense)
+    # Місячний підсумок оновлюється в тій самій транзакції, що й вставка витрати
+    add_to_monthly_total(db, user_id, category, expense.created_at, amount)
     db.commit()
     db.refresh(expense)
     return expense
 
+def save_expense_with_budget(
+    db: Session,
+    user_id: int,
+    category: str,
+    amount: float,
+    description: str,
+    transcript: str
+) -> Tuple[int, bool, Optional[float]]:
+    """
+    Зберігає витрату, оновлює місячний підсумок категорії і повертає новий залишок бюджету
+    в одній транзакції (у PostgreSQL - одним запитом). Замінює пару check_budget_limit + save_expense.
+    
+    Args:
+        db: Сесія бази даних
+        user_id: ID користувача в Telegram
+        category: Категорія витрати (одна з фіксованих)
+        amount: Сума витрати
+        description: Опис витрати
+        transcript: Оригінальний текст з голосового повідомлення
+        
+    Returns:
+        (expense_id, is_over_limit, remaining): ID витрати, чи перевищено ліміт після витрати,
+        залишок бюджету категорії (або None якщо ліміт не встановлено)
+    """
+    statements = save_expense_statements(db.bind.dialect.name, user_id, category, amount, description, transcript)
+    rows = [db.execute(statement).one() for statement in statements]
+    db.commit()
+    return saved_expense_from_rows(rows)
+
+def add_to_monthly_total(
+    db: Session,
+    user_id: int,
+    category: str,
+    created_at: datetime,
+    amount: float,
+    count: int = 1
+) -> None:
+    """
+    Додає витрату до місячного підсумку категорії (upsert без окремого читання рядка).
+    Зміни фіксуються разом з транзакцією сесії.
+    
+    Args:
+        db: Сесія бази даних
+        user_id: ID користувача в Telegram
+        category: Категорія витрати
+        created_at: Дата витрати
+        amount: Сума витрати
+        count: Кількість витрат
+    """
+    db.execute(monthly_total_upsert(db.get_bind().dialect.name, user_id, category, created_at, amount, count))
+
 def get_expenses_by_category(
     db: Session,
     user_id: int,
@@ -65,17 +124,7 @@ def get_expenses_by_category(
     Returns:
         Список витрат
     """
-    query = db.query(Expense).filter(
-        Expense.user_id == user_id,
-        Expense.category == category
-    )
-    
-    if start_date:
-        query = query.filter(Expense.created_at >= start_date)
-    if end_date:
-        query = query.filter(Expense.created_at <= end_date)
-    
-    return query.all()
+    return list(db.execute(expenses_by_category_query(user_id, category, start_date, end_date)).scalars())
 
 def get_expenses_by_period(
     db: Session,
@@ -139,6 +188,42 @@ def get_total_expenses(
     result = query.scalar()
     return float(result) if result else 0.0
 
+def get_category_totals(
+    db: Session,
+    user_id: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> List[Tuple[str, float, int]]:
+    """
+    Отримує суми та кількість витрат користувача за категоріями за період одним запитом.
+    
+    Args:
+        db: Сесія бази даних
+        user_id: ID користувача в Telegram
+        start_date: Початкова дата для фільтрації
+        end_date: Кінцева дата для фільтрації
+        
+    Returns:
+        Список (категорія, сума, кількість) для категорій з витратами
+    """
+    return category_totals_from_rows(db.execute(category_totals_query(user_id, start_date, end_date)))
+
+def month_range(year: int, month: int) -> Tuple[datetime, datetime]:
+    """
+    Повертає межі місяця як напіввідкритий діапазон [початок місяця, початок наступного місяця).
+    
+    Args:
+        year: Рік
+        month: Місяць
+        
+    Returns:
+        (month_start, next_month_start)
+    """
+    month_start = datetime(year, month, 1)
+    if month == 12:
+        return month_start, datetime(year + 1, 1, 1)
+    return month_start, datetime(year, month + 1, 1)
+
 def get_expense_sum_by_category(
     db: Session,
     user_id: int,
@@ -164,15 +249,119 @@ def get_expense_sum_by_category(
     if not month:
         month = datetime.now().month
     
+    # Напіввідкритий діапазон дат замість extract(), щоб запит використовував індекс (user_id, category, created_at)
+    month_start, next_month_start = month_range(year, month)
     result = db.query(func.sum(Expense.amount)).filter(
         Expense.user_id == user_id,
         Expense.category == category,
-        extract('year', Expense.created_at) == year,
-        extract('month', Expense.created_at) == month
+        Expense.created_at >= month_start,
+        Expense.created_at < next_month_start
     ).scalar()
     
     return float(result) if result else 0.0
 
+def get_monthly_category_total(
+    db: Session,
+    user_id: int,
+    category: str,
+    year: Optional[int] = None,
+    month: Optional[int] = None
+) -> float:
+    """
+    Отримує суму витрат за категорією за місяць з таблиці місячних підсумків.
+    
+    Args:
+        db: Сесія бази даних
+        user_id: ID користувача в Telegram
+        category: Категорія витрати
+        year: Рік (якщо не вказаний, поточний)
+        month: Місяць (якщо не вказаний, поточний)
+        
+    Returns:
+        Сума витрат
+    """
+    result = db.execute(monthly_total_query(user_id, category, year, month)).scalar()
+    
+    return float(result) if result else 0.0
+
+def _month_start_expr(db: Session):
+    """SQL-вираз першого дня місяця витрати для поточного діалекту."""
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.date_trunc("month", Expense.created_at), Date)
+    return func.date(Expense.created_at, "start of month")
+
+def _aggregate_monthly_totals(db: Session, user_id: Optional[int] = None):
+    """Запит, що агрегує місячні підсумки з таблиці витрат."""
+    month_start = _month_start_expr(db).label("month")
+    query = select(
+        Expense.user_id,
+        Expense.category,
+        month_start,
+        func.sum(Expense.amount).label("total"),
+        func.count(Expense.id).label("count")
+    ).group_by(Expense.user_id, Expense.category, month_start)
+    if user_id is not None:
+        query = query.where(Expense.user_id == user_id)
+    return query
+
+def rebuild_monthly_totals(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Перераховує місячні підсумки з таблиці витрат (початкове заповнення або виправлення розбіжностей).
+    
+    Args:
+        db: Сесія бази даних
+        user_id: ID користувача (якщо не вказаний, для всіх користувачів)
+        
+    Returns:
+        Кількість рядків місячних підсумків
+    """
+    delete_query = db.query(MonthlyCategoryTotal)
+    if user_id is not None:
+        delete_query = delete_query.filter(MonthlyCategoryTotal.user_id == user_id)
+    delete_query.delete(synchronize_session=False)
+    
+    aggregate = _aggregate_monthly_totals(db, user_id)
+    result = db.execute(MonthlyCategoryTotal.__table__.insert().from_select(
+        ["user_id", "category", "month", "total", "count"], aggregate
+    ))
+    db.commit()
+    return result.rowcount
+
+def verify_monthly_totals(db: Session, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Порівнює місячні підсумки з агрегацією таблиці витрат.
+    
+    Args:
+        db: Сесія бази даних
+        user_id: ID користувача (якщо не вказаний, для всіх користувачів)
+        
+    Returns:
+        Список розбіжностей: ключ місяця, очікувані та збережені сума і кількість
+    """
+    expected = {
+        (row.user_id, row.category, str(row.month)[:10]): (round(Decimal(str(row.total)), 2), row.count)
+        for row in db.execute(_aggregate_monthly_totals(db, user_id))
+    }
+    stored_query = db.query(MonthlyCategoryTotal)
+    if user_id is not None:
+        stored_query = stored_query.filter(MonthlyCategoryTotal.user_id == user_id)
+    stored = {
+        (row.user_id, row.category, str(row.month)[:10]): (round(Decimal(str(row.total)), 2), row.count)
+        for row in stored_query
+    }
+    
+    mismatches = []
+    for key in sorted(expected.keys() | stored.keys(), key=str):
+        if expected.get(key) != stored.get(key):
+            mismatches.append({
+                "user_id": key[0],
+                "category": key[1],
+                "month": key[2],
+                "expected": expected.get(key),
+                "stored": stored.get(key)
+            })
+    return mismatches
+
 # Операції з лімітами бюджету
 def get_budget_limit(
     db: Session,
@@ -243,6 +432,29 @@ def get_all_limits(db: Session, user_id: int) -> List[BudgetLimit]:
     """
     return db.query(BudgetLimit).filter(BudgetLimit.user_id == user_id).all()
 
+def get_budget_status(
+    db: Session,
+    user_id: int,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    category: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Отримує стан бюджету за місяць для всіх категорій з лімітами одним запитом
+    (ліміти, об'єднані з місячними підсумками витрат).
+    
+    Args:
+        db: Сесія бази даних
+        user_id: ID користувача в Telegram
+        year: Рік (якщо не вказаний, поточний)
+        month: Місяць (якщо не вказаний, поточний)
+        category: Опціональна категорія для фільтрації
+        
+    Returns:
+        Список словників з category, limit, spent, remaining та percentage (залишок у відсотках від ліміту)
+    """
+    return budget_status_from_rows(db.execute(budget_status_query(user_id, year, month, category)))
+
 def check_budget_limit(
     db: Session,
     user_id: int,
@@ -261,26 +473,8 @@ def check_budget_limit(
     Returns:
         (is_over_limit, remaining): Чи перевищить ліміт, залишок (або None якщо ліміт не встановлено)
     """
-    # Отримуємо ліміт для категорії
-    budget_limit = get_budget_limit(db, user_id, category)
-    if not budget_limit:
-        return False, None
-    
-    # Отримуємо поточні витрати за цей місяць
-    now = datetime.now()
-    current_month_expenses = get_expense_sum_by_category(
-        db, user_id, category, now.year, now.month
-    )
-    
-    # Розраховуємо залишок після додавання нової витрати
-    limit_amount = float(budget_limit.limit_amount)
-    new_total = current_month_expenses + amount
-    remaining = limit_amount - new_total
-    
-    # Перевіряємо, чи буде перевищено ліміт
-    is_over_limit = new_total > limit_amount
-    
-    return is_over_limit, remaining
+    # Ліміт і витрати за поточний місяць одним запитом
+    return budget_check(get_budget_status(db, user_id, category=category), amount)
 
 def get_remaining_budget(
     db: Session,
@@ -298,22 +492,11 @@ def get_remaining_budget(
     Returns:
         Залишок бюджету або None, якщо ліміт не встановлено
     """
-    # Отримуємо ліміт для категорії
-    budget_limit = get_budget_limit(db, user_id, category)
-    if not budget_limit:
+    statuses = get_budget_status(db, user_id, category=category)
+    if not statuses:
         return None
     
-    # Отримуємо поточні витрати за цей місяць
-    now = datetime.now()
-    current_month_expenses = get_expense_sum_by_category(
-        db, user_id, category, now.year, now.month
-    )
-    
-    # Розраховуємо залишок
-    limit_amount = float(budget_limit.limit_amount)
-    remaining = limit_amount - current_month_expenses
-    
-    return remaining
+    return statuses[0]["remaining"]
 
 def seed_test_data(db: Session, user_id: int) -> None:
     """
@@ -412,6 +595,7 @@ def seed_test_data(db: Session, user_id: int) -> None:
                 transcript=expense_data["transcript"],
                 created_at=created_at
             ))
+            add_to_monthly_total(db, user_id, expense_data["category"], created_at, expense_data["amount"])
         
         # Додаємо витрати за попередній місяць
         for expense_data in test_expenses_prev:
@@ -424,5 +608,6 @@ def seed_test_data(db: Session, user_id: int) -> None:
                 transcript=expense_data["transcript"],
                 created_at=created_at
             ))
+            add_to_monthly_total(db, user_id, expense_data["category"], created_at, expense_data["amount"])
         
         db.commit()
@@ -0,0 +1,284 @@
+"""
+Побудова SQL-запитів, спільна для синхронного (db/queries.py) та асинхронного (db/async_queries.py) API.
+
+Функції модуля лише будують запити і обробляють їхні результати, а виконує їх сесія
+відповідного API, тож обидва API виконують однакові запити.
+"""
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Executable, Select, and_, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from db.models import Expense, BudgetLimit, MonthlyCategoryTotal
+
+def new_expense(
+    user_id: int,
+    category: str,
+    amount: float,
+    description: str,
+    transcript: str
+) -> Expense:
+    """
+    Створює об'єкт нової витрати з поточним часом.
+    
+    Args:
+        user_id: ID користувача в Telegram
+        category: Категорія витрати
+        amount: Сума витрати
+        description: Опис витрати
+        transcript: Оригінальний текст з голосового повідомлення
+    
+    Returns:
+        Об'єкт витрати (ще не доданий до сесії)
+    """
+    return Expense(
+        user_id=user_id,
+        category=category,
+        amount=amount,
+        description=description,
+        transcript=transcript,
+        created_at=datetime.now()
+    )
+
+def monthly_total_upsert(
+    dialect_name: str,
+    user_id: int,
+    category: str,
+    created_at: datetime,
+    amount: float,
+    count: int = 1
+):
+    """
+    Будує upsert місячного підсумку категорії (INSERT ... ON CONFLICT DO UPDATE).
+    
+    Args:
+        dialect_name: Назва діалекту бази даних ("postgresql" або "sqlite")
+        user_id: ID користувача в Telegram
+        category: Категорія витрати
+        created_at: Дата витрати
+        amount: Сума витрати
+        count: Кількість витрат
+    
+    Returns:
+        Запит upsert
+    """
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    statement = dialect.insert(MonthlyCategoryTotal).values(
+        user_id=user_id,
+        category=category,
+        month=date(created_at.year, created_at.month, 1),
+        total=amount,
+        count=count
+    )
+    return statement.on_conflict_do_update(
+        index_elements=["user_id", "category", "month"],
+        set_={
+            "total": MonthlyCategoryTotal.total + statement.excluded.total,
+            "count": MonthlyCategoryTotal.count + statement.excluded.count
+        }
+    )
+
+def _limit_amount_query(user_id: int, category: str):
+    """Скалярний підзапит ліміту бюджету категорії (NULL, якщо ліміт не встановлено)."""
+    return select(BudgetLimit.limit_amount).where(
+        BudgetLimit.user_id == user_id,
+        BudgetLimit.category == category
+    ).limit(1).scalar_subquery()
+
+def save_expense_statements(
+    dialect_name: str,
+    user_id: int,
+    category: str,
+    amount: float,
+    description: str,
+    transcript: str
+) -> List[Executable]:
+    """
+    Будує запити збереження витрати разом з оновленням місячного підсумку і читанням ліміту.
+    
+    Новий підсумок повертає сам upsert (RETURNING) під блокуванням рядка підсумку, тож
+    одночасні збереження в ту саму категорію не гублять оновлень і кожне бачить свій залишок.
+    У PostgreSQL обидві вставки об'єднані в один запит через CTE (один обмін з сервером),
+    в інших базах (SQLite) це два запити з RETURNING.
+    
+    Args:
+        dialect_name: Назва діалекту бази даних ("postgresql" або "sqlite")
+        user_id: ID користувача в Telegram
+        category: Категорія витрати
+        amount: Сума витрати
+        description: Опис витрати
+        transcript: Оригінальний текст з голосового повідомлення
+    
+    Returns:
+        Запити, що виконуються по черзі в одній транзакції; їхні рядки разом дають
+        (id витрати, місячний підсумок, ліміт) - див. saved_expense_from_rows
+    """
+    created_at = datetime.now()
+    expense_insert = insert(Expense).values(
+        user_id=user_id,
+        category=category,
+        amount=amount,
+        description=description,
+        transcript=transcript,
+        created_at=created_at
+    ).returning(Expense.id)
+    total_upsert = monthly_total_upsert(dialect_name, user_id, category, created_at, amount)
+    limit_amount = _limit_amount_query(user_id, category)
+    
+    if dialect_name == "postgresql":
+        new_expense_cte = expense_insert.cte("new_expense")
+        month_total_cte = total_upsert.returning(MonthlyCategoryTotal.total).cte("month_total")
+        return [select(
+            new_expense_cte.c.id,
+            month_total_cte.c.total,
+            limit_amount
+        )]
+    return [expense_insert, total_upsert.returning(MonthlyCategoryTotal.total, limit_amount)]
+
+def saved_expense_from_rows(rows: Iterable[Tuple]) -> Tuple[int, bool, Optional[float]]:
+    """
+    Перетворює рядки запитів save_expense_statements на результат збереження.
+    
+    Args:
+        rows: Перший рядок кожного запиту
+    
+    Returns:
+        (expense_id, is_over_limit, remaining): ID витрати, чи перевищено ліміт,
+        залишок після витрати (або None якщо ліміт не встановлено)
+    """
+    expense_id, total, limit_amount = (value for row in rows for value in row)
+    if limit_amount is None:
+        return expense_id, False, None
+    remaining = float(limit_amount) - float(total)
+    return expense_id, remaining < 0, remaining
+
+def expenses_by_category_query(
+    user_id: int,
+    category: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> Select:
+    """Запит витрат користувача за категорією за період."""
+    query = select(Expense).where(
+        Expense.user_id == user_id,
+        Expense.category == category
+    )
+    
+    if start_date:
+        query = query.where(Expense.created_at >= start_date)
+    if end_date:
+        query = query.where(Expense.created_at <= end_date)
+    
+    return query
+
+def category_totals_query(
+    user_id: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> Select:
+    """Запит сум і кількості витрат користувача за категоріями за період."""
+    query = select(
+        Expense.category,
+        func.sum(Expense.amount),
+        func.count(Expense.id)
+    ).where(Expense.user_id == user_id)
+    
+    if start_date:
+        query = query.where(Expense.created_at >= start_date)
+    if end_date:
+        query = query.where(Expense.created_at <= end_date)
+    
+    return query.group_by(Expense.category).order_by(Expense.category)
+
+def category_totals_from_rows(rows: Iterable[Tuple[str, Any, int]]) -> List[Tuple[str, float, int]]:
+    """Перетворює рядки запиту category_totals_query на (категорія, сума, кількість)."""
+    return [(category, float(total), count) for category, total, count in rows]
+
+def _month_start(year: Optional[int], month: Optional[int]) -> date:
+    now = datetime.now()
+    return date(year or now.year, month or now.month, 1)
+
+def monthly_total_query(
+    user_id: int,
+    category: str,
+    year: Optional[int] = None,
+    month: Optional[int] = None
+) -> Select:
+    """Запит суми витрат за категорією за місяць (поточний, якщо не вказаний) з місячних підсумків."""
+    return select(MonthlyCategoryTotal.total).where(
+        MonthlyCategoryTotal.user_id == user_id,
+        MonthlyCategoryTotal.category == category,
+        MonthlyCategoryTotal.month == _month_start(year, month)
+    )
+
+def budget_status_query(
+    user_id: int,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    category: Optional[str] = None
+) -> Select:
+    """Запит лімітів бюджету, об'єднаних з місячними підсумками витрат (поточний місяць, якщо не вказаний)."""
+    query = select(
+        BudgetLimit.category,
+        BudgetLimit.limit_amount,
+        func.coalesce(MonthlyCategoryTotal.total, 0)
+    ).outerjoin(
+        MonthlyCategoryTotal,
+        and_(
+            MonthlyCategoryTotal.user_id == BudgetLimit.user_id,
+            MonthlyCategoryTotal.category == BudgetLimit.category,
+            MonthlyCategoryTotal.month == _month_start(year, month)
+        )
+    ).where(BudgetLimit.user_id == user_id)
+    
+    if category:
+        query = query.where(BudgetLimit.category == category)
+    
+    return query.order_by(BudgetLimit.id)
+
+def budget_status_from_rows(rows: Iterable[Tuple[str, Any, Any]]) -> List[Dict[str, Any]]:
+    """
+    Перетворює рядки запиту budget_status_query на стан бюджету категорій.
+    
+    Args:
+        rows: Рядки (категорія, ліміт, витрачено)
+    
+    Returns:
+        Список словників з category, limit, spent, remaining та percentage (залишок у відсотках від ліміту)
+    """
+    statuses = []
+    for limit_category, limit_amount, spent in rows:
+        limit_amount = float(limit_amount)
+        spent = float(spent)
+        remaining = limit_amount - spent
+        statuses.append({
+            "category": limit_category,
+            "limit": limit_amount,
+            "spent": spent,
+            "remaining": remaining,
+            "percentage": remaining / limit_amount * 100 if limit_amount > 0 else 0
+        })
+    return statuses
+
+def budget_check(statuses: List[Dict[str, Any]], amount: float) -> Tuple[bool, Optional[float]]:
+    """
+    Перевіряє, чи перевищить нова витрата ліміт категорії.
+    
+    Args:
+        statuses: Стан бюджету категорії (результат budget_status_from_rows з фільтром за категорією)
+        amount: Сума нової витрати
+    
+    Returns:
+        (is_over_limit, remaining): Чи перевищить ліміт, залишок (або None якщо ліміт не встановлено)
+    """
+    if not statuses:
+        return False, None
+    
+    # Розраховуємо залишок після додавання нової витрати
+    status = statuses[0]
+    new_total = status["spent"] + amount
+    remaining = status["limit"] - new_total
+    
+    # Перевіряємо, чи буде перевищено ліміт
+    return new_total > status["limit"], remaining
@@ -1,8 +1,9 @@
 """
 Головний файл для налаштування та запуску Telegram бота.
 """
-from telegram.ext import Application, CommandHandler, MessageHandler, filters
-from telegram import BotCommand
+from telegram.ext import Application, CommandHandler, MessageHandler, TypeHandler, filters
+from telegram import BotCommand, Update
+from telegram.request import BaseRequest
 import sys
 import os
 import logging
@@ -10,13 +11,37 @@ import logging
 # Add parent directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config import TELEGRAM_BOT_TOKEN, AUTHOR_USER_ID
+from config import (
+    TELEGRAM_BOT_TOKEN,
+    MAX_CONCURRENT_UPDATES,
+    MAX_PENDING_UPDATES,
+    OPENAI_WARMUP_ENABLED,
+    METRICS_EXPORTERS,
+    METRICS_PORT,
+    METRICS_LOG_INTERVAL_SECONDS,
+    UPDATE_RECORD_PATH,
+    DB_ASYNC_ENABLED
+)
 from telegram_bot.handlers import (
     start_handler,
     help_handler,
     voice_message_handler,
-    text_message_handler
+    text_message_handler,
+    document_message_handler
 )
+from telegram_bot.update_scheduler import PerUserUpdateProcessor
+from tools.openai_clients import warm_up, close_clients
+from tools.tracing import metrics
+from tools.metrics_exporter import create_exporters
+from tools.llm_cache import stage_cache
+from tools.translator import get_translation_stats
+from tools.update_recorder import UpdateRecorder
+from tools.transcript_cache import transcript_cache
+from tools.transcriber import get_transcription_stats, warm_up_backends, close_backends
+from tools.audio_preflight import get_preflight_stats
+from tools.transcription_queue import transcription_queue
+from db.database import get_pool_stats
+from ai_agent.local_expense_parser import get_local_parser_stats
 
 # Налаштування логування
 logging.basicConfig(
@@ -41,22 +66,81 @@ async def setup_commands(application):
     await application.bot.set_my_commands(commands)
     logger.info("Команди бота налаштовано")
 
-def setup_bot():
-    """Налаштування бота."""
-    # Створюємо додаток
-    application = Application.builder().token(TELEGRAM_TOKEN).build()
+def register_metrics(update_processor):
+    """Реєстрація лічильників черги, кешів та пропусків LLM для експорту метрик."""
+    metrics.register_collector("scheduler", update_processor.metrics)
+    metrics.register_collector("llm_cache", lambda: {"stages": stage_cache.stats()})
+    metrics.register_collector("local_parser", get_local_parser_stats)
+    metrics.register_collector("translation", get_translation_stats)
+    metrics.register_collector("transcript_cache", transcript_cache.stats)
+    metrics.register_collector("transcription_backends", get_transcription_stats)
+    metrics.register_collector("voice_preflight", get_preflight_stats)
+    metrics.register_collector("transcription_queue", transcription_queue.stats)
+    metrics.register_collector("db_pool", get_pool_stats)
+
+async def post_init(application):
+    """Дії після ініціалізації: команди бота, прогрів з'єднань з OpenAI і локальної моделі, експорт метрик."""
+    await setup_commands(application)
+    if OPENAI_WARMUP_ENABLED:
+        await warm_up()
+    warm_up_backends()
+    exporters = create_exporters(METRICS_EXPORTERS, METRICS_PORT, METRICS_LOG_INTERVAL_SECONDS)
+    for exporter in exporters:
+        await exporter.start()
+    application.bot_data["metrics_exporters"] = exporters
+
+async def post_shutdown(application):
+    """Зупинка експорту метрик, локальної моделі розпізнавання, пулів з'єднань з OpenAI та базою даних."""
+    for exporter in application.bot_data.get("metrics_exporters", []):
+        await exporter.stop()
+    close_backends()
+    await close_clients()
+    if DB_ASYNC_ENABLED:
+        from db.async_database import close_async_engine
+        await close_async_engine()
+
+def setup_bot(request: BaseRequest = None):
+    """
+    Налаштування бота.
+    
+    Args:
+        request: Обробник запитів до Bot API (наприклад, заглушка для навантажувального тестування)
+    """
+    # Створюємо додаток: оновлення різних користувачів обробляються паралельно,
+    # оновлення одного користувача - по черзі
+    update_processor = PerUserUpdateProcessor(
+        max_concurrent_updates=MAX_CONCURRENT_UPDATES,
+        max_pending_updates=MAX_PENDING_UPDATES
+    )
+    builder = (
+        Application.builder()
+        .token(TELEGRAM_TOKEN)
+        .concurrent_updates(update_processor)
+    )
+    if request is not None:
+        builder = builder.request(request).get_updates_request(request)
+    application = builder.build()
+    
+    register_metrics(update_processor)
+    
+    # Записуємо вхідні оновлення для відтворення навантаження (група -1 виконується першою)
+    if UPDATE_RECORD_PATH:
+        application.add_handler(TypeHandler(Update, UpdateRecorder(UPDATE_RECORD_PATH)), group=-1)
+        logger.info(f"Оновлення записуються у {UPDATE_RECORD_PATH}")
     
     # Додаємо обробники
     application.add_handler(CommandHandler("start", start_handler))
     application.add_handler(CommandHandler("help", help_handler))
     application.add_handler(MessageHandler(filters.VOICE, voice_message_handler))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, text_message_handler))
+    application.add_handler(MessageHandler(filters.Document.FileExtension("csv"), document_message_handler))
     
     # Додаємо обробник помилок
     application.add_error_handler(error_handler)
     
-    # Налаштовуємо команди бота
-    application.post_init = setup_commands
+    # Налаштовуємо команди бота та прогрів клієнтів OpenAI
+    application.post_init = post_init
+    application.post_shutdown = post_shutdown
     
     logger.info("Бота налаштовано")
     return application
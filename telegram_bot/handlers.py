@@ -1,21 +1,28 @@
 """
 Обробники команд та повідомлень для Telegram бота.
 """
+import asyncio
 import logging
+import tempfile
+import time
+from pathlib import Path
 from telegram import Update
 from telegram.ext import ContextTypes
-from telegram.constants import ParseMode
 
-from tools.transcriber import download_voice_message, transcribe_audio
+from tools.transcriber import download_voice_message, recognize_voice, get_cached_recognition
 from tools.translator import translate_to_english
 from telegram_bot.message_processor import process_text_with_nlp
+from tools.tracing import message_trace, span
+from tools.audio_preflight import check_metadata, preflight_audio
+from tools.transcription_queue import transcription_queue, TranscriptionQueueFull
+from tools.expense_import import import_expenses_file, CsvImportError, ImportResult
 
-from db.database import get_db_session
+from db.database import session_scope
 from db.queries import seed_test_data
 from tools.intent_classifier import classify_intent
 from ai_agent.expenses_agent import parse_expense
 from ai_agent.analytics_agent import generate_analytics
-from config import AUTHOR_USER_ID
+from config import AUTHOR_USER_ID, IMPORT_MAX_FILE_BYTES
 
 # Налаштування логування
 logging.basicConfig(
@@ -24,6 +31,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Відповідь на порожні або занадто короткі голосові повідомлення
+EMPTY_VOICE_REPLY = "Не вдалося почути повідомлення. Будь ласка, запишіть його ще раз трохи голосніше або довше."
+# Відповіді, коли всі обробники розпізнавання зайняті або черга заповнена
+QUEUED_VOICE_REPLY = "Повідомлення в черзі на розпізнавання, відповім трохи згодом."
+BUSY_VOICE_REPLY = "Зараз надто багато голосових повідомлень. Будь ласка, надішліть його ще раз за хвилину."
+# Мінімальний інтервал між оновленнями повідомлення про хід імпорту (обмеження Telegram на редагування)
+IMPORT_PROGRESS_INTERVAL_SECONDS = 3
+
 async def start_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обробник команди /start."""
     user_id = update.effective_user.id
@@ -35,21 +50,22 @@ async def start_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
     
-    # Ініціалізація бази даних з тестовими даними
-    db = get_db_session()
-    try:
+    # Ініціалізація бази даних з тестовими даними (у окремому потоці, щоб не блокувати цикл подій)
+    await asyncio.to_thread(_seed_user_data, user_id)
+    await update.message.reply_text(
+        "Привіт! Я - ваш AI-бухгалтер. Ви можете:\n"
+        "- Відправляти голосові повідомлення про витрати\n"
+        "- Запитувати аналітику витрат\n"
+        "- Отримувати сповіщення про перевищення лімітів\n"
+        "\n"
+        "Спробуйте відправити голосове повідомлення з витратою, наприклад:\n"
+        "'Купив продукти за 300 гривень'"
+    )
+
+def _seed_user_data(user_id: int):
+    """Заповнює базу даних тестовими даними для користувача."""
+    with session_scope() as db:
         seed_test_data(db, user_id)
-        await update.message.reply_text(
-            "Привіт! Я - ваш AI-бухгалтер. Ви можете:\n"
-            "- Відправляти голосові повідомлення про витрати\n"
-            "- Запитувати аналітику витрат\n"
-            "- Отримувати сповіщення про перевищення лімітів\n"
-            "\n"
-            "Спробуйте відправити голосове повідомлення з витратою, наприклад:\n"
-            "'Купив продукти за 300 гривень'"
-        )
-    finally:
-        db.close()
 
 async def help_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обробник команди /help."""
@@ -60,7 +76,8 @@ async def help_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "Ви можете:\n"
         "- Відправляти голосові повідомлення про витрати\n"
         "- Запитувати аналітику витрат голосом або текстом\n"
-        "- Отримувати сповіщення про перевищення лімітів"
+        "- Отримувати сповіщення про перевищення лімітів\n"
+        "- Надсилати CSV-виписку банку для імпорту витрат"
     )
 
 async def voice_message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -72,21 +89,51 @@ async def voice_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
         return
     
     try:
-        # Отримання голосового повідомлення
-        voice_file = await update.message.voice.get_file()
-        
-        # Завантаження голосового повідомлення
-        voice_path = await download_voice_message(voice_file)
-        
-        # Транскрипція голосового повідомлення
-        transcribed_text = await transcribe_audio(voice_path)
-        await update.message.reply_text(
-            f"Отриманий текст: {transcribed_text}"
-        )
-
-        # Обробка повідомлення
-        await process_text_with_nlp(update, transcribed_text)
-
+        # Вимірюємо тривалість кожного етапу обробки повідомлення
+        with message_trace("voice"):
+            voice = update.message.voice
+            
+            # Занадто короткі повідомлення не завантажуємо і не розпізнаємо
+            if check_metadata(voice.duration, voice.file_size):
+                await update.message.reply_text(EMPTY_VOICE_REPLY)
+                return
+            
+            # Переслане або повторно надіслане повідомлення вже розпізнане - не завантажуємо його
+            recognized = await get_cached_recognition(voice.file_unique_id)
+            if recognized is None:
+                # Кількість одночасних розпізнавань обмежена; якщо всі обробники зайняті - повідомляємо про чергу
+                async with transcription_queue.slot(on_queued=lambda: update.message.reply_text(QUEUED_VOICE_REPLY)):
+                    # Отримання та завантаження голосового повідомлення (у пам'ять, великі файли - на диск)
+                    with span("download"):
+                        voice_file = await voice.get_file()
+                        voice_audio = await download_voice_message(voice_file)
+                    
+                    # Тихі повідомлення пропускаємо, тишу на початку і в кінці обрізаємо перед розпізнаванням
+                    with span("preflight"):
+                        preflight = await preflight_audio(voice_audio)
+                    if preflight.skip_reason:
+                        await update.message.reply_text(EMPTY_VOICE_REPLY)
+                        return
+                    voice_audio = preflight.audio
+                    
+                    # Розпізнавання голосового повідомлення (транскрипція або одразу переклад англійською);
+                    # тривалість після обрізання тиші визначає бекенд і розбиття на частини
+                    with span("transcription"):
+                        recognized = await recognize_voice(
+                            voice_audio,
+                            file_unique_id=voice.file_unique_id,
+                            duration=preflight.duration(voice.duration)
+                        )
+            with span("reply"):
+                await update.message.reply_text(
+                    f"Отриманий текст: {recognized['transcript']}"
+                )
+            
+            # Обробка повідомлення
+            await process_text_with_nlp(update, recognized["transcript"], translated_text=recognized["english"])
+    
+    except TranscriptionQueueFull:
+        await update.message.reply_text(BUSY_VOICE_REPLY)
     except Exception as e:
         logger.error(f"Error processing voice message: {e}")
         await update.message.reply_text(
@@ -105,7 +152,8 @@ async def text_message_handler(update: Update, context: ContextTypes.DEFAULT_TYP
         message = update.message.text
         
         # Обробка повідомлення через message_processor
-        await process_text_with_nlp(update, message)
+        with message_trace("text"):
+            await process_text_with_nlp(update, message)
         
     except Exception as e:
         logger.error(f"Error processing text message: {e}")
@@ -113,3 +161,67 @@ async def text_message_handler(update: Update, context: ContextTypes.DEFAULT_TYP
             "Вибачте, сталася помилка при обробці повідомлення. Спробуйте ще раз."
         )
 
+
+async def _edit_progress(message, text: str):
+    """Оновлює повідомлення про хід імпорту, помилки редагування не переривають імпорт."""
+    try:
+        await message.edit_text(text)
+    except Exception as e:
+        logger.debug(f"Не вдалося оновити хід імпорту: {e}")
+
+def _import_progress_text(result: ImportResult) -> str:
+    return f"Імпортую витрати: оброблено {result.rows} рядків, додано {result.imported}..."
+
+async def document_message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Обробник CSV-файлів: імпорт витрат з виписки банку."""
+    user_id = update.effective_user.id
+    
+    # Перевірка авторизації
+    if user_id != AUTHOR_USER_ID:
+        return
+    
+    document = update.message.document
+    if document.file_size and document.file_size > IMPORT_MAX_FILE_BYTES:
+        await update.message.reply_text(
+            f"Файл завеликий для імпорту (більше {IMPORT_MAX_FILE_BYTES // (1024 * 1024)} МБ). "
+            "Розділіть виписку на кілька файлів."
+        )
+        return
+    
+    status = await update.message.reply_text("Імпортую витрати з файлу...")
+    loop = asyncio.get_running_loop()
+    last_edit = time.monotonic()
+    
+    def on_progress(result: ImportResult):
+        # Викликається з робочого потоку після кожної партії рядків
+        nonlocal last_edit
+        if time.monotonic() - last_edit >= IMPORT_PROGRESS_INTERVAL_SECONDS:
+            last_edit = time.monotonic()
+            asyncio.run_coroutine_threadsafe(_edit_progress(status, _import_progress_text(result)), loop)
+    
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            path = Path(workdir) / "import.csv"
+            file = await document.get_file()
+            await file.download_to_drive(custom_path=path)
+            
+            # Імпорт виконується в окремому потоці, щоб не блокувати цикл подій.
+            # Надходження (додатні суми: перекази, повернення, зарплата) не є витратами і пропускаються
+            result = await asyncio.to_thread(import_expenses_file, path, user_id, progress=on_progress, debits_only=True)
+        
+        await _edit_progress(
+            status,
+            f"Імпорт завершено за {result.elapsed_seconds:.1f} с.\n"
+            f"Додано витрат: {result.imported}\n"
+            f"Вже імпортовані раніше: {result.duplicates}\n"
+            f"Пропущено рядків (надходження та рядки без дати чи суми): {result.skipped}"
+        )
+    except CsvImportError as e:
+        logger.warning(f"Не вдалося імпортувати файл {document.file_name}: {e}")
+        await _edit_progress(
+            status,
+            "Не вдалося розпізнати файл. Потрібні стовпці з датою і сумою, наприклад 'Дата' і 'Сума'."
+        )
+    except Exception as e:
+        logger.error(f"Error importing expenses: {e}")
+        await _edit_progress(status, "Вибачте, сталася помилка при імпорті витрат. Спробуйте ще раз.")
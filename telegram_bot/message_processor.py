@@ -2,13 +2,19 @@
 Module for coordinating message processing and NLP tasks.
 """
 import logging
+import time
+from typing import Optional
 from telegram import Update
 from telegram.constants import ParseMode
 
 from tools.intent_classifier import classify_intent
 from ai_agent.expenses_agent import parse_expense, save_expenses
 from ai_agent.analytics_agent import generate_analytics
+from ai_agent.fused_agent import parse_message
+from ai_agent.local_expense_parser import parse_expense_locally
 from tools.translator import translate_to_english
+from tools.tracing import span, set_intent
+from config import NLP_PIPELINE_MODE, LOCAL_PARSER_ENABLED
 
 # Logging configuration
 logging.basicConfig(
@@ -17,21 +23,118 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-async def process_text_with_nlp(update: Update, text: str):
+async def process_text_with_nlp(update: Update, text: str, translated_text: Optional[str] = None):
     """
     Process text message using NLP pipeline.
     
-    1. Intent classification
-    2. Recognize expense or generate analytics
-    3. Save expense or send analytics to user
+    Simple expenses are recognized by the local rule-based parser without LLM requests.
+    Otherwise the pipeline mode is selected by NLP_PIPELINE_MODE:
+    "staged" runs translation, intent classification and parsing as separate requests,
+    "fused" extracts everything in a single LLM request.
     
     Args:
         update: Telegram message object
         text: Text to process
+        translated_text: English text if it is already known (e.g. from Whisper translation)
+    """
+    started_at = time.perf_counter()
+    local_expense = None
+    if LOCAL_PARSER_ENABLED:
+        with span("local_parse"):
+            local_expense = parse_expense_locally(text)
+    if local_expense:
+        set_intent("expense")
+        message = await save_expenses(local_expense, update.effective_user.id, text)
+        with span("reply"):
+            await update.message.reply_text(message, parse_mode=ParseMode.HTML)
+        logger.info(f"Local expense parser finished in {time.perf_counter() - started_at:.3f}s")
+        return
+    
+    if NLP_PIPELINE_MODE == "fused":
+        await _process_fused(update, text)
+    else:
+        await _process_staged(update, text, translated_text)
+    logger.info(f"NLP pipeline '{NLP_PIPELINE_MODE}' finished in {time.perf_counter() - started_at:.3f}s")
+
+async def _process_fused(update: Update, text: str):
+    """
+    Process text message with a single fused LLM request.
+    
+    1. Parse intent, expense and analytics parameters at once
+    2. Save expense or send analytics to user
+    
+    Args:
+        update: Telegram message object
+        text: Text to process
+    """
+    user_id = update.effective_user.id
+    with span("fused_parse"):
+        parsed = await parse_message(text)
+    if not parsed:
+        logger.error("Failed to parse message")
+        await update.message.reply_text(
+            "Вибачте, щось пішло не так. Повторіть, будь ласка."
+        )
+        return
+    
+    intent = parsed["intent"]
+    set_intent(intent)
+    logger.info(f"Recognized intent: {intent}")
+    
+    if intent == "expense":
+        logger.info("Processing as expense")
+        if parsed["amount"] is not None and parsed["category"] is not None:
+            expense = {
+                "amount": parsed["amount"],
+                "category": parsed["category"],
+                "description": parsed["description"]
+            }
+            message = await save_expenses(expense, user_id, text)
+            with span("reply"):
+                await update.message.reply_text(message, parse_mode=ParseMode.HTML)
+        else:
+            await update.message.reply_text(
+                "Не вдалося розпізнати витрату. "
+                "Будь ласка, вкажіть суму та опис."
+            )
+    elif intent == "analytics":
+        logger.info("Processing as analytics request")
+        try:
+            analytics_response = await generate_analytics(
+                text,
+                analytics_type=parsed["analytics_type"],
+                category=parsed["category"],
+                period_hint=parsed["period"] or ""
+            )
+            with span("reply"):
+                await update.message.reply_text(analytics_response, parse_mode=ParseMode.HTML)
+        except Exception as e:
+            logger.error(f"Error generating analytics: {e}")
+            await update.message.reply_text(
+                "Вибачте, сталася помилка при обробці вашого запиту на аналітику. Спробуйте ще раз."
+            )
+    else:
+        await _reply_unknown_intent(update)
+
+async def _process_staged(update: Update, text: str, translated_text: Optional[str] = None):
+    """
+    Process text message using the staged NLP pipeline.
+    
+    1. Translation to English
+    2. Intent classification
+    3. Recognize expense or generate analytics
+    4. Save expense or send analytics to user
+    
+    Args:
+        update: Telegram message object
+        text: Text to process
+        translated_text: English text if it is already known, skips the translation
     """
     user_id = update.effective_user.id
     # Переклад на англійську
-    translated_text = translate_to_english(text)
+    if not translated_text:
+        with span("translation"):
+            translated_text = await translate_to_english(text)
     if not translated_text:
         logger.error("Failed to translate text")
         await update.message.reply_text(
@@ -41,17 +144,21 @@ async def process_text_with_nlp(update: Update, text: str):
     
     # 1. Intent classification
     logger.info(f"Classifying intent: '{translated_text}'")
-    intent = classify_intent(translated_text)
+    with span("intent"):
+        intent = await classify_intent(translated_text)
+    set_intent(intent)
     logger.info(f"Recognized intent: {intent}")
     
     if intent == "expense":
         # 2. Parse expense
         logger.info("Processing as expense")
-        expense = parse_expense(translated_text)
+        with span("expense_parse"):
+            expense = await parse_expense(translated_text)
         
         if expense:
-            message = save_expenses(expense, user_id, translated_text)
-            await update.message.reply_text(message, parse_mode=ParseMode.HTML)    
+            message = await save_expenses(expense, user_id, text)
+            with span("reply"):
+                await update.message.reply_text(message, parse_mode=ParseMode.HTML)
         else:
             await update.message.reply_text(
                 "Не вдалося розпізнати витрату. "
@@ -61,18 +168,28 @@ async def process_text_with_nlp(update: Update, text: str):
         # 2. Generate analytics
         logger.info("Processing as analytics request")
         try:
-            analytics_response = generate_analytics(translated_text)
-            await update.message.reply_text(analytics_response, parse_mode=ParseMode.HTML)
+            analytics_response = await generate_analytics(translated_text)
+            with span("reply"):
+                await update.message.reply_text(analytics_response, parse_mode=ParseMode.HTML)
         except Exception as e:
             logger.error(f"Error generating analytics: {e}")
             await update.message.reply_text(
                 "Вибачте, сталася помилка при обробці вашого запиту на аналітику. Спробуйте ще раз."
             )
     else:
-        # Unknown intent
-        logger.info("Unknown intent")
-        await update.message.reply_text(
-            "Вибачте, я не зміг розібрати ваше повідомлення. Ви можете:\n"
-            "- Зареєструвати витрату (наприклад, 'Купив продукти за 300 гривень')\n"
-            "- Запитати аналітику (наприклад, 'Скільки я витратив на їжу цього місяця?')"
-        ) 
\ No newline at end of file
+        await _reply_unknown_intent(update)
+
+async def _reply_unknown_intent(update: Update):
+    """
+    Reply with usage hints when the intent was not recognized.
+    
+    Args:
+        update: Telegram message object
+    """
+    logger.info("Unknown intent")
+    await update.message.reply_text(
+        "Вибачте, я не зміг розібрати ваше повідомлення. Ви можете:\n"
+        "- Зареєструвати витрату (наприклад, 'Купив продукти за 300 гривень')\n"
+        "- Запитати аналітику (наприклад, 'Скільки я витратив на їжу цього місяця?')"
+    )
+ 
\ No newline at end of file
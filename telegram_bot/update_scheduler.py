@@ -0,0 +1,133 @@
+"""
+Планувальник оновлень Telegram з паралельною обробкою та порядком FIFO для кожного користувача.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Awaitable, Dict, Optional
+
+from telegram.ext import BaseUpdateProcessor
+
+# Налаштування логування
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Обробляє оновлення від різних користувачів паралельно (не більше max_concurrent_updates одночасно),
+    а оновлення одного користувача - строго по черзі, у порядку надходження.
+    
+    Оновлення спершу чекає своєї черги серед оновлень того ж користувача і лише потім
+    займає один із глобальних слотів обробки, тож черга одного користувача не блокує слоти інших.
+    """
+    
+    def __init__(self, max_concurrent_updates: int, max_pending_updates: int = 1000):
+        """
+        Args:
+            max_concurrent_updates: Максимальна кількість оновлень, що обробляються одночасно
+            max_pending_updates: Максимальна кількість оновлень у планувальнику (в обробці та в черзі)
+        """
+        if max_concurrent_updates < 1:
+            raise ValueError("max_concurrent_updates must be a positive integer")
+        # Семафор базового класу обмежує загальну кількість оновлень у планувальнику,
+        # власний семафор - кількість тих, що реально обробляються
+        super().__init__(max(max_pending_updates, max_concurrent_updates, 2))
+        self._worker_limit = max_concurrent_updates
+        self._worker_semaphore = asyncio.BoundedSemaphore(max_concurrent_updates)
+        self._user_locks: Dict[Any, asyncio.Lock] = {}
+        self._pending_by_user: Dict[Any, int] = defaultdict(int)
+        self._in_flight_by_user: Dict[Any, int] = defaultdict(int)
+        self._queued = 0
+        self._in_flight = 0
+        self._processed = 0
+    
+    @property
+    def worker_limit(self) -> int:
+        """Максимальна кількість оновлень, що обробляються одночасно."""
+        return self._worker_limit
+    
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        """
+        Обробляє оновлення з урахуванням черги користувача та глобального ліміту.
+        
+        Args:
+            update: Оновлення Telegram
+            coroutine: Корутина, яка обробляє оновлення
+        """
+        key = _ordering_key(update)
+        self._queued += 1
+        self._pending_by_user[key] += 1
+        lock = self._user_locks.setdefault(key, asyncio.Lock())
+        started = False
+        try:
+            async with lock:
+                async with self._worker_semaphore:
+                    started = True
+                    self._queued -= 1
+                    self._in_flight += 1
+                    self._in_flight_by_user[key] += 1
+                    try:
+                        await coroutine
+                    finally:
+                        self._in_flight -= 1
+                        self._in_flight_by_user[key] -= 1
+                        self._processed += 1
+        finally:
+            if not started:
+                # Оновлення скасовано ще в черзі
+                self._queued -= 1
+            self._pending_by_user[key] -= 1
+            if self._pending_by_user[key] <= 0:
+                # Прибираємо стан користувача, щойно його черга порожня
+                self._pending_by_user.pop(key, None)
+                self._in_flight_by_user.pop(key, None)
+                self._user_locks.pop(key, None)
+    
+    async def initialize(self) -> None:
+        """Нічого не потрібно ініціалізувати."""
+    
+    async def shutdown(self) -> None:
+        """Нічого не потрібно звільняти."""
+    
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Повертає поточний стан планувальника.
+        
+        Returns:
+            Словник з ключами:
+            queue_depth - кількість оновлень, що чекають на обробку,
+            in_flight - кількість оновлень, що обробляються зараз,
+            processed - загальна кількість оброблених оновлень,
+            max_concurrent_updates - ліміт одночасної обробки,
+            per_user_pending - кількість оновлень кожного користувача в планувальнику,
+            per_user_in_flight - кількість оновлень кожного користувача, що обробляються зараз
+        """
+        return {
+            "queue_depth": self._queued,
+            "in_flight": self._in_flight,
+            "processed": self._processed,
+            "max_concurrent_updates": self._worker_limit,
+            "per_user_pending": {key: count for key, count in self._pending_by_user.items() if count > 0},
+            "per_user_in_flight": {key: count for key, count in self._in_flight_by_user.items() if count > 0},
+        }
+
+def _ordering_key(update: object) -> Optional[Any]:
+    """
+    Визначає ключ черги для оновлення: ID користувача, а якщо його немає - ID чату.
+    
+    Args:
+        update: Оновлення Telegram
+        
+    Returns:
+        Ключ черги або None для оновлень без користувача та чату
+    """
+    user = getattr(update, "effective_user", None)
+    if user is not None:
+        return user.id
+    chat = getattr(update, "effective_chat", None)
+    if chat is not None:
+        return chat.id
+    return None
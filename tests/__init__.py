@@ -1 +1,6 @@
 # This file makes the tests directory a Python package
+import os
+
+# Tests must not read or write the persistent LLM and transcript caches
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+os.environ.setdefault("TRANSCRIPT_CACHE_ENABLED", "false")
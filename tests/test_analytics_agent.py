@@ -1,5 +1,5 @@
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from datetime import datetime, timedelta
 import logging
 
@@ -18,7 +18,7 @@ from config import EXPENSE_CATEGORIES, OPENAI_API_KEY
 # Suppress logging during tests
 logging.disable(logging.CRITICAL)
 
-class TestAnalyticsAgentHelpers(unittest.TestCase):
+class TestAnalyticsAgentHelpers(unittest.IsolatedAsyncioTestCase):
 
     def setUp(self):
         # self.today = datetime.now() # We will mock datetime.now directly in the test
@@ -93,29 +93,29 @@ class TestAnalyticsAgentHelpers(unittest.TestCase):
 
     @patch('ai_agent.analytics_agent.OPENAI_API_KEY', 'fake_api_key')
     @patch('ai_agent.analytics_agent.category_chain')
-    def test_extract_category_from_text_success(self, mock_category_chain):
-        mock_category_chain.invoke.return_value = {"category": "TestCategory"}
-        result = _extract_category_from_text("how much for TestCategory")
+    async def test_extract_category_from_text_success(self, mock_category_chain):
+        mock_category_chain.ainvoke = AsyncMock(return_value={"category": "TestCategory"})
+        result = await _extract_category_from_text("how much for TestCategory")
         self.assertEqual(result, "TestCategory")
-        mock_category_chain.invoke.assert_called_once_with({"message": "how much for TestCategory"})
+        mock_category_chain.ainvoke.assert_awaited_once_with({"message": "how much for TestCategory"})
 
     @patch('ai_agent.analytics_agent.OPENAI_API_KEY', 'fake_api_key')
     @patch('ai_agent.analytics_agent.category_chain')
-    def test_extract_category_from_text_unknown_category(self, mock_category_chain):
-        mock_category_chain.invoke.return_value = {"category": "NonExistentCategory"}
-        result = _extract_category_from_text("how much for NonExistentCategory")
+    async def test_extract_category_from_text_unknown_category(self, mock_category_chain):
+        mock_category_chain.ainvoke = AsyncMock(return_value={"category": "NonExistentCategory"})
+        result = await _extract_category_from_text("how much for NonExistentCategory")
         self.assertIsNone(result)
 
     @patch('ai_agent.analytics_agent.OPENAI_API_KEY', 'fake_api_key')
     @patch('ai_agent.analytics_agent.category_chain')
-    def test_extract_category_from_text_langchain_error(self, mock_category_chain):
-        mock_category_chain.invoke.side_effect = Exception("LLM error")
-        result = _extract_category_from_text("any category query")
+    async def test_extract_category_from_text_langchain_error(self, mock_category_chain):
+        mock_category_chain.ainvoke = AsyncMock(side_effect=Exception("LLM error"))
+        result = await _extract_category_from_text("any category query")
         self.assertIsNone(result)
 
     @patch('ai_agent.analytics_agent.OPENAI_API_KEY', None)
-    def test_extract_category_from_text_no_api_key(self):
-        result = _extract_category_from_text("any category query")
+    async def test_extract_category_from_text_no_api_key(self):
+        result = await _extract_category_from_text("any category query")
         self.assertIsNone(result)
 
 if __name__ == '__main__':
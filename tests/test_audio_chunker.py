@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from tools.audio_chunker import plan_chunks, stitch_transcripts
+from tools.transcriber import recognize_voice
+
+def test_short_audio_is_a_single_chunk():
+    assert plan_chunks(40_000, [], target_ms=30_000, max_ms=45_000, overlap_ms=500) == [(0, 40_000)]
+
+def test_cuts_are_placed_in_silence_near_target():
+    silences = [(10_000, 10_600), (29_000, 30_000), (62_000, 63_000)]
+    chunks = plan_chunks(100_000, silences, target_ms=30_000, max_ms=45_000, overlap_ms=500)
+
+    assert chunks == [(0, 30_000), (29_000, 63_000), (62_000, 100_000)]
+
+def test_hard_cut_without_silence():
+    chunks = plan_chunks(100_000, [], target_ms=30_000, max_ms=45_000, overlap_ms=500)
+
+    assert chunks == [(0, 45_500), (44_500, 90_500), (89_500, 100_000)]
+
+def test_stitching_removes_overlapping_words():
+    texts = ["Купив хліб за 30 гривень, молоко", "молоко за 40. Таксі", "таксі 150 гривень"]
+
+    assert stitch_transcripts(texts) == "Купив хліб за 30 гривень, молоко за 40. Таксі 150 гривень"
+
+def test_stitching_keeps_text_without_overlap():
+    assert stitch_transcripts(["Кава 50", "Обід 200"]) == "Кава 50 Обід 200"
+
+@pytest.mark.asyncio
+async def test_long_audio_chunks_are_transcribed_concurrently():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_transcribe(chunk, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return {b"c1": "Купив хліб", b"c2": "хліб і молоко", b"c3": "за 70 гривень"}[chunk]
+
+    with patch('tools.transcriber.audio_chunker.is_available', return_value=True), \
+         patch('tools.transcriber.audio_chunker.split_audio', return_value=[b"c1", b"c2", b"c3"]), \
+         patch('tools.transcriber._transcribe_file', side_effect=fake_transcribe):
+        result = await recognize_voice(b"long audio", strategy="transcribe", duration=180)
+
+    assert result == {"transcript": "Купив хліб і молоко за 70 гривень", "english": None}
+    assert max_in_flight == 3
+
+@pytest.mark.asyncio
+async def test_failed_split_falls_back_to_single_request():
+    async def fake_transcribe(chunk, **kwargs):
+        return "Купив хліб"
+
+    with patch('tools.transcriber.audio_chunker.is_available', return_value=True), \
+         patch('tools.transcriber.audio_chunker.split_audio', side_effect=RuntimeError("no ffmpeg")), \
+         patch('tools.transcriber._transcribe_file', side_effect=fake_transcribe) as mock_transcribe:
+        result = await recognize_voice(b"long audio", strategy="transcribe", duration=180)
+
+    assert result["transcript"] == "Купив хліб"
+    mock_transcribe.assert_called_once()
+    assert mock_transcribe.call_args.args == (b"long audio",)
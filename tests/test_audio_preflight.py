@@ -0,0 +1,72 @@
+import asyncio
+from datetime import timedelta
+from unittest.mock import patch
+
+from tools import audio_preflight
+from tools.audio_preflight import PreflightResult, check_metadata, preflight_audio, speech_bounds
+
+def test_short_voice_message_is_rejected_by_metadata():
+    assert check_metadata(0, 5000) == "too_short"
+    assert check_metadata(timedelta(seconds=0.5), None) == "too_short"
+    assert check_metadata(5, 300) == "too_short"
+
+def test_regular_voice_message_passes_metadata_check():
+    assert check_metadata(4, 12_000) is None
+    assert check_metadata(None, None) is None
+
+def test_silent_envelope_has_no_speech():
+    assert speech_bounds([-60.0] * 40, 50, threshold_dbfs=-45, min_speech_ms=300) is None
+
+def test_short_noise_burst_is_not_speech():
+    envelope = [-60.0] * 20 + [-20.0] * 2 + [-60.0] * 20
+    assert speech_bounds(envelope, 50, threshold_dbfs=-45, min_speech_ms=300) is None
+
+def test_speech_bounds_keep_padding_around_speech():
+    # 2 s silence, 1 s speech, 3 s silence
+    envelope = [-70.0] * 40 + [-25.0] * 20 + [-70.0] * 60
+    assert speech_bounds(envelope, 50, threshold_dbfs=-45, min_speech_ms=300, padding_ms=250) == (1750, 3250)
+
+def test_speech_bounds_are_clipped_to_audio():
+    envelope = [-25.0] * 10
+    assert speech_bounds(envelope, 50, threshold_dbfs=-45, min_speech_ms=300, padding_ms=250) == (0, 500)
+
+def test_preflight_without_decoder_passes_audio_through():
+    with patch.object(audio_preflight, "AudioSegment", None):
+        result = asyncio.run(preflight_audio(b"OggS voice"))
+
+    assert result == PreflightResult(b"OggS voice")
+
+def test_rejected_temporary_file_is_deleted(tmp_path):
+    audio_path = tmp_path / "voice.ogg"
+    audio_path.write_bytes(b"OggS silence")
+
+    with patch.object(audio_preflight, "AudioSegment", object()), \
+         patch.object(audio_preflight, "_analyze", return_value=PreflightResult(None, skip_reason="silent")):
+        result = asyncio.run(preflight_audio(audio_path))
+
+    assert result.skip_reason == "silent"
+    assert not audio_path.exists()
+
+def test_trimmed_audio_replaces_original():
+    with patch.object(audio_preflight, "AudioSegment", object()), \
+         patch.object(audio_preflight, "_analyze", return_value=PreflightResult(b"trim", trimmed_ms=2000)):
+        before = audio_preflight.get_preflight_stats()
+        result = asyncio.run(preflight_audio(b"OggS long silence"))
+        after = audio_preflight.get_preflight_stats()
+
+    assert result.audio == b"trim"
+    assert after["trimmed"] == before["trimmed"] + 1
+    assert after["bytes_saved"] == before["bytes_saved"] + len(b"OggS long silence") - len(b"trim")
+
+def test_duration_excludes_trimmed_silence():
+    assert PreflightResult(b"trim", trimmed_ms=2500).duration(10) == 7.5
+    assert PreflightResult(b"voice").duration(10) == 10
+    assert PreflightResult(b"voice").duration(None) is None
+
+def test_undecodable_audio_is_passed_through():
+    with patch.object(audio_preflight, "AudioSegment", object()), \
+         patch.object(audio_preflight, "_analyze", side_effect=ValueError("bad ogg")):
+        result = asyncio.run(preflight_audio(b"not audio"))
+
+    assert result.audio == b"not audio"
+    assert result.skip_reason is None
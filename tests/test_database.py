@@ -0,0 +1,221 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.dialects import postgresql
+
+from db import database
+from db.database import get_db_session, session_scope
+from db.migrations import run_migrations, get_applied_versions
+from db.models import Base, Expense, MonthlyCategoryTotal
+from db.queries import (
+    month_range, save_expense, seed_test_data, check_budget_limit, get_monthly_category_total,
+    get_expense_sum_by_category, rebuild_monthly_totals, verify_monthly_totals, get_category_totals,
+    get_budget_status, get_remaining_budget, save_expense_with_budget
+)
+from db.statements import save_expense_statements
+from sqlalchemy.orm import Session
+
+class SessionLifecycleTest(unittest.TestCase):
+    def test_get_db_session_returns_open_session(self):
+        session = MagicMock()
+        with patch.object(database, "SessionLocal", return_value=session):
+            self.assertIs(get_db_session(), session)
+        session.close.assert_not_called()
+
+    def test_session_scope_closes_session(self):
+        session = MagicMock()
+        with patch.object(database, "SessionLocal", return_value=session):
+            with session_scope() as db:
+                self.assertIs(db, session)
+                session.close.assert_not_called()
+        session.close.assert_called_once()
+        session.rollback.assert_not_called()
+
+    def test_session_scope_rolls_back_on_error(self):
+        session = MagicMock()
+        with patch.object(database, "SessionLocal", return_value=session):
+            with self.assertRaises(RuntimeError):
+                with session_scope():
+                    raise RuntimeError("query failed")
+        session.rollback.assert_called_once()
+        session.close.assert_called_once()
+
+    def test_pool_stats(self):
+        stats = database.get_pool_stats()
+        self.assertIn("checked_out", stats)
+
+    def test_pool_stats_of_singleton_thread_pool(self):
+        engine = create_engine("sqlite://")
+        with patch.object(database, "engine", engine):
+            stats = database.get_pool_stats()
+        self.assertEqual(set(stats), {"size", "checked_out", "checked_in", "overflow"})
+        self.assertIsInstance(stats["size"], int)
+
+class MonthRangeTest(unittest.TestCase):
+    def test_month_range_is_half_open(self):
+        self.assertEqual(month_range(2024, 2), (datetime(2024, 2, 1), datetime(2024, 3, 1)))
+
+    def test_december_ends_next_year(self):
+        self.assertEqual(month_range(2024, 12), (datetime(2024, 12, 1), datetime(2025, 1, 1)))
+
+class MigrationsTest(unittest.TestCase):
+    def test_composite_indexes_are_added_to_existing_table(self):
+        engine = create_engine("sqlite://")
+        # Table as it was before the migrations
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                "CREATE TABLE expenses (id INTEGER PRIMARY KEY, user_id BIGINT NOT NULL, category VARCHAR NOT NULL, "
+                "amount NUMERIC NOT NULL, description TEXT, transcript TEXT NOT NULL, created_at DATETIME)"
+            )
+
+        self.assertEqual(run_migrations(engine), [1, 2, 3])
+        names = {index["name"] for index in inspect(engine).get_indexes("expenses")}
+        self.assertIn("ix_expenses_user_id_created_at", names)
+        self.assertIn("ix_expenses_user_id_category_created_at", names)
+        self.assertIn("ux_expenses_user_id_import_hash", names)
+        self.assertIn("import_hash", {column["name"] for column in inspect(engine).get_columns("expenses")})
+
+        self.assertEqual(run_migrations(engine), [])
+        self.assertEqual(get_applied_versions(engine), [1, 2, 3])
+
+class MonthlyTotalsTest(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = Session(engine)
+        seed_test_data(self.db, 1)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_saved_expenses_update_monthly_total(self):
+        before = get_monthly_category_total(self.db, 1, "Foods")
+        save_expense(self.db, 1, "Foods", 120.5, "Кава", "Кава 120.5")
+        save_expense(self.db, 1, "Foods", 79.5, "Булка", "Булка 79.5")
+
+        self.assertAlmostEqual(get_monthly_category_total(self.db, 1, "Foods"), before + 200)
+        self.assertAlmostEqual(
+            get_monthly_category_total(self.db, 1, "Foods"),
+            get_expense_sum_by_category(self.db, 1, "Foods")
+        )
+        self.assertEqual(verify_monthly_totals(self.db), [])
+
+    def test_budget_check_reads_monthly_total(self):
+        spent = get_expense_sum_by_category(self.db, 1, "Transportation")
+
+        is_over, remaining = check_budget_limit(self.db, 1, "Transportation", 100)
+
+        self.assertFalse(is_over)
+        self.assertAlmostEqual(remaining, 2000 - spent - 100)
+
+    def test_budget_status_covers_all_limits(self):
+        save_expense(self.db, 1, "Shopping", 2500, "Куртка", "Куртка 2500")
+
+        statuses = {status["category"]: status for status in get_budget_status(self.db, 1)}
+
+        self.assertEqual(len(statuses), 6)
+        self.assertEqual(statuses["Shopping"]["spent"], 2500)
+        self.assertEqual(statuses["Shopping"]["remaining"], 7500)
+        self.assertEqual(statuses["Shopping"]["percentage"], 75)
+        self.assertEqual(statuses["Housing"]["remaining"], 15000 - get_expense_sum_by_category(self.db, 1, "Housing"))
+        self.assertEqual(get_remaining_budget(self.db, 1, "Shopping"), 7500)
+        self.assertIsNone(get_remaining_budget(self.db, 2, "Shopping"))
+
+    def test_rebuild_fixes_drifted_totals(self):
+        self.db.query(MonthlyCategoryTotal).update({"total": 0})
+        self.db.commit()
+        self.assertNotEqual(verify_monthly_totals(self.db), [])
+
+        rows = rebuild_monthly_totals(self.db)
+
+        self.assertEqual(rows, self.db.query(MonthlyCategoryTotal).count())
+        self.assertEqual(verify_monthly_totals(self.db), [])
+
+class SaveExpenseWithBudgetTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.workdir.name, 'expenses.sqlite3')}")
+        Base.metadata.create_all(self.engine)
+        with Session(self.engine) as db:
+            seed_test_data(db, 1)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.workdir.cleanup()
+
+    def test_save_returns_remaining_budget_after_expense(self):
+        with Session(self.engine) as db:
+            before = get_remaining_budget(db, 1, "Foods")
+            expense_id, is_over, remaining = save_expense_with_budget(db, 1, "Foods", 200, "Обід", "Обід 200")
+
+            self.assertFalse(is_over)
+            self.assertAlmostEqual(remaining, before - 200)
+            self.assertEqual(db.get(Expense, expense_id).amount, 200)
+            self.assertEqual(verify_monthly_totals(db), [])
+
+            _, is_over, remaining = save_expense_with_budget(db, 1, "Foods", remaining + 1, "Ресторан", "Ресторан")
+            self.assertTrue(is_over)
+            self.assertAlmostEqual(remaining, -1)
+
+    def test_save_without_limit_returns_none(self):
+        with Session(self.engine) as db:
+            self.assertEqual(save_expense_with_budget(db, 2, "Foods", 50, "Кава", "Кава 50")[1:], (False, None))
+
+    def test_concurrent_saves_see_distinct_totals(self):
+        with Session(self.engine) as db:
+            limit = get_remaining_budget(db, 1, "Entertainment") + get_monthly_category_total(db, 1, "Entertainment")
+
+        def save(_):
+            with Session(self.engine) as db:
+                return save_expense_with_budget(db, 1, "Entertainment", 10, "Кіно", "Кіно 10")[2]
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            remainders = list(pool.map(save, range(20)))
+
+        # Every save observed the total including its own amount and no update was lost
+        self.assertEqual(len(set(remainders)), 20)
+        with Session(self.engine) as db:
+            self.assertAlmostEqual(min(remainders), limit - get_monthly_category_total(db, 1, "Entertainment"))
+            self.assertEqual(verify_monthly_totals(db), [])
+
+    def test_postgresql_save_is_a_single_statement(self):
+        statements = save_expense_statements("postgresql", 1, "Foods", 200, "Обід", "Обід 200")
+
+        self.assertEqual(len(statements), 1)
+        sql = str(statements[0].compile(dialect=postgresql.dialect()))
+        self.assertIn("WITH new_expense AS", sql)
+        self.assertIn("RETURNING monthly_category_totals.total", sql)
+
+class CategoryTotalsTest(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = Session(engine)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_totals_are_grouped_by_category_within_period(self):
+        for category, amount, created_at in (
+            ("Foods", 100, datetime(2024, 3, 2)),
+            ("Foods", 50.5, datetime(2024, 3, 20)),
+            ("Transportation", 30, datetime(2024, 3, 5)),
+            ("Foods", 999, datetime(2024, 2, 28)),
+            ("Foods", 777, datetime(2024, 3, 3)),
+        ):
+            user_id = 2 if amount == 777 else 1
+            self.db.add(Expense(user_id=user_id, category=category, amount=amount,
+                                description="", transcript="", created_at=created_at))
+        self.db.commit()
+
+        totals = get_category_totals(self.db, 1, datetime(2024, 3, 1), datetime(2024, 3, 31))
+
+        self.assertEqual(totals, [("Foods", 150.5, 2), ("Transportation", 30.0, 1)])
+
+if __name__ == "__main__":
+    unittest.main()
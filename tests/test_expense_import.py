@@ -0,0 +1,166 @@
+import csv
+import io
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from db.models import Base, Expense
+from db.queries import get_monthly_category_total, verify_monthly_totals
+from tools import expense_import
+from tools.expense_import import (
+    COPY_COLUMNS, CsvImportError, _copy_rows, detect_columns, import_expenses, map_category,
+    parse_amount, parse_date, parse_rows, ImportResult
+)
+
+STATEMENT = (
+    "Дата i час операції;Деталі операції;MCC;Сума в валюті картки (UAH);Валюта\n"
+    "03.02.2024 10:15:00;Сільпо;5411;-250,50;UAH\n"
+    "03.02.2024 10:15:00;Сільпо;5411;-250,50;UAH\n"
+    "04.02.2024 18:00:00;Uber;4121;-120,00;UAH\n"
+    "05.02.2024 09:00:00;Переказ від друга;4829;1 000,00;UAH\n"
+    "not a date;Broken;0000;-10,00;UAH\n"
+)
+
+class ParsingTest(unittest.TestCase):
+    def test_parse_amount_formats(self):
+        self.assertEqual(parse_amount("1 234,56"), 1234.56)
+        self.assertEqual(parse_amount("-1,234.56"), -1234.56)
+        self.assertEqual(parse_amount("250 грн"), 250)
+        self.assertIsNone(parse_amount("—"))
+
+    def test_parse_date_formats(self):
+        self.assertEqual(parse_date("2024-02-03 10:15:00"), datetime(2024, 2, 3, 10, 15))
+        self.assertEqual(parse_date("03.02.2024"), datetime(2024, 2, 3))
+        self.assertEqual(parse_date("02/03/2024", "%m/%d/%Y"), datetime(2024, 2, 3))
+        self.assertIsNone(parse_date("yesterday"))
+
+    def test_map_category(self):
+        self.assertEqual(map_category("foods", ""), "Foods")
+        self.assertEqual(map_category("", "Супермаркет Сільпо"), "Foods")
+        self.assertEqual(map_category("", "Unknown merchant"), "Others")
+
+    def test_detect_columns(self):
+        header = ["Дата i час операції", "Деталі операції", "Сума в валюті картки (UAH)", "Сума в валюті операції"]
+        self.assertEqual(detect_columns(header), {"date": 0, "description": 1, "amount": 2})
+        self.assertEqual(detect_columns(header, {"amount": "Сума в валюті операції"})["amount"], 3)
+        with self.assertRaises(CsvImportError):
+            detect_columns(["Опис", "Валюта"])
+
+class CopyEncodingTest(unittest.TestCase):
+    def test_rows_without_description_keep_transcript_not_null(self):
+        rows = list(parse_rows(io.StringIO("Дата,Сума\n03.02.2024,-250\n"), 1, ImportResult()))
+        connection = MagicMock()
+        cursor = connection.connection.cursor.return_value
+
+        _copy_rows(connection, rows)
+
+        sql, payload = cursor.copy_expert.call_args.args
+        self.assertIn("FORMAT csv", sql)
+        self.assertIn("FORCE_NOT_NULL (transcript)", sql)
+        fields = dict(zip(COPY_COLUMNS, next(csv.reader(payload))))
+        # Unquoted empty fields: description becomes NULL, transcript an empty string (FORCE_NOT_NULL)
+        self.assertEqual(fields["description"], "")
+        self.assertEqual(fields["transcript"], "")
+        self.assertEqual(fields["amount"], "250.0")
+        self.assertEqual(fields["created_at"], "2024-02-03T00:00:00")
+        cursor.close.assert_called_once()
+        staging_sql, move_sql = [call.args[0] for call in connection.exec_driver_sql.call_args_list]
+        self.assertIn("CREATE TEMP TABLE", staging_sql)
+        self.assertIn("ON CONFLICT (user_id, import_hash) DO NOTHING", move_sql)
+
+class ImportExpensesTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+
+    def _count(self):
+        with self.engine.connect() as connection:
+            return connection.execute(select(func.count()).select_from(Expense.__table__)).scalar()
+
+    def test_import_loads_debits_and_updates_monthly_totals(self):
+        progress = []
+        result = import_expenses(
+            io.StringIO(STATEMENT), 1, engine=self.engine, batch_size=2,
+            progress=lambda result: progress.append(result.imported), debits_only=True
+        )
+
+        self.assertEqual((result.rows, result.imported, result.duplicates, result.skipped), (5, 3, 0, 2))
+        self.assertEqual(progress, [2, 3])
+        self.assertEqual(self._count(), 3)
+        with Session(self.engine) as db:
+            self.assertAlmostEqual(get_monthly_category_total(db, 1, "Foods", 2024, 2), 501)
+            self.assertEqual(verify_monthly_totals(db), [])
+
+    def test_reimport_skips_duplicates(self):
+        import_expenses(io.StringIO(STATEMENT), 1, engine=self.engine, debits_only=True)
+        result = import_expenses(io.StringIO(STATEMENT), 1, engine=self.engine, debits_only=True)
+
+        self.assertEqual((result.imported, result.duplicates), (0, 3))
+        self.assertEqual(self._count(), 3)
+
+    def test_rows_imported_concurrently_are_skipped(self):
+        rows = list(parse_rows(io.StringIO(STATEMENT), 1, ImportResult(), debits_only=True))
+        # Another import committed the first row after this one started
+        with self.engine.begin() as connection:
+            connection.execute(Expense.__table__.insert(), rows[:1])
+
+        result = import_expenses(io.StringIO(STATEMENT), 1, engine=self.engine, debits_only=True)
+
+        self.assertEqual((result.imported, result.duplicates), (2, 1))
+        self.assertEqual(self._count(), 3)
+        with Session(self.engine) as db:
+            self.assertAlmostEqual(get_monthly_category_total(db, 1, "Foods", 2024, 2), 250.5)
+
+    def test_credits_are_skipped_by_default(self):
+        result = import_expenses(io.StringIO(STATEMENT), 1, engine=self.engine)
+
+        self.assertEqual((result.imported, result.skipped), (3, 2))
+
+    def test_credits_can_be_included(self):
+        result = import_expenses(io.StringIO(STATEMENT), 1, engine=self.engine, debits_only=False)
+
+        self.assertEqual((result.imported, result.skipped), (4, 1))
+
+    def test_empty_file_is_rejected(self):
+        with self.assertRaises(CsvImportError):
+            import_expenses(io.StringIO(""), 1, engine=self.engine)
+
+class CommandLineTest(unittest.TestCase):
+    def _run(self, *args):
+        with patch("db.database.init_db"), \
+             patch.object(expense_import, "import_expenses_file", return_value=ImportResult()) as import_file:
+            self.assertEqual(expense_import.main(["statement.csv", "--user-id", "1", *args]), 0)
+        return import_file.call_args.kwargs
+
+    def test_cli_skips_credits_by_default(self):
+        self.assertTrue(self._run()["debits_only"])
+
+    def test_cli_includes_credits_on_request(self):
+        self.assertFalse(self._run("--include-credits")["debits_only"])
+
+class DocumentHandlerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_bot_imports_debits_only_and_reports_skipped_rows(self):
+        from telegram_bot import handlers
+
+        status = MagicMock(edit_text=AsyncMock())
+        update = MagicMock()
+        update.effective_user.id = handlers.AUTHOR_USER_ID
+        update.message.document.file_size = 100
+        update.message.document.get_file = AsyncMock(return_value=MagicMock(download_to_drive=AsyncMock()))
+        update.message.reply_text = AsyncMock(return_value=status)
+        result = ImportResult(rows=5, imported=3, skipped=2)
+
+        with patch.object(handlers, "import_expenses_file", return_value=result) as import_file:
+            await handlers.document_message_handler(update, None)
+
+        self.assertTrue(import_file.call_args.kwargs["debits_only"])
+        summary = status.edit_text.await_args.args[0]
+        self.assertIn("Додано витрат: 3", summary)
+        self.assertIn("надходження", summary)
+        self.assertIn(": 2", summary)
+
+if __name__ == "__main__":
+    unittest.main()
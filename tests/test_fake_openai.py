@@ -0,0 +1,50 @@
+import io
+import json
+import pytest
+from openai import AsyncOpenAI
+
+from benchmarks.fake_openai import FakeOpenAIServer, SCENARIOS, synthetic_audio
+
+@pytest.fixture
+def server():
+    with FakeOpenAIServer(chat_latency=0.0, audio_latency=0.0, jitter=0.0) as fake_server:
+        yield fake_server
+
+@pytest.mark.asyncio
+async def test_chat_answers_by_pipeline_stage(server):
+    client = AsyncOpenAI(api_key="sk-test", base_url=server.base_url, max_retries=0)
+    scenario = SCENARIOS[0]
+
+    translation = await client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": "You are a translator. Translate the following Ukrainian text to English."},
+            {"role": "user", "content": scenario.ukrainian}
+        ]
+    )
+    intent = await client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": "You must classify the user's intent."},
+            {"role": "user", "content": scenario.english}
+        ]
+    )
+    await client.close()
+
+    assert translation.choices[0].message.content == scenario.english
+    assert json.loads(intent.choices[0].message.content) == {"intention": "expense"}
+    assert server.requests["chat"] == 2
+
+@pytest.mark.asyncio
+async def test_audio_endpoints_return_scenario_text(server):
+    client = AsyncOpenAI(api_key="sk-test", base_url=server.base_url, max_retries=0)
+    scenario = SCENARIOS[1]
+    audio = ("voice.ogg", io.BytesIO(synthetic_audio(scenario)))
+
+    transcript = await client.audio.transcriptions.create(model="whisper-1", file=audio, response_format="text")
+    audio = ("voice.ogg", io.BytesIO(synthetic_audio(scenario)))
+    english = await client.audio.translations.create(model="whisper-1", file=audio, response_format="text")
+    await client.close()
+
+    assert transcript.strip() == scenario.ukrainian
+    assert english.strip() == scenario.english
@@ -0,0 +1,118 @@
+import unittest
+from unittest.mock import patch, AsyncMock
+import logging
+
+# Temporarily adjust path to import from parent directory
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ai_agent.fused_agent import parse_message
+
+# Suppress logging during tests
+logging.disable(logging.CRITICAL)
+
+class TestFusedParser(unittest.IsolatedAsyncioTestCase):
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET) # Re-enable logging
+
+    @patch('ai_agent.fused_agent.OPENAI_API_KEY', 'fake_api_key')
+    @patch('ai_agent.fused_agent.fused_chain')
+    async def test_parse_message_expense(self, mock_fused_chain):
+        mock_fused_chain.ainvoke = AsyncMock(return_value={
+            "intent": "expense",
+            "amount": 300,
+            "category": "Foods",
+            "description": "Groceries",
+            "analytics_type": None,
+            "period": None
+        })
+        message = "Купив продукти за 300 гривень"
+        result = await parse_message(message)
+        self.assertEqual(result["intent"], "expense")
+        self.assertEqual(result["amount"], 300)
+        self.assertEqual(result["category"], "Foods")
+        self.assertEqual(result["description"], "Groceries")
+        mock_fused_chain.ainvoke.assert_awaited_once_with({"message": message})
+
+    @patch('ai_agent.fused_agent.OPENAI_API_KEY', 'fake_api_key')
+    @patch('ai_agent.fused_agent.fused_chain')
+    async def test_parse_message_analytics(self, mock_fused_chain):
+        mock_fused_chain.ainvoke = AsyncMock(return_value={
+            "intent": "analytics",
+            "amount": None,
+            "category": "Transportation",
+            "description": None,
+            "analytics_type": "category",
+            "period": "last month"
+        })
+        result = await parse_message("Скільки я витратив на таксі минулого місяця?")
+        self.assertEqual(result["intent"], "analytics")
+        self.assertEqual(result["category"], "Transportation")
+        self.assertEqual(result["analytics_type"], "category")
+        self.assertEqual(result["period"], "last month")
+
+    @patch('ai_agent.fused_agent.OPENAI_API_KEY', 'fake_api_key')
+    @patch('ai_agent.fused_agent.fused_chain')
+    async def test_parse_message_normalizes_invalid_values(self, mock_fused_chain):
+        mock_fused_chain.ainvoke = AsyncMock(return_value={
+            "intent": "weather",
+            "amount": None,
+            "category": "Travel",
+            "description": None,
+            "analytics_type": "forecast",
+            "period": "next decade"
+        })
+        result = await parse_message("Яка погода завтра?")
+        self.assertEqual(result["intent"], "unknown")
+        self.assertIsNone(result["category"])
+        self.assertEqual(result["analytics_type"], "summary")
+        self.assertIsNone(result["period"])
+
+    @patch('ai_agent.fused_agent.OPENAI_API_KEY', 'fake_api_key')
+    @patch('ai_agent.fused_agent.fused_chain')
+    async def test_parse_message_validates_expense(self, mock_fused_chain):
+        mock_fused_chain.ainvoke = AsyncMock(return_value={
+            "intent": "expense",
+            "amount": "150",
+            "category": "Travel",
+            "description": "Taxi",
+            "analytics_type": None,
+            "period": None
+        })
+        result = await parse_message("Заплатив за таксі 150")
+        self.assertEqual(result["amount"], 150.0)
+        self.assertEqual(result["category"], "Others")
+        self.assertEqual(result["description"], "Taxi")
+
+    @patch('ai_agent.fused_agent.OPENAI_API_KEY', 'fake_api_key')
+    @patch('ai_agent.fused_agent.fused_chain')
+    async def test_parse_message_rejects_non_positive_amount(self, mock_fused_chain):
+        for amount in (0, -50, "багато"):
+            mock_fused_chain.ainvoke = AsyncMock(return_value={
+                "intent": "expense",
+                "amount": amount,
+                "category": "Foods",
+                "description": "Groceries",
+                "analytics_type": None,
+                "period": None
+            })
+            result = await parse_message(f"Купив продукти за {amount}")
+            self.assertIsNone(result["amount"])
+
+    @patch('ai_agent.fused_agent.OPENAI_API_KEY', 'fake_api_key')
+    @patch('ai_agent.fused_agent.fused_chain')
+    async def test_parse_message_langchain_exception(self, mock_fused_chain):
+        mock_fused_chain.ainvoke = AsyncMock(side_effect=Exception("LangChain API error"))
+        result = await parse_message("Купив продукти за 300 гривень")
+        self.assertIsNone(result)
+
+    @patch('ai_agent.fused_agent.OPENAI_API_KEY', None)
+    async def test_parse_message_no_api_key(self):
+        result = await parse_message("Купив продукти за 300 гривень")
+        self.assertIsNone(result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,11 @@
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 import logging
 import json
 
 from tools.intent_classifier import classify_intent, IntentType
 
-class TestIntentClassifier(unittest.TestCase):
+class TestIntentClassifier(unittest.IsolatedAsyncioTestCase):
 
     def setUp(self):
         # Disable logging for most tests to keep output clean, can be enabled for specific tests
@@ -15,100 +15,77 @@ class TestIntentClassifier(unittest.TestCase):
         # Re-enable logging
         logging.disable(logging.NOTSET)
 
-    def test_classify_intent_expense_successful(self):
+    async def test_classify_intent_expense_successful(self):
         # Setup the mocks
         with patch('config.OPENAI_API_KEY', 'fake_key'):
-            # Create a mock for ChatOpenAI
-            mock_llm = MagicMock()
-            
-            # Create a mock response for the LLM
-            mock_response = MagicMock()
-            mock_response.content = '{"intention": "expense"}'
-            mock_llm.invoke.return_value = mock_response
-            
-            # Patch ChatOpenAI
-            with patch('tools.intent_classifier.ChatOpenAI', return_value=mock_llm):
-                # Patch JsonOutputParser.invoke to return the expected result
-                with patch('langchain_core.output_parsers.JsonOutputParser.invoke', return_value={"intention": "expense"}):
-                    # Call the function
-                    intent = classify_intent("I bought groceries for 20 dollars")
-                    
-                    # Assertions
-                    self.assertEqual(intent, "expense")
-
-    def test_classify_intent_analytics_successful(self):
+            # Patch the shared intent chain to return the expected result
+            with patch('tools.intent_classifier.intent_chain') as mock_intent_chain:
+                mock_intent_chain.ainvoke = AsyncMock(return_value={"intention": "expense"})
+
+                # Call the function
+                intent = await classify_intent("I bought groceries for 20 dollars")
+
+                # Assertions
+                self.assertEqual(intent, "expense")
+                mock_intent_chain.ainvoke.assert_awaited_once_with({"message": "I bought groceries for 20 dollars"})
+
+    async def test_classify_intent_analytics_successful(self):
         # Setup the mocks
         with patch('config.OPENAI_API_KEY', 'fake_key'):
-            # Create a mock for ChatOpenAI
-            mock_llm = MagicMock()
-            
-            # Create a mock response for the LLM
-            mock_response = MagicMock()
-            mock_response.content = '{"intention": "analytics"}'
-            mock_llm.invoke.return_value = mock_response
-            
-            # Patch ChatOpenAI
-            with patch('tools.intent_classifier.ChatOpenAI', return_value=mock_llm):
-                # Patch JsonOutputParser.invoke to return the expected result
-                with patch('langchain_core.output_parsers.JsonOutputParser.invoke', return_value={"intention": "analytics"}):
-                    # Call the function
-                    intent = classify_intent("How much did I spend on food last month?")
-                    
-                    # Assertions
-                    self.assertEqual(intent, "analytics")
-
-    def test_classify_intent_unknown_successful(self):
+            with patch('tools.intent_classifier.intent_chain') as mock_intent_chain:
+                mock_intent_chain.ainvoke = AsyncMock(return_value={"intention": "analytics"})
+
+                # Call the function
+                intent = await classify_intent("How much did I spend on food last month?")
+
+                # Assertions
+                self.assertEqual(intent, "analytics")
+
+    async def test_classify_intent_unknown_successful(self):
         # Setup the mocks
         with patch('config.OPENAI_API_KEY', 'fake_key'):
-            # Create a mock for ChatOpenAI
-            mock_llm = MagicMock()
-            
-            # Create a mock response for the LLM
-            mock_response = MagicMock()
-            mock_response.content = '{"intention": "unknown"}'
-            mock_llm.invoke.return_value = mock_response
-            
-            # Patch ChatOpenAI
-            with patch('tools.intent_classifier.ChatOpenAI', return_value=mock_llm):
-                # Patch JsonOutputParser.invoke to return the expected result
-                with patch('langchain_core.output_parsers.JsonOutputParser.invoke', return_value={"intention": "unknown"}):
-                    # Call the function
-                    intent = classify_intent("What is the weather like today?")
-                    
-                    # Assertions
-                    self.assertEqual(intent, "unknown")
-
-    def test_fallback_to_manual_parsing(self):
-        # Re-enable logging for this test to see what's happening
-        logging.disable(logging.NOTSET)
-        
+            with patch('tools.intent_classifier.intent_chain') as mock_intent_chain:
+                mock_intent_chain.ainvoke = AsyncMock(return_value={"intention": "unknown"})
+
+                # Call the function
+                intent = await classify_intent("What is the weather like today?")
+
+                # Assertions
+                self.assertEqual(intent, "unknown")
+
+    async def test_fallback_to_manual_parsing(self):
         # Setup the mocks to test the fallback mechanism
         with patch('config.OPENAI_API_KEY', 'fake_key'):
-            # Create a mock for ChatOpenAI
-            mock_llm = MagicMock()
-            
-            # Create a mock response for the LLM
+            # The output parser fails, the raw LLM response is parsed manually
             mock_response = MagicMock()
             mock_response.content = '{"intention": "expense"}'
-            mock_llm.invoke.return_value = mock_response
-            
-            # Patch ChatOpenAI to return our mock LLM
-            with patch('tools.intent_classifier.ChatOpenAI', return_value=mock_llm):
-                # We need to modify our approach to correctly simulate the fallback mechanism
-                # Instead of expecting the test to pass, let's update it to match the actual behavior
-                intent = classify_intent("I spent $50 on dinner")
-                
-                # Print the result for debugging
-                print(f"\nTest result: intent = {intent}\n")
-                
-                # Since we're not correctly simulating the fallback mechanism,
-                # let's update our expectation to match the actual behavior
-                # The function is returning 'unknown' because our mocking approach
-                # isn't correctly simulating how the fallback mechanism works
-                self.assertEqual(intent, "unknown")
-        
-        # Disable logging again
-        logging.disable(logging.CRITICAL)
+            with patch('tools.intent_classifier.intent_chain') as mock_intent_chain, \
+                 patch('tools.intent_classifier.fallback_chain') as mock_fallback_chain:
+                mock_intent_chain.ainvoke = AsyncMock(side_effect=ValueError("Invalid JSON"))
+                mock_fallback_chain.ainvoke = AsyncMock(return_value=mock_response)
+
+                intent = await classify_intent("I spent $50 on dinner")
+
+                self.assertEqual(intent, "expense")
+                mock_fallback_chain.ainvoke.assert_awaited_once()
+
+    async def test_fallback_with_plain_text_response(self):
+        with patch('config.OPENAI_API_KEY', 'fake_key'):
+            mock_response = MagicMock()
+            mock_response.content = 'Analytics'
+            with patch('tools.intent_classifier.intent_chain') as mock_intent_chain, \
+                 patch('tools.intent_classifier.fallback_chain') as mock_fallback_chain:
+                mock_intent_chain.ainvoke = AsyncMock(side_effect=ValueError("Invalid JSON"))
+                mock_fallback_chain.ainvoke = AsyncMock(return_value=mock_response)
+
+                intent = await classify_intent("Show my expenses")
+
+                self.assertEqual(intent, "analytics")
+
+    async def test_classify_intent_no_api_key(self):
+        with patch('config.OPENAI_API_KEY', None):
+            intent = await classify_intent("I bought groceries for 20 dollars")
+            self.assertEqual(intent, "unknown")
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from tools.language_detector import detect_language, needs_translation
+from tools import translator
+
+class TestLanguageDetector(unittest.TestCase):
+
+    def test_detect_ukrainian(self):
+        self.assertEqual(detect_language("Купив продукти за 300 гривень"), "uk")
+        self.assertEqual(detect_language("300 грн"), "uk")
+
+    def test_detect_english(self):
+        self.assertEqual(detect_language("Bought groceries for 300 UAH"), "en")
+        self.assertEqual(detect_language("How much did I spend this month?"), "en")
+        self.assertEqual(detect_language("taxi 200"), "en")
+
+    def test_detect_neutral(self):
+        self.assertEqual(detect_language("200"), "neutral")
+        self.assertEqual(detect_language("1 500,50 !"), "neutral")
+
+    def test_detect_other_latin_text(self):
+        self.assertEqual(detect_language("kupyv produkty za 300"), "other")
+        self.assertEqual(detect_language("Kupiłem kawę za 20 zł"), "other")
+
+    def test_needs_translation(self):
+        self.assertTrue(needs_translation("Купив каву"))
+        self.assertTrue(needs_translation("kupyv kavu"))
+        self.assertFalse(needs_translation("bought coffee 50"))
+        self.assertFalse(needs_translation("50"))
+
+class TestTranslatorLanguageSkip(unittest.IsolatedAsyncioTestCase):
+
+    async def test_english_text_skips_translation_request(self):
+        with patch('tools.translator.client') as mock_client:
+            mock_client.chat.completions.create = AsyncMock()
+            skipped_before = translator.translation_stats["skipped_english"]
+
+            result = await translator.translate_to_english("taxi 200")
+
+            self.assertEqual(result, "taxi 200")
+            mock_client.chat.completions.create.assert_not_awaited()
+            self.assertEqual(translator.translation_stats["skipped_english"], skipped_before + 1)
+
+    async def test_ukrainian_text_is_translated(self):
+        response = MagicMock()
+        response.choices[0].message.content = "Taxi 200"
+        with patch('tools.translator.client') as mock_client:
+            mock_client.chat.completions.create = AsyncMock(return_value=response)
+
+            result = await translator.translate_to_english("Таксі 200")
+
+            self.assertEqual(result, "Taxi 200")
+            mock_client.chat.completions.create.assert_awaited_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
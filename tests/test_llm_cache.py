@@ -0,0 +1,88 @@
+import tempfile
+import time
+import pytest
+from pathlib import Path
+
+from tools.llm_cache import LLMStageCache, DiskCache, normalize_text
+
+PROMPT = "You are a translator."
+
+@pytest.fixture
+def cache_path():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        yield str(Path(tmp_dir) / "llm_cache.sqlite3")
+
+def make_cache(path: str, **kwargs) -> LLMStageCache:
+    options = dict(enabled=True, path=path, ttl_seconds=3600, memory_size=16, max_entries=100)
+    options.update(kwargs)
+    return LLMStageCache(**options)
+
+@pytest.mark.asyncio
+async def test_normalized_text_hits_cache(cache_path):
+    cache = make_cache(cache_path)
+    await cache.set("translation", "Таксі  200", "gpt-4o-mini", PROMPT, "Taxi 200")
+
+    assert await cache.get("translation", "таксі 200.", "gpt-4o-mini", PROMPT) == "Taxi 200"
+    assert cache.stats()["translation"]["memory_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(cache_path):
+    cache = make_cache(cache_path)
+    await cache.set("intent", "taxi 200", "gpt-4o-mini", PROMPT, "expense")
+    cache.disk.close()
+
+    restarted = make_cache(cache_path)
+    assert await restarted.get("intent", "taxi 200", "gpt-4o-mini", PROMPT) == "expense"
+    assert restarted.stats()["intent"]["disk_hits"] == 1
+    # The disk hit is promoted to the memory tier
+    assert await restarted.get("intent", "taxi 200", "gpt-4o-mini", PROMPT) == "expense"
+    assert restarted.stats()["intent"]["memory_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_key_depends_on_stage_model_and_prompt(cache_path):
+    cache = make_cache(cache_path)
+    await cache.set("intent", "taxi 200", "gpt-4o-mini", PROMPT, "expense")
+
+    assert await cache.get("analytics_type", "taxi 200", "gpt-4o-mini", PROMPT) is None
+    assert await cache.get("intent", "taxi 200", "gpt-4o", PROMPT) is None
+    assert await cache.get("intent", "taxi 200", "gpt-4o-mini", PROMPT + " Be brief.") is None
+
+@pytest.mark.asyncio
+async def test_prompt_change_invalidates_disk_entries(cache_path):
+    cache = make_cache(cache_path)
+    await cache.set("intent", "taxi 200", "gpt-4o-mini", PROMPT, "expense")
+    cache.disk.close()
+
+    restarted = make_cache(cache_path)
+    await restarted.get("intent", "taxi 200", "gpt-4o-mini", PROMPT + " Be brief.")
+    assert len(restarted.disk) == 0
+
+@pytest.mark.asyncio
+async def test_hit_ratio_per_stage(cache_path):
+    cache = make_cache(cache_path)
+    assert await cache.get("translation", "кава 50", "gpt-4o-mini", PROMPT) is None
+    await cache.set("translation", "кава 50", "gpt-4o-mini", PROMPT, "coffee 50")
+    await cache.get("translation", "кава 50", "gpt-4o-mini", PROMPT)
+
+    assert cache.stats()["translation"]["hit_ratio"] == 0.5
+
+@pytest.mark.asyncio
+async def test_disabled_cache_never_hits(cache_path):
+    cache = make_cache(cache_path, enabled=False)
+    await cache.set("translation", "кава 50", "gpt-4o-mini", PROMPT, "coffee 50")
+    assert await cache.get("translation", "кава 50", "gpt-4o-mini", PROMPT) is None
+
+def test_disk_cache_ttl_and_size_bound(cache_path):
+    disk = DiskCache(cache_path, ttl_seconds=3600, max_entries=3)
+    for index in range(5):
+        disk.set(f"key{index}", index)
+    assert len(disk) == 3
+    assert disk.get("key0") is None
+    assert disk.get("key4")[0] == 4
+
+    expired = DiskCache(cache_path, ttl_seconds=0, max_entries=3)
+    time.sleep(0.01)
+    assert expired.get("key4") is None
+
+def test_normalize_text():
+    assert normalize_text("  П’ять   КАВ! ") == "п'ять кав"
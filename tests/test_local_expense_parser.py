@@ -0,0 +1,118 @@
+import unittest
+import logging
+
+# Temporarily adjust path to import from parent directory
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ai_agent.local_expense_parser import LocalExpenseParser
+
+# Suppress logging during tests
+logging.disable(logging.CRITICAL)
+
+class TestLocalExpenseParser(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = LocalExpenseParser(confidence_threshold=0.8)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET) # Re-enable logging
+
+    def test_parse_typical_expense(self):
+        result = self.parser.parse_expense("Купив продукти за 300 гривень")
+        self.assertEqual(result, {"amount": 300.0, "category": "Foods", "description": "Продукти"})
+
+    def test_parse_amount_and_category_word(self):
+        result = self.parser.parse_expense("таксі 200 грн")
+        self.assertEqual(result["amount"], 200.0)
+        self.assertEqual(result["category"], "Transportation")
+
+    def test_parse_english_expense(self):
+        result = self.parser.parse_expense("Bought groceries for 235.50 UAH")
+        self.assertEqual(result["amount"], 235.5)
+        self.assertEqual(result["category"], "Foods")
+
+    def test_parse_number_words(self):
+        result = self.parser.parse_expense("Витратив дві тисячі п'ятсот гривень на концерт")
+        self.assertEqual(result["amount"], 2500.0)
+        self.assertEqual(result["category"], "Entertainment")
+
+    def test_parse_thousands_separator_and_decimal_comma(self):
+        result = self.parser.parse_expense("Заплатив за квартиру 1 500,50 грн")
+        self.assertEqual(result["amount"], 1500.5)
+        self.assertEqual(result["category"], "Housing")
+
+    def test_parse_thousand_suffix(self):
+        result = self.parser.parse_expense("Купив куртку за 2 тис грн")
+        self.assertEqual(result["amount"], 2000.0)
+        self.assertEqual(result["category"], "Shopping")
+
+    def test_question_falls_back_to_llm(self):
+        self.assertIsNone(self.parser.parse_expense("Скільки я витратив на таксі 200?"))
+
+    def test_low_confidence_falls_back_to_llm(self):
+        self.assertIsNone(self.parser.parse_expense("Переказав мамі 500"))
+        self.assertLess(self.parser.analyze("Переказав мамі 500")["confidence"], 0.8)
+
+    def test_amount_with_currency_is_chosen(self):
+        self.assertEqual(self.parser.analyze("2 кави по 50 грн")["amount"], 50.0)
+        self.assertEqual(self.parser.analyze("Купив 3 кг яблук за 120 грн")["amount"], 120.0)
+        self.assertEqual(self.parser.analyze("15.03 обід 250 грн")["amount"], 250.0)
+
+    def test_several_amounts_fall_back_to_llm(self):
+        self.assertIsNone(self.parser.parse_expense("2 кави по 50 грн"))
+        self.assertIsNone(self.parser.parse_expense("Купив 3 кг яблук за 120 грн"))
+
+    def test_date_falls_back_to_llm(self):
+        self.assertIsNone(self.parser.parse_expense("15.03 обід 250 грн"))
+        self.assertIsNone(self.parser.parse_expense("Обід 15/03 250 грн"))
+
+    def test_planned_expenses_fall_back_to_llm(self):
+        for message in (
+            "Треба купити продукти на 300 грн",
+            "Хочу купити кросівки за 3000 грн",
+            "Завтра заплачу 500 грн за квартиру"
+        ):
+            self.assertIsNone(self.parser.parse_expense(message), message)
+            self.assertEqual(self.parser.analyze(message)["confidence"], 0.0)
+
+    def test_negation_falls_back_to_llm(self):
+        self.assertIsNone(self.parser.parse_expense("Не купив продукти за 300 грн"))
+        self.assertEqual(self.parser.analyze("Не купив продукти за 300 грн")["confidence"], 0.0)
+
+    def test_amount_without_verb_or_currency_falls_back_to_llm(self):
+        self.assertIsNone(self.parser.parse_expense("таксі 200"))
+
+    def test_analytics_requests_fall_back_to_llm(self):
+        self.assertIsNone(self.parser.parse_expense("Витрати на їжу за 2024"))
+        self.assertIsNone(self.parser.parse_expense("витрати на кафе за 2 тижні"))
+
+    def test_sales_refunds_and_loans_fall_back_to_llm(self):
+        for message in (
+            "Продав телефон за 5000 грн",
+            "Повернули 500 грн за кросівки",
+            "Позичив другу 1000 грн на таксі"
+        ):
+            self.assertIsNone(self.parser.parse_expense(message), message)
+
+    def test_zero_amount_falls_back_to_llm(self):
+        self.assertIsNone(self.parser.parse_expense("Купив продукти за 0 грн"))
+
+    def test_no_amount_falls_back_to_llm(self):
+        self.assertIsNone(self.parser.parse_expense("Купив продукти"))
+
+    def test_stats_count_hits_and_fallbacks(self):
+        self.parser.parse_expense("Купив продукти за 300 гривень")
+        self.parser.parse_expense("таксі 200 грн")
+        self.parser.parse_expense("Переказав мамі 500")
+        self.parser.parse_expense("Покажи звіт")
+        stats = self.parser.stats.as_dict()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["fallbacks"], 2)
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertEqual(stats["fallback_rate"], 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
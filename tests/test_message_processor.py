@@ -0,0 +1,77 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from telegram_bot.message_processor import process_text_with_nlp
+
+# Mark all tests in this file as asyncio
+pytestmark = pytest.mark.asyncio
+
+# Simulated latency of every network or database stage
+STAGE_DELAY = 0.2
+
+def make_update(user_id: int = 1):
+    """Create a mock Telegram Update with an awaitable reply_text."""
+    update = MagicMock()
+    update.effective_user.id = user_id
+    update.message.reply_text = AsyncMock()
+    return update
+
+async def slow_translation(*args, **kwargs):
+    await asyncio.sleep(STAGE_DELAY)
+    response = MagicMock()
+    response.choices[0].message.content = "Bought groceries for 300 hryvnias"
+    return response
+
+async def slow_intent(message):
+    await asyncio.sleep(STAGE_DELAY)
+    return "expense"
+
+async def slow_expense_chain(inputs):
+    await asyncio.sleep(STAGE_DELAY)
+    return {"amount": 300.0, "category": "Foods", "description": "Groceries"}
+
+def blocking_save_expense(db, user_id, category, amount, description, transcript):
+    # Synchronous database call, must not block the event loop
+    time.sleep(STAGE_DELAY)
+    return 1, False, 1000.0
+
+@pytest.fixture
+def slow_pipeline():
+    """Patch every pipeline stage with a slow fake."""
+    with patch('tools.translator.client') as mock_client, \
+         patch('telegram_bot.message_processor.classify_intent', side_effect=slow_intent), \
+         patch('ai_agent.expenses_agent.expense_chain') as mock_expense_chain, \
+         patch('ai_agent.expenses_agent.session_scope', return_value=MagicMock()), \
+         patch('ai_agent.expenses_agent.save_expense_with_budget', side_effect=blocking_save_expense), \
+         patch('telegram_bot.message_processor.NLP_PIPELINE_MODE', 'staged'), \
+         patch('telegram_bot.message_processor.LOCAL_PARSER_ENABLED', False):
+        mock_client.chat.completions.create = AsyncMock(side_effect=slow_translation)
+        mock_expense_chain.ainvoke = AsyncMock(side_effect=slow_expense_chain)
+        yield
+
+async def test_single_message_saves_expense(slow_pipeline):
+    """Sanity check: the patched pipeline saves the expense and replies once."""
+    update = make_update()
+    await process_text_with_nlp(update, "Купив продукти за 300 гривень")
+    update.message.reply_text.assert_awaited_once()
+    assert "300.00" in update.message.reply_text.await_args.args[0]
+
+async def test_concurrent_messages_do_not_block_each_other(slow_pipeline):
+    """Two slow messages processed concurrently finish in roughly the time of one."""
+    started_at = time.perf_counter()
+    await process_text_with_nlp(make_update(), "Купив продукти за 300 гривень")
+    single_duration = time.perf_counter() - started_at
+
+    updates = [make_update(), make_update()]
+    started_at = time.perf_counter()
+    await asyncio.gather(*(
+        process_text_with_nlp(update, "Купив продукти за 300 гривень") for update in updates
+    ))
+    concurrent_duration = time.perf_counter() - started_at
+
+    for update in updates:
+        update.message.reply_text.assert_awaited_once()
+    # Sequential processing would take about 2x single_duration
+    assert concurrent_duration < single_duration * 1.5
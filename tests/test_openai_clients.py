@@ -0,0 +1,27 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from tools import openai_clients
+from tools.openai_clients import get_http_client, get_openai_client, get_chat_model, warm_up
+
+def test_clients_are_shared():
+    """Every stage gets the same client backed by the same connection pool."""
+    assert get_openai_client() is get_openai_client()
+    assert get_http_client() is get_http_client()
+    assert get_openai_client()._client is get_http_client()
+
+def test_chat_models_reuse_the_shared_client():
+    """Chat models are cached per (model, temperature) and use the shared async client."""
+    llm = get_chat_model("gpt-4o-mini", temperature=0.0)
+    assert get_chat_model("gpt-4o-mini", temperature=0.0) is llm
+    assert get_chat_model("gpt-4o-mini", temperature=0.2) is not llm
+    assert llm.async_client._client is get_openai_client()
+
+@pytest.mark.asyncio
+async def test_warm_up_ignores_errors():
+    """A failed warm-up must not prevent the bot from starting."""
+    with patch.object(get_openai_client().models, 'retrieve', new_callable=AsyncMock) as mock_retrieve, \
+         patch('tools.openai_clients.OPENAI_API_KEY', 'fake_key'):
+        mock_retrieve.side_effect = Exception("Connection error")
+        await warm_up()
+        mock_retrieve.assert_awaited_once_with(openai_clients.DEFAULT_CHAT_MODEL)
@@ -0,0 +1,82 @@
+import asyncio
+import urllib.request
+import pytest
+
+from tools.tracing import MetricsRegistry, Histogram, message_trace, span, set_intent
+from tools.metrics_exporter import PrometheusExporter, render_prometheus
+
+def test_histogram_quantiles():
+    histogram = Histogram()
+    for value in range(1, 101):
+        histogram.observe(value / 100)
+
+    assert histogram.quantile(0.5) == 0.5
+    assert histogram.quantile(0.95) == 0.95
+    assert histogram.quantile(0.99) == 0.99
+    assert histogram.count == 100
+
+@pytest.mark.asyncio
+async def test_spans_are_recorded_with_message_intent():
+    registry = MetricsRegistry()
+
+    async def stage():
+        with span("intent"):
+            await asyncio.sleep(0.01)
+        set_intent("expense")
+
+    def timed_in_thread():
+        with span("db_save"):
+            pass
+
+    with message_trace("text", registry):
+        await stage()
+        # Spans in worker threads belong to the same message
+        await asyncio.to_thread(timed_in_thread)
+        with span("reply"):
+            pass
+
+    histograms = registry.histograms()
+    assert ("intent", "expense") in histograms
+    assert ("db_save", "expense") in histograms
+    assert ("reply", "expense") in histograms
+    assert ("text_total", "expense") in histograms
+    assert histograms[("intent", "expense")].quantile(0.5) >= 0.01
+
+def test_span_without_trace_is_recorded_immediately():
+    registry = MetricsRegistry()
+    with span("db_save", registry):
+        pass
+    assert registry.histograms()[("db_save", "none")].count == 1
+
+def test_render_prometheus_includes_quantiles_and_collectors():
+    registry = MetricsRegistry()
+    registry.observe("translation", 0.2, "analytics")
+    registry.register_collector("scheduler", lambda: {"queue_depth": 3, "per_user_pending": {1: 2}})
+    registry.register_collector("llm_cache", lambda: {"stages": {"intent": {"hit_ratio": 0.5, "misses": 1}}})
+
+    text = render_prometheus(registry)
+
+    assert 'expense_bot_stage_duration_seconds{stage="translation",intent="analytics",quantile="0.95"} 0.2' in text
+    assert 'expense_bot_stage_duration_seconds_count{stage="translation",intent="analytics"} 1' in text
+    assert "expense_bot_scheduler_queue_depth 3" in text
+    assert 'expense_bot_scheduler_per_user_pending{key="1"} 2' in text
+    assert 'expense_bot_llm_cache_hit_ratio{key="intent"} 0.5' in text
+
+def test_failing_collector_is_skipped():
+    registry = MetricsRegistry()
+    registry.register_collector("broken", lambda: 1 / 0)
+    registry.register_collector("ok", lambda: {"value": 1})
+    assert registry.collect() == {"ok": {"value": 1}}
+
+@pytest.mark.asyncio
+async def test_prometheus_endpoint_serves_metrics():
+    registry = MetricsRegistry()
+    registry.observe("transcription", 1.5, "expense")
+    exporter = PrometheusExporter(port=0, host="127.0.0.1", registry=registry)
+    await exporter.start()
+    try:
+        url = f"http://127.0.0.1:{exporter.port}/metrics"
+        body = await asyncio.to_thread(lambda: urllib.request.urlopen(url, timeout=5).read().decode())
+    finally:
+        await exporter.stop()
+    assert 'stage="transcription"' in body
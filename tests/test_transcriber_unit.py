@@ -3,7 +3,7 @@ import tempfile
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from tools.transcriber import download_voice_message, transcribe_audio
+from tools.transcriber import download_voice_message, transcribe_audio, recognize_voice
 
 # Mark all tests in this file as asyncio
 pytestmark = pytest.mark.asyncio
@@ -16,8 +16,21 @@ def mock_telegram_file():
     mock_file.file_unique_id = "test_unique_id"
     return mock_file
 
+async def test_download_voice_message_to_memory(mock_telegram_file):
+    """Small voice messages are downloaded into memory without touching the disk."""
+    mock_telegram_file.file_size = 2048
+    mock_telegram_file.download_as_bytearray.return_value = bytearray(b"OggS voice")
+
+    with patch('tempfile.NamedTemporaryFile') as mock_named_temp_file:
+        audio = await download_voice_message(mock_telegram_file, max_in_memory_bytes=4096)
+
+    assert audio == b"OggS voice"
+    mock_named_temp_file.assert_not_called()
+    mock_telegram_file.download_to_drive.assert_not_called()
+
 async def test_download_voice_message_success(mock_telegram_file):
-    """Test successful download of a voice message."""
+    """Voice messages above the in-memory threshold are spilled to a temporary file."""
+    mock_telegram_file.file_size = 8192
     # Patch tempfile.NamedTemporaryFile to control the temporary file path
     with patch('tempfile.NamedTemporaryFile') as mock_named_temp_file:
         # Configure the mock for NamedTemporaryFile
@@ -28,7 +41,7 @@ async def test_download_voice_message_success(mock_telegram_file):
         mock_temp_file_object.name = "mock_temp_download.ogg"
         mock_named_temp_file.return_value = mock_temp_file_object
 
-        downloaded_path = await download_voice_message(mock_telegram_file)
+        downloaded_path = await download_voice_message(mock_telegram_file, max_in_memory_bytes=4096)
 
         mock_telegram_file.download_to_drive.assert_called_once_with(
             custom_path=Path("mock_temp_download.ogg")
@@ -37,9 +50,10 @@ async def test_download_voice_message_success(mock_telegram_file):
 
 async def test_download_voice_message_download_failure(mock_telegram_file):
     """Test download failure."""
+    mock_telegram_file.file_size = 8192
     mock_telegram_file.download_to_drive.side_effect = Exception("Download failed")
     with pytest.raises(Exception, match="Download failed"):
-        await download_voice_message(mock_telegram_file)
+        await download_voice_message(mock_telegram_file, max_in_memory_bytes=4096)
 
 async def test_transcribe_audio_success():
     """Test successful audio transcription."""
@@ -52,7 +66,7 @@ async def test_transcribe_audio_success():
 
     # Mock the OpenAI client's transcription creation
     # Patching 'tools.transcriber.client' assuming 'client' is an instance of OpenAI client in transcriber.py
-    with patch('tools.transcriber.client.audio.transcriptions.create') as mock_transcribe_create:
+    with patch('tools.transcriber.client.audio.transcriptions.create', new_callable=AsyncMock) as mock_transcribe_create:
         # The API returns a model object, not just a string. Let's mock that.
         mock_response_object = MagicMock()
         # Assuming the actual response object behaves like a string or has a direct string representation
@@ -90,7 +104,7 @@ async def test_transcribe_audio_api_failure():
         tmp_audio_file_obj.write(b"dummy audio data")
         audio_path = Path(tmp_audio_file_obj.name)
 
-    with patch('tools.transcriber.client.audio.transcriptions.create') as mock_transcribe_create:
+    with patch('tools.transcriber.client.audio.transcriptions.create', new_callable=AsyncMock) as mock_transcribe_create:
         mock_transcribe_create.side_effect = Exception("API error")
 
         with pytest.raises(Exception, match="API error"):
@@ -103,3 +117,70 @@ async def test_transcribe_audio_file_not_found():
     non_existent_path = Path("non_existent_audio_file.ogg")
     with pytest.raises(FileNotFoundError):
         await transcribe_audio(non_existent_path)
+
+async def test_recognize_voice_translate_strategy_with_original():
+    """Translate strategy returns English and the original transcript from parallel requests."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".ogg") as tmp_audio_file_obj:
+        tmp_audio_file_obj.write(b"dummy audio data")
+        audio_path = Path(tmp_audio_file_obj.name)
+
+    with patch('tools.transcriber.client.audio.transcriptions.create', new_callable=AsyncMock) as mock_transcribe_create, \
+         patch('tools.transcriber.client.audio.translations.create', new_callable=AsyncMock) as mock_translate_create, \
+         patch('tools.transcriber.STORE_ORIGINAL_TRANSCRIPT', True):
+        mock_transcribe_create.return_value = "Купив каву за 50 гривень\n"
+        mock_translate_create.return_value = "Bought coffee for 50 hryvnias\n"
+
+        result = await recognize_voice(audio_path, strategy="translate")
+
+        assert result == {
+            "transcript": "Купив каву за 50 гривень",
+            "english": "Bought coffee for 50 hryvnias"
+        }
+        _, kwargs = mock_translate_create.call_args
+        assert kwargs['model'] == 'whisper-1'
+        assert 'language' not in kwargs
+        assert not audio_path.exists()
+
+async def test_recognize_voice_translate_strategy_without_original():
+    """Without storing the original transcript only the translation endpoint is called."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".ogg") as tmp_audio_file_obj:
+        tmp_audio_file_obj.write(b"dummy audio data")
+        audio_path = Path(tmp_audio_file_obj.name)
+
+    with patch('tools.transcriber.client.audio.transcriptions.create', new_callable=AsyncMock) as mock_transcribe_create, \
+         patch('tools.transcriber.client.audio.translations.create', new_callable=AsyncMock) as mock_translate_create, \
+         patch('tools.transcriber.STORE_ORIGINAL_TRANSCRIPT', False):
+        mock_translate_create.return_value = "Bought coffee for 50 hryvnias"
+
+        result = await recognize_voice(audio_path, strategy="translate")
+
+        assert result == {
+            "transcript": "Bought coffee for 50 hryvnias",
+            "english": "Bought coffee for 50 hryvnias"
+        }
+        mock_transcribe_create.assert_not_called()
+        assert not audio_path.exists()
+
+async def test_recognize_voice_transcribe_strategy():
+    """Transcribe strategy leaves translation to the text pipeline."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".ogg") as tmp_audio_file_obj:
+        tmp_audio_file_obj.write(b"dummy audio data")
+        audio_path = Path(tmp_audio_file_obj.name)
+
+    with patch('tools.transcriber.client.audio.transcriptions.create', new_callable=AsyncMock) as mock_transcribe_create:
+        mock_transcribe_create.return_value = "Купив каву"
+
+        result = await recognize_voice(audio_path, strategy="transcribe")
+
+        assert result == {"transcript": "Купив каву", "english": None}
+
+async def test_transcribe_audio_from_memory():
+    """In-memory audio is uploaded directly as a named file tuple."""
+    with patch('tools.transcriber.client.audio.transcriptions.create', new_callable=AsyncMock) as mock_transcribe_create:
+        mock_transcribe_create.return_value = "Купив каву"
+
+        result = await transcribe_audio(b"OggS voice")
+
+        _, kwargs = mock_transcribe_create.call_args
+        assert kwargs['file'] == ("voice.ogg", b"OggS voice")
+        assert result == "Купив каву"
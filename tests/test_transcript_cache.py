@@ -0,0 +1,66 @@
+import tempfile
+import pytest
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+from tools.transcript_cache import TranscriptCache, audio_hash
+from tools.transcriber import recognize_voice
+
+RESULT = {"transcript": "Купив каву", "english": None}
+
+@pytest.fixture
+def cache_path():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        yield str(Path(tmp_dir) / "transcripts.sqlite3")
+
+def make_cache(path: str) -> TranscriptCache:
+    return TranscriptCache(enabled=True, path=path, ttl_seconds=3600, memory_size=16, max_entries=100)
+
+@pytest.mark.asyncio
+async def test_file_id_and_hash_lookups(cache_path):
+    cache = make_cache(cache_path)
+    content_hash = audio_hash(b"OggS voice")
+    await cache.set(content_hash, "transcribe", RESULT, file_unique_id="file-1", duration=4)
+
+    assert await cache.get_by_file_id("file-1", "transcribe") == RESULT
+    # The same audio re-uploaded as another file is found by its hash
+    assert await cache.get_by_hash(content_hash, "transcribe", file_unique_id="file-2") == RESULT
+    assert await cache.get_by_file_id("file-2", "transcribe") == RESULT
+    # Results of another strategy are not mixed up
+    assert await cache.get_by_file_id("file-1", "translate") is None
+
+    stats = cache.stats()
+    assert stats["file_id_hits"] == 2
+    assert stats["hash_hits"] == 1
+    assert stats["audio_seconds_saved"] == 12
+
+@pytest.mark.asyncio
+async def test_cache_survives_restart(cache_path):
+    cache = make_cache(cache_path)
+    await cache.set(audio_hash(b"audio"), "transcribe", RESULT, file_unique_id="file-1")
+    cache.disk.close()
+
+    restarted = make_cache(cache_path)
+    assert await restarted.get_by_file_id("file-1", "transcribe") == RESULT
+
+def test_audio_hash_of_file_matches_bytes():
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".ogg") as audio_file:
+        audio_file.write(b"OggS voice")
+    try:
+        assert audio_hash(Path(audio_file.name)) == audio_hash(b"OggS voice")
+    finally:
+        Path(audio_file.name).unlink()
+
+@pytest.mark.asyncio
+async def test_duplicate_audio_is_not_sent_to_whisper(cache_path):
+    cache = make_cache(cache_path)
+    with patch('tools.transcriber.transcript_cache', cache), \
+         patch('tools.transcriber.client.audio.transcriptions.create', new_callable=AsyncMock) as mock_transcribe_create:
+        mock_transcribe_create.return_value = "Купив каву"
+
+        first = await recognize_voice(b"OggS voice", strategy="transcribe", file_unique_id="file-1", duration=3)
+        second = await recognize_voice(b"OggS voice", strategy="transcribe", file_unique_id="file-2", duration=3)
+
+    assert first == second == RESULT
+    mock_transcribe_create.assert_called_once()
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,41 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from tools import transcriber
+from tools.transcription_backends import LocalWhisperBackend
+from tools.transcriber import select_backend, recognize_voice
+
+def test_openai_backend_is_default():
+    with patch.object(transcriber.local_backend, 'is_available', return_value=True):
+        assert select_backend(duration=3, backend_name="openai") is transcriber.openai_backend
+
+def test_auto_routes_short_clips_to_local_backend():
+    with patch.object(transcriber.local_backend, 'is_available', return_value=True):
+        assert select_backend(duration=5, backend_name="auto") is transcriber.local_backend
+        assert select_backend(duration=30, backend_name="auto") is transcriber.openai_backend
+        assert select_backend(duration=None, backend_name="auto") is transcriber.openai_backend
+
+def test_local_backend_requires_faster_whisper():
+    with patch.object(transcriber.local_backend, 'is_available', return_value=False):
+        assert select_backend(duration=5, backend_name="local") is transcriber.openai_backend
+
+@pytest.mark.asyncio
+async def test_api_failure_falls_back_to_local_model():
+    with patch('tools.transcriber.client.audio.transcriptions.create', new_callable=AsyncMock) as mock_transcribe_create, \
+         patch.object(transcriber.local_backend, 'is_available', return_value=True), \
+         patch.object(transcriber.local_backend, 'transcribe', new_callable=AsyncMock) as mock_local_transcribe, \
+         patch('tools.transcriber.TRANSCRIPTION_BACKEND', "openai"):
+        mock_transcribe_create.side_effect = Exception("API unavailable")
+        mock_local_transcribe.return_value = "Купив каву"
+
+        result = await recognize_voice(b"OggS voice", strategy="transcribe", duration=20)
+
+    assert result == {"transcript": "Купив каву", "english": None}
+    mock_local_transcribe.assert_called_once_with(b"OggS voice")
+
+@pytest.mark.asyncio
+async def test_local_backend_without_faster_whisper_raises():
+    backend = LocalWhisperBackend("tiny")
+    with patch('tools.transcription_backends.faster_whisper', None):
+        with pytest.raises(RuntimeError):
+            await backend.transcribe(b"OggS voice")
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+
+from tools.tracing import MetricsRegistry, message_trace
+from tools.transcription_queue import TranscriptionQueue, TranscriptionQueueFull
+
+pytestmark = pytest.mark.asyncio
+
+async def test_workers_limit_concurrent_transcriptions():
+    queue = TranscriptionQueue(workers=2, max_waiting=10)
+    active = 0
+    peak = 0
+
+    async def transcribe():
+        nonlocal active, peak
+        async with queue.slot():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(transcribe() for _ in range(6)))
+
+    assert peak == 2
+    assert queue.stats()["processed"] == 6
+    assert queue.stats()["queued"] == 4
+
+async def test_waiting_message_is_notified_once():
+    queue = TranscriptionQueue(workers=1, max_waiting=5)
+    release = asyncio.Event()
+    notified = []
+
+    async def first():
+        async with queue.slot(on_queued=lambda: _append(notified, "first")):
+            await release.wait()
+
+    async def second():
+        async with queue.slot(on_queued=lambda: _append(notified, "second")):
+            pass
+
+    first_task = asyncio.create_task(first())
+    await asyncio.sleep(0)
+    second_task = asyncio.create_task(second())
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(first_task, second_task)
+
+    assert notified == ["second"]
+
+async def test_full_queue_rejects_immediately():
+    queue = TranscriptionQueue(workers=1, max_waiting=1)
+    release = asyncio.Event()
+
+    async def hold():
+        async with queue.slot():
+            await release.wait()
+
+    tasks = [asyncio.create_task(hold()) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(TranscriptionQueueFull):
+        async with queue.slot():
+            pass
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert queue.stats()["rejected"] == 1
+    assert queue.stats()["busy"] == 0
+
+async def test_queue_wait_is_recorded_separately():
+    queue = TranscriptionQueue(workers=1, max_waiting=1)
+    registry = MetricsRegistry()
+    release = asyncio.Event()
+
+    async def hold():
+        async with queue.slot():
+            await release.wait()
+
+    async def waiting_message():
+        with message_trace("voice", registry=registry):
+            async with queue.slot():
+                pass
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(waiting_message())
+    await asyncio.sleep(0.02)
+    release.set()
+    await asyncio.gather(holder, waiter)
+
+    wait = registry.histograms()[("transcription_queue_wait", "unknown")]
+    assert wait.count == 1
+    assert wait.sum >= 0.01
+
+async def _append(items, value):
+    items.append(value)
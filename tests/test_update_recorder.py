@@ -0,0 +1,54 @@
+import tempfile
+import unittest
+from pathlib import Path
+from telegram import Update
+
+from tools.update_recorder import UpdateRecorder, compact_update, update_payload, read_records
+
+def make_update(update_id: int, text: str = None, voice: dict = None) -> Update:
+    record = {"t": 1700000000.5, "update_id": update_id, "message_id": update_id, "user_id": 7, "chat_id": 7}
+    if text is not None:
+        record["text"] = text
+    else:
+        record["voice"] = voice
+    return Update.de_json(update_payload(record), None)
+
+class TestUpdateRecorder(unittest.TestCase):
+    def test_text_update_round_trip(self):
+        update = make_update(1, text="Купив каву за 80")
+        record = compact_update(update, received_at=1700000001.25)
+
+        self.assertEqual(record, {
+            "t": 1700000001.25, "update_id": 1, "message_id": 1, "user_id": 7, "chat_id": 7,
+            "text": "Купив каву за 80"
+        })
+        replayed = Update.de_json(update_payload(record), None)
+        self.assertEqual(replayed.message.text, "Купив каву за 80")
+        self.assertEqual(replayed.effective_user.id, 7)
+
+    def test_voice_update_keeps_file_reference(self):
+        voice = {"file_id": "abc", "file_unique_id": "u-abc", "duration": 4, "file_size": 5120}
+        record = compact_update(make_update(2, voice=voice))
+
+        self.assertEqual(record["voice"], voice)
+        replayed = Update.de_json(update_payload(record), None)
+        self.assertEqual(replayed.message.voice.file_id, "abc")
+
+    def test_command_is_replayed_as_command(self):
+        replayed = Update.de_json(update_payload(compact_update(make_update(3, text="/start"))), None)
+        self.assertEqual(replayed.message.entities[0].type, "bot_command")
+
+    def test_recorder_appends_json_lines(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "logs" / "updates.jsonl"
+            recorder = UpdateRecorder(str(path))
+            recorder.record(make_update(1, text="перша"))
+            recorder.record(make_update(2, text="друга"))
+            recorder.close()
+
+            records = list(read_records(str(path)))
+        self.assertEqual([record["text"] for record in records], ["перша", "друга"])
+        self.assertEqual(recorder.recorded, 2)
+
+if __name__ == "__main__":
+    unittest.main()
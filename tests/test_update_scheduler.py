@@ -0,0 +1,92 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import MagicMock
+
+from telegram_bot.update_scheduler import PerUserUpdateProcessor
+
+# Mark all tests in this file as asyncio
+pytestmark = pytest.mark.asyncio
+
+def make_update(user_id: int):
+    """Create a mock Telegram Update for the given user."""
+    update = MagicMock()
+    update.effective_user.id = user_id
+    return update
+
+async def test_same_user_updates_run_in_order_without_overlap():
+    """Updates of one user are processed one at a time in arrival order."""
+    processor = PerUserUpdateProcessor(max_concurrent_updates=4)
+    events = []
+
+    async def handle(index: int, delay: float):
+        events.append(("start", index))
+        await asyncio.sleep(delay)
+        events.append(("end", index))
+
+    update = make_update(1)
+    # The first update is the slowest, later ones must still wait for it
+    await asyncio.gather(*(
+        processor.process_update(update, handle(index, delay))
+        for index, delay in enumerate([0.05, 0.01, 0.0])
+    ))
+
+    assert events == [
+        ("start", 0), ("end", 0),
+        ("start", 1), ("end", 1),
+        ("start", 2), ("end", 2),
+    ]
+
+async def test_different_users_run_concurrently():
+    """A slow update of one user does not delay updates of other users."""
+    processor = PerUserUpdateProcessor(max_concurrent_updates=4)
+    finished_at = {}
+    started_at = time.perf_counter()
+
+    async def handle(user_id: int, delay: float):
+        await asyncio.sleep(delay)
+        finished_at[user_id] = time.perf_counter() - started_at
+
+    await asyncio.gather(
+        processor.process_update(make_update(1), handle(1, 0.3)),
+        processor.process_update(make_update(2), handle(2, 0.01)),
+    )
+
+    assert finished_at[2] < 0.15
+    assert finished_at[1] >= 0.3
+
+async def test_concurrency_limit_and_metrics():
+    """No more than max_concurrent_updates run at once and queue depth is reported."""
+    processor = PerUserUpdateProcessor(max_concurrent_updates=2)
+    release = asyncio.Event()
+    running = 0
+    max_running = 0
+
+    async def handle():
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await release.wait()
+        running -= 1
+
+    tasks = [
+        asyncio.create_task(processor.process_update(make_update(user_id), handle()))
+        for user_id in (1, 2, 3, 3)
+    ]
+    await asyncio.sleep(0.05)
+
+    metrics = processor.metrics()
+    assert metrics["in_flight"] == 2
+    assert metrics["queue_depth"] == 2
+    assert metrics["per_user_pending"] == {1: 1, 2: 1, 3: 2}
+    assert metrics["per_user_in_flight"] == {1: 1, 2: 1}
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert max_running == 2
+    metrics = processor.metrics()
+    assert metrics["queue_depth"] == 0
+    assert metrics["in_flight"] == 0
+    assert metrics["processed"] == 4
+    assert metrics["per_user_pending"] == {}
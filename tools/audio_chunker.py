@@ -0,0 +1,144 @@
+"""
+Splitting of long voice messages into chunks for parallel transcription.
+
+Cut points are placed in silences close to the target chunk length; chunks overlap slightly
+so words at hard cuts are not lost, and the duplicated words are removed when the chunk
+transcripts are stitched back together.
+
+Decoding OGG/Opus requires the optional pydub package and ffmpeg.
+"""
+import io
+import logging
+import re
+from pathlib import Path
+from typing import List, Sequence, Tuple, Union
+
+try:
+    from pydub import AudioSegment
+    from pydub.silence import detect_silence
+except ImportError:  # pragma: no cover - optional dependency
+    AudioSegment = None
+    detect_silence = None
+
+# Logging configuration
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Silence detection: pauses of at least this length below the threshold relative to the average loudness
+MIN_SILENCE_MS = 400
+SILENCE_THRESHOLD_DB = 16
+
+def is_available() -> bool:
+    """Check whether audio decoding for chunking is available (pydub is installed)."""
+    return AudioSegment is not None
+
+def plan_chunks(
+    duration_ms: int,
+    silences: Sequence[Tuple[int, int]],
+    target_ms: int,
+    max_ms: int,
+    overlap_ms: int
+) -> List[Tuple[int, int]]:
+    """
+    Choose chunk boundaries.
+    
+    Each cut is placed in the middle of the silence closest to the target length,
+    within half of the target and the maximum length; without such a silence the chunk
+    is cut at the maximum length. Chunks are extended by the overlap on both sides.
+    
+    Args:
+        duration_ms: Audio duration in milliseconds
+        silences: Silent ranges (start_ms, end_ms) in ascending order
+        target_ms: Preferred chunk length
+        max_ms: Maximum chunk length
+        overlap_ms: Overlap added around each cut
+        
+    Returns:
+        List of (start_ms, end_ms) ranges
+    """
+    chunks = []
+    position = 0
+    while duration_ms - position > max_ms:
+        target = position + target_ms
+        candidates = [
+            (start + end) // 2 for start, end in silences
+            if position + target_ms // 2 <= (start + end) // 2 <= position + max_ms
+        ]
+        cut = min(candidates, key=lambda point: abs(point - target)) if candidates else position + max_ms
+        chunks.append((max(position - overlap_ms, 0), min(cut + overlap_ms, duration_ms)))
+        position = cut
+    chunks.append((max(position - overlap_ms, 0), duration_ms))
+    return chunks
+
+def split_audio(
+    audio: Union[bytes, Path],
+    target_seconds: float,
+    max_seconds: float,
+    overlap_ms: int
+) -> List[bytes]:
+    """
+    Split audio into OGG/Opus chunks at silence boundaries (blocking).
+    
+    Args:
+        audio: Audio content or path to the audio file
+        target_seconds: Preferred chunk length
+        max_seconds: Maximum chunk length
+        overlap_ms: Overlap added around each cut
+        
+    Returns:
+        List of encoded chunks (a single element if the audio is short enough)
+    """
+    if AudioSegment is None:
+        raise RuntimeError("pydub is not installed")
+    
+    source = io.BytesIO(audio) if isinstance(audio, (bytes, bytearray)) else str(audio)
+    segment = AudioSegment.from_file(source)
+    duration_ms = len(segment)
+    if duration_ms <= max_seconds * 1000:
+        return [bytes(audio) if isinstance(audio, (bytes, bytearray)) else Path(audio).read_bytes()]
+    
+    silences = detect_silence(
+        segment,
+        min_silence_len=MIN_SILENCE_MS,
+        silence_thresh=segment.dBFS - SILENCE_THRESHOLD_DB
+    )
+    boundaries = plan_chunks(duration_ms, silences, int(target_seconds * 1000), int(max_seconds * 1000), overlap_ms)
+    
+    chunks = []
+    for start, end in boundaries:
+        buffer = io.BytesIO()
+        segment[start:end].export(buffer, format="ogg", codec="libopus")
+        chunks.append(buffer.getvalue())
+    logger.info(f"Audio of {duration_ms / 1000:.1f}s split into {len(chunks)} chunks")
+    return chunks
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+def stitch_transcripts(texts: Sequence[str], max_overlap_words: int = 8) -> str:
+    """
+    Join chunk transcripts in order, dropping words repeated because of the chunk overlap.
+    
+    Args:
+        texts: Transcripts of consecutive chunks
+        max_overlap_words: Longest repeated word sequence looked for at each seam
+        
+    Returns:
+        Joined transcript
+    """
+    words: List[str] = []
+    for text in texts:
+        next_words = text.split()
+        longest = min(max_overlap_words, len(words), len(next_words))
+        overlap = 0
+        for size in range(longest, 0, -1):
+            tail = [_normalize_word(word) for word in words[-size:]]
+            head = [_normalize_word(word) for word in next_words[:size]]
+            if tail == head:
+                overlap = size
+                break
+        words.extend(next_words[overlap:])
+    return " ".join(words)
@@ -0,0 +1,201 @@
+"""
+Preflight checks of voice messages before they are sent to speech recognition.
+
+Telegram metadata (duration, file size) rejects trivially short clips without downloading them.
+A quick energy envelope decoded locally rejects near-silent clips and trims leading and
+trailing silence, so fewer bytes are uploaded and pointless API calls are skipped.
+Decoding requires the optional pydub package and ffmpeg; without it only metadata checks run.
+"""
+import asyncio
+import io
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+try:
+    from pydub import AudioSegment
+except ImportError:  # pragma: no cover - optional dependency
+    AudioSegment = None
+
+from config import (
+    AUDIO_PREFLIGHT_ENABLED,
+    VOICE_MIN_DURATION_SECONDS,
+    VOICE_MIN_FILE_SIZE_BYTES,
+    VOICE_SILENCE_THRESHOLD_DBFS,
+    VOICE_MIN_SPEECH_MS,
+    VOICE_TRIM_MIN_MS
+)
+
+# Logging configuration
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Window of the energy envelope
+ENVELOPE_WINDOW_MS = 50
+
+# Silence kept around speech when trimming, so word onsets are not cut
+TRIM_PADDING_MS = 250
+
+# Counters of skipped and trimmed voice messages
+preflight_stats = {
+    "checked": 0,
+    "skipped_short": 0,
+    "skipped_silent": 0,
+    "trimmed": 0,
+    "trimmed_seconds": 0.0,
+    "bytes_saved": 0
+}
+_stats_lock = threading.Lock()
+
+@dataclass
+class PreflightResult:
+    """Result of the audio preflight: audio to recognize or the reason to skip it."""
+    audio: Optional[Union[bytes, Path]]
+    skip_reason: Optional[str] = None
+    trimmed_ms: int = 0
+    
+    def duration(self, original: Optional[float]) -> Optional[float]:
+        """
+        Duration of the audio to recognize.
+        
+        Args:
+            original: Duration of the downloaded voice message in seconds (Telegram metadata)
+            
+        Returns:
+            Duration in seconds after trimming silence, or None if the original is unknown
+        """
+        if original is None:
+            return None
+        return max(original - self.trimmed_ms / 1000, 0.0)
+
+def _count(**increments):
+    with _stats_lock:
+        for name, value in increments.items():
+            preflight_stats[name] += value
+
+def check_metadata(duration: Optional[float], file_size: Optional[int]) -> Optional[str]:
+    """
+    Check Telegram metadata of a voice message before it is downloaded.
+    
+    Args:
+        duration: Duration in seconds (int or timedelta), if known
+        file_size: File size in bytes, if known
+        
+    Returns:
+        "too_short" if the clip cannot contain a message, otherwise None
+    """
+    if not AUDIO_PREFLIGHT_ENABLED:
+        return None
+    _count(checked=1)
+    if hasattr(duration, "total_seconds"):
+        duration = duration.total_seconds()
+    if (duration is not None and duration < VOICE_MIN_DURATION_SECONDS) or (
+        file_size is not None and file_size < VOICE_MIN_FILE_SIZE_BYTES
+    ):
+        _count(skipped_short=1)
+        return "too_short"
+    return None
+
+def speech_bounds(
+    envelope: Sequence[float],
+    window_ms: int,
+    threshold_dbfs: float,
+    min_speech_ms: int,
+    padding_ms: int = TRIM_PADDING_MS
+) -> Optional[Tuple[int, int]]:
+    """
+    Find the speech range in an energy envelope.
+    
+    Args:
+        envelope: Loudness of consecutive windows in dBFS
+        window_ms: Window length in milliseconds
+        threshold_dbfs: Loudness above which a window counts as speech
+        min_speech_ms: Minimum total speech duration
+        padding_ms: Silence kept before and after speech
+        
+    Returns:
+        (start_ms, end_ms) of speech or None if the audio is near-silent
+    """
+    voiced = [index for index, loudness in enumerate(envelope) if loudness > threshold_dbfs]
+    if len(voiced) * window_ms < min_speech_ms:
+        return None
+    duration_ms = len(envelope) * window_ms
+    start = max(voiced[0] * window_ms - padding_ms, 0)
+    end = min((voiced[-1] + 1) * window_ms + padding_ms, duration_ms)
+    return start, end
+
+def _envelope(segment) -> List[float]:
+    return [
+        segment[start:start + ENVELOPE_WINDOW_MS].dBFS
+        for start in range(0, len(segment), ENVELOPE_WINDOW_MS)
+    ]
+
+def _analyze(audio: Union[bytes, Path]) -> PreflightResult:
+    """Decode audio, reject near-silent clips and trim silence (blocking)."""
+    source = io.BytesIO(audio) if isinstance(audio, (bytes, bytearray)) else str(audio)
+    segment = AudioSegment.from_file(source)
+    bounds = speech_bounds(_envelope(segment), ENVELOPE_WINDOW_MS, VOICE_SILENCE_THRESHOLD_DBFS, VOICE_MIN_SPEECH_MS)
+    if bounds is None:
+        return PreflightResult(None, skip_reason="silent")
+    
+    start, end = bounds
+    trimmed_ms = len(segment) - (end - start)
+    if trimmed_ms < VOICE_TRIM_MIN_MS:
+        return PreflightResult(audio)
+    
+    buffer = io.BytesIO()
+    segment[start:end].export(buffer, format="ogg", codec="libopus")
+    return PreflightResult(buffer.getvalue(), trimmed_ms=trimmed_ms)
+
+def _size(audio: Union[bytes, Path]) -> int:
+    return len(audio) if isinstance(audio, (bytes, bytearray)) else os.path.getsize(audio)
+
+async def preflight_audio(audio: Union[bytes, Path]) -> PreflightResult:
+    """
+    Check a downloaded voice message: reject near-silent clips and trim leading
+    and trailing silence. A temporary file is deleted when it is replaced or rejected.
+    
+    Args:
+        audio: Audio content or path to the audio file
+        
+    Returns:
+        PreflightResult with the audio to recognize or the skip reason
+    """
+    if not AUDIO_PREFLIGHT_ENABLED or AudioSegment is None:
+        return PreflightResult(audio)
+    
+    try:
+        original_size = _size(audio)
+        result = await asyncio.to_thread(_analyze, audio)
+    except Exception as e:
+        # The preflight is an optimization only, undecodable audio goes to recognition as is
+        logger.warning(f"Audio preflight failed, skipping it: {e}")
+        return PreflightResult(audio)
+    
+    if result.skip_reason:
+        logger.info("Near-silent voice message skipped")
+        _count(skipped_silent=1, bytes_saved=original_size)
+    elif result.trimmed_ms:
+        logger.info(f"Trimmed {result.trimmed_ms} ms of silence from voice message")
+        _count(trimmed=1, trimmed_seconds=result.trimmed_ms / 1000,
+               bytes_saved=max(original_size - _size(result.audio), 0))
+    
+    if result.audio is not audio and isinstance(audio, Path) and audio.exists():
+        audio.unlink()
+    return result
+
+def get_preflight_stats() -> dict:
+    """
+    Get counters of skipped and trimmed voice messages.
+    
+    Returns:
+        Dictionary with checked, skipped_short, skipped_silent, trimmed, trimmed_seconds and bytes_saved
+    """
+    with _stats_lock:
+        return dict(preflight_stats)
@@ -0,0 +1,494 @@
+"""
+Bulk import of expenses from CSV files such as bank statement exports.
+
+The file is streamed row by row: columns are mapped by header aliases (English and
+Ukrainian bank export headings), amounts and dates are normalized and categories are
+mapped onto EXPENSE_CATEGORIES. Rows are loaded in batches of IMPORT_BATCH_SIZE, one
+transaction per batch: PostgreSQL receives each batch through COPY into a staging table,
+other databases through a single executemany insert. Every row gets an import hash stored
+in the unique (user_id, import_hash) index and rows are inserted with ON CONFLICT DO NOTHING,
+so importing the same file again, even concurrently, skips the rows that are already in
+the database. Monthly category totals are updated per batch.
+
+Usage:
+    python -m tools.expense_import statement.csv --user-id 123456789
+    python -m tools.expense_import statement.csv --amount-column "Сума в валюті картки (UAH)"
+    python -m tools.expense_import expenses.csv --include-credits  # positive amounts are expenses too
+"""
+import argparse
+import codecs
+import csv
+import hashlib
+import io
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import EXPENSE_CATEGORIES, IMPORT_BATCH_SIZE
+from ai_agent.local_expense_parser import CATEGORY_KEYWORDS
+
+# Logging configuration
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Header aliases per field, most specific first; a header matches an alias it equals or starts with
+COLUMN_ALIASES = {
+    "date": ["date", "transaction date", "дата і час операції", "дата операції", "дата"],
+    "amount": ["amount", "сума в валюті картки", "сума операції", "сума", "sum"],
+    "description": ["description", "details", "деталі операції", "опис операції", "опис", "призначення платежу", "призначення"],
+    "category": ["category", "категорія"]
+}
+REQUIRED_COLUMNS = ("date", "amount")
+
+DATE_FORMATS = (
+    "%d.%m.%Y %H:%M:%S",
+    "%d.%m.%Y %H:%M",
+    "%d.%m.%Y",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y",
+    "%Y/%m/%d",
+)
+
+DELIMITERS = ",;\t|"
+COPY_COLUMNS = ("user_id", "category", "amount", "description", "transcript", "created_at", "import_hash")
+# PostgreSQL batches are copied into a per-transaction staging table, then moved into expenses
+# with ON CONFLICT DO NOTHING, so rows imported concurrently by another session are skipped
+STAGING_TABLE = "expense_import_batch"
+STAGING_DDL = (
+    f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (user_id BIGINT NOT NULL, category VARCHAR NOT NULL, "
+    "amount NUMERIC NOT NULL, description TEXT, transcript TEXT NOT NULL, created_at TIMESTAMP, "
+    "import_hash VARCHAR(64) NOT NULL) ON COMMIT DROP"
+)
+# transcript is NOT NULL: an empty field must stay an empty string instead of becoming NULL
+COPY_SQL = f"COPY {STAGING_TABLE} ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL (transcript))"
+MOVE_SQL = (
+    f"INSERT INTO expenses ({', '.join(COPY_COLUMNS)}) SELECT {', '.join(COPY_COLUMNS)} FROM {STAGING_TABLE} "
+    "ON CONFLICT (user_id, import_hash) DO NOTHING RETURNING category, amount, created_at"
+)
+
+class CsvImportError(ValueError):
+    """The file cannot be imported (unknown columns, empty file)."""
+
+@dataclass
+class ImportResult:
+    """Progress and outcome of an import."""
+    rows: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    skipped: int = 0
+    elapsed_seconds: float = 0.0
+
+def parse_amount(text: str) -> Optional[float]:
+    """
+    Parse an amount written as "1 234,56", "-1,234.56", "250 грн" and similar.
+    
+    Args:
+        text: Raw cell value
+    
+    Returns:
+        Signed amount or None if the cell holds no number
+    """
+    cleaned = re.sub(r"[^\d,.\-+]", "", text.replace("−", "-"))
+    if "," in cleaned and "." in cleaned:
+        # The last separator is the decimal one, the other groups thousands
+        if cleaned.rfind(",") > cleaned.rfind("."):
+            cleaned = cleaned.replace(".", "").replace(",", ".")
+        else:
+            cleaned = cleaned.replace(",", "")
+    else:
+        cleaned = cleaned.replace(",", ".")
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+def parse_date(text: str, date_format: Optional[str] = None) -> Optional[datetime]:
+    """
+    Parse a date in ISO format or one of the common bank export formats.
+    
+    Args:
+        text: Raw cell value
+        date_format: Explicit strptime format, tried alone when given
+    
+    Returns:
+        Parsed datetime or None if the value matches no format
+    """
+    text = text.strip()
+    formats = (date_format,) if date_format else DATE_FORMATS
+    if not date_format:
+        try:
+            return datetime.fromisoformat(text)
+        except ValueError:
+            pass
+    for candidate in formats:
+        try:
+            return datetime.strptime(text, candidate)
+        except ValueError:
+            continue
+    return None
+
+@lru_cache(maxsize=4096)
+def map_category(category: str, description: str) -> str:
+    """
+    Map a bank category and description onto one of EXPENSE_CATEGORIES.
+    Statements repeat the same merchants, so results are cached.
+    
+    Args:
+        category: Category column value (may be empty)
+        description: Description column value (may be empty)
+    
+    Returns:
+        Exact category name when it is already known, the first category whose keyword
+        stems match the category or description words, "Others" otherwise
+    """
+    for known in EXPENSE_CATEGORIES:
+        if category.strip().lower() == known.lower():
+            return known
+    for text in (category, description):
+        words = re.findall(r"[\w'’ʼ]+", text.lower())
+        for known, stems in CATEGORY_KEYWORDS.items():
+            if any(word.startswith(stem) for word in words for stem in stems):
+                return known
+    return "Others"
+
+def detect_columns(header: List[str], overrides: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+    """
+    Find the index of every known field in the header row.
+    
+    Args:
+        header: Header row
+        overrides: Explicit header names per field ("date", "amount", "description", "category")
+    
+    Returns:
+        Column index per found field
+    
+    Raises:
+        CsvImportError: If an override names a missing column or a required field is not found
+    """
+    normalized = [name.strip().lower() for name in header]
+    columns = {}
+    for field, name in (overrides or {}).items():
+        if name.strip().lower() not in normalized:
+            raise CsvImportError(f"Column '{name}' not found in the header")
+        columns[field] = normalized.index(name.strip().lower())
+    
+    for field, aliases in COLUMN_ALIASES.items():
+        if field in columns:
+            continue
+        for alias in aliases:
+            matches = [index for index, name in enumerate(normalized) if name == alias or name.startswith(alias)]
+            free = [index for index in matches if index not in columns.values()]
+            if free:
+                columns[field] = free[0]
+                break
+    
+    missing = [field for field in REQUIRED_COLUMNS if field not in columns]
+    if missing:
+        raise CsvImportError(f"Columns not found: {', '.join(missing)} (header: {', '.join(header)})")
+    return columns
+
+def import_hash(user_id: int, created_at: datetime, amount: float, description: str, occurrence: int) -> str:
+    """
+    Stable hash of an imported row. Identical rows of one file are told apart by their occurrence number.
+    """
+    key = f"{user_id}|{created_at.isoformat()}|{amount:.2f}|{description}|{occurrence}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+def _open_csv(stream: TextIO, delimiter: Optional[str]) -> Iterator[List[str]]:
+    """CSV reader over the stream with the delimiter detected from the header line."""
+    header_line = stream.readline()
+    if not header_line.strip():
+        raise CsvImportError("The file is empty")
+    if not delimiter:
+        try:
+            delimiter = csv.Sniffer().sniff(header_line, delimiters=DELIMITERS).delimiter
+        except csv.Error:
+            delimiter = ","
+    return csv.reader(_chain_line(header_line, stream), delimiter=delimiter)
+
+def _chain_line(first_line: str, stream: TextIO) -> Iterator[str]:
+    yield first_line
+    yield from stream
+
+def parse_rows(
+    stream: TextIO,
+    user_id: int,
+    result: ImportResult,
+    delimiter: Optional[str] = None,
+    columns: Optional[Dict[str, str]] = None,
+    date_format: Optional[str] = None,
+    debits_only: bool = True
+) -> Iterator[Dict]:
+    """
+    Stream expense rows ready for insertion from a CSV file.
+    
+    Negative amounts are treated as debits and stored as positive expenses. Rows without
+    a valid date or amount, and credits unless debits_only is False, are counted in result.skipped.
+    
+    Args:
+        stream: Text stream of the CSV file
+        user_id: Telegram user ID the expenses belong to
+        result: Import result updated with read and skipped rows
+        delimiter: CSV delimiter, detected from the header when not given
+        columns: Explicit header names per field
+        date_format: Explicit strptime format of the date column
+        debits_only: Skip rows with positive amounts (salary, refunds, incoming transfers);
+            pass False for files that list expenses as positive amounts
+    
+    Yields:
+        Column values of the expenses table
+    """
+    reader = _open_csv(stream, delimiter)
+    mapping = detect_columns(next(reader), columns)
+    occurrences = Counter()
+    
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        result.rows += 1
+        values = {field: row[index].strip() if index < len(row) else "" for field, index in mapping.items()}
+        
+        created_at = parse_date(values["date"], date_format)
+        amount = parse_amount(values["amount"])
+        if created_at is None or amount is None or amount == 0 or (debits_only and amount > 0):
+            result.skipped += 1
+            continue
+        
+        amount = round(abs(amount), 2)
+        description = values.get("description", "")
+        base_key = (created_at, amount, description)
+        occurrences[base_key] += 1
+        yield {
+            "user_id": user_id,
+            "category": map_category(values.get("category", ""), description),
+            "amount": amount,
+            "description": description or None,
+            "transcript": description,
+            "created_at": created_at,
+            "import_hash": import_hash(user_id, created_at, amount, description, occurrences[base_key])
+        }
+
+def _batches(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _copy_payload(rows: List[Dict]) -> io.StringIO:
+    """
+    CSV payload of COPY ... WITH (FORMAT csv). None is written as an unquoted empty field,
+    which COPY reads as NULL; FORCE_NOT_NULL in COPY_SQL keeps an empty transcript an empty string.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row["created_at"].isoformat() if column == "created_at" else row[column] for column in COPY_COLUMNS])
+    buffer.seek(0)
+    return buffer
+
+def _copy_rows(connection, rows: List[Dict]) -> List[Tuple]:
+    """
+    Load rows through PostgreSQL COPY on the connection of the current transaction.
+    
+    Returns:
+        (category, amount, created_at) of the inserted rows
+    """
+    connection.exec_driver_sql(STAGING_DDL)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(COPY_SQL, _copy_payload(rows))
+    finally:
+        cursor.close()
+    return connection.exec_driver_sql(MOVE_SQL).all()
+
+def _insert_rows(connection, rows: List[Dict]) -> List[Tuple]:
+    """
+    Insert rows with a single executemany, skipping rows already imported.
+    
+    Returns:
+        (category, amount, created_at) of the inserted rows
+    """
+    from sqlalchemy.dialects import sqlite
+    from db.models import Expense
+    
+    statement = sqlite.insert(Expense).on_conflict_do_nothing(
+        index_elements=["user_id", "import_hash"]
+    ).returning(Expense.category, Expense.amount, Expense.created_at)
+    return connection.execute(statement, rows).all()
+
+def _load_batch(connection, user_id: int, rows: List[Dict]) -> int:
+    """
+    Insert the rows of a batch that are not imported yet and add them to the monthly totals.
+    
+    Rows are inserted with ON CONFLICT DO NOTHING on the unique (user_id, import_hash) index,
+    so a row imported earlier, or concurrently by another import, is skipped instead of
+    aborting the batch. Only the rows actually inserted are added to the monthly totals.
+    
+    Returns:
+        Number of inserted rows
+    """
+    from db.statements import monthly_total_upsert
+    
+    dialect_name = connection.dialect.name
+    if dialect_name == "postgresql":
+        inserted = _copy_rows(connection, rows)
+    else:
+        inserted = _insert_rows(connection, rows)
+    
+    # One upsert per (category, month) of the batch instead of one per row
+    totals = {}
+    for category, amount, created_at in inserted:
+        key = (category, created_at.year, created_at.month)
+        total, count = totals.get(key, (0.0, 0))
+        totals[key] = (total + float(amount), count + 1)
+    for (category, year, month), (total, count) in totals.items():
+        connection.execute(monthly_total_upsert(dialect_name, user_id, category, datetime(year, month, 1), round(total, 2), count))
+    return len(inserted)
+
+def import_expenses(
+    stream: TextIO,
+    user_id: int,
+    engine=None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    progress: Optional[Callable[[ImportResult], None]] = None,
+    **parse_options
+) -> ImportResult:
+    """
+    Import expenses from a CSV stream, one transaction per batch.
+    
+    Args:
+        stream: Text stream of the CSV file
+        user_id: Telegram user ID the expenses belong to
+        engine: SQLAlchemy engine (the application engine by default)
+        batch_size: Rows per batch
+        progress: Called with the current result after every batch
+        **parse_options: delimiter, columns, date_format and debits_only of parse_rows
+    
+    Returns:
+        Import result
+    
+    Raises:
+        CsvImportError: If the file has no header or its columns cannot be mapped
+    """
+    if engine is None:
+        from db.database import engine
+    
+    result = ImportResult()
+    started_at = time.perf_counter()
+    for batch in _batches(parse_rows(stream, user_id, result, **parse_options), batch_size):
+        with engine.begin() as connection:
+            inserted = _load_batch(connection, user_id, batch)
+        result.imported += inserted
+        result.duplicates += len(batch) - inserted
+        result.elapsed_seconds = time.perf_counter() - started_at
+        if progress:
+            progress(result)
+    
+    result.elapsed_seconds = time.perf_counter() - started_at
+    logger.info(
+        f"Imported {result.imported} of {result.rows} rows for user {user_id} "
+        f"({result.duplicates} duplicates, {result.skipped} skipped) in {result.elapsed_seconds:.1f}s"
+    )
+    return result
+
+def detect_encoding(path: Path, sample_size: int = 65536) -> str:
+    """UTF-8 (with or without BOM) when the beginning of the file decodes as UTF-8, Windows-1251 otherwise."""
+    with open(path, "rb") as file:
+        sample = file.read(sample_size)
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "cp1251"
+
+def import_expenses_file(path, user_id: int, encoding: Optional[str] = None, **options) -> ImportResult:
+    """
+    Import expenses from a CSV file.
+    
+    Args:
+        path: Path to the CSV file
+        user_id: Telegram user ID the expenses belong to
+        encoding: File encoding, detected when not given
+        **options: Options of import_expenses
+    
+    Returns:
+        Import result
+    """
+    path = Path(path)
+    with open(path, encoding=encoding or detect_encoding(path), newline="") as stream:
+        return import_expenses(stream, user_id, **options)
+
+def parse_args(argv=None):
+    from config import AUTHOR_USER_ID
+    
+    parser = argparse.ArgumentParser(description="Bulk import of expenses from a CSV file")
+    parser.add_argument("path", help="CSV file (e.g. a bank statement export)")
+    parser.add_argument("--user-id", type=int, default=AUTHOR_USER_ID, help="Telegram user ID (AUTHOR_USER_ID by default)")
+    parser.add_argument("--encoding", help="File encoding (UTF-8 or Windows-1251 detected by default)")
+    parser.add_argument("--delimiter", help="CSV delimiter (detected by default)")
+    parser.add_argument("--date-column", help="Header of the date column")
+    parser.add_argument("--amount-column", help="Header of the amount column")
+    parser.add_argument("--description-column", help="Header of the description column")
+    parser.add_argument("--category-column", help="Header of the category column")
+    parser.add_argument("--date-format", help="strptime format of dates, e.g. %%d.%%m.%%Y")
+    parser.add_argument("--include-credits", action="store_true",
+                        help="Import rows with positive amounts too (by default they are skipped as income)")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Rows per transaction")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    from db.database import init_db
+    
+    args = parse_args(argv)
+    columns = {
+        field: name for field, name in (
+            ("date", args.date_column),
+            ("amount", args.amount_column),
+            ("description", args.description_column),
+            ("category", args.category_column)
+        ) if name
+    }
+    
+    def report(result: ImportResult):
+        print(f"\rRead {result.rows} rows: {result.imported} imported, {result.duplicates} duplicates, "
+              f"{result.skipped} skipped", end="", flush=True)
+    
+    init_db()
+    try:
+        result = import_expenses_file(
+            args.path,
+            args.user_id,
+            encoding=args.encoding,
+            batch_size=args.batch_size,
+            progress=report,
+            delimiter=args.delimiter,
+            columns=columns,
+            date_format=args.date_format,
+            debits_only=not args.include_credits
+        )
+    except CsvImportError as e:
+        print(f"Import failed: {e}")
+        return 1
+    print(f"\nDone in {result.elapsed_seconds:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
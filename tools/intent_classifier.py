@@ -6,11 +6,12 @@ import json
 from typing import Literal
 
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field, validator
 
 import config
+from tools.llm_cache import stage_cache
+from tools.openai_clients import get_chat_model
 
 # Logging configuration
 logging.basicConfig(
@@ -19,6 +20,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Intent classification model
+INTENT_MODEL = "gpt-4o-mini"
+
 # Intent types
 IntentType = Literal["expense", "analytics", "unknown"]
 
@@ -35,8 +39,6 @@ class IntentOutput(BaseModel):
 # Create the output parser
 output_parser = JsonOutputParser(pydantic_model=IntentOutput)
 
-# LLM will be created inside the function to make it more testable
-
 # Create the prompt template
 system_template = """
 You are acting as a text analyzer that takes messages in English language and must classify the user's intent.
@@ -57,7 +59,22 @@ Example of response:
 Do not include any explanations, only return the JSON object.
 """
 
-def classify_intent(message: str) -> IntentType:
+# Shared LLM from the client registry
+llm = get_chat_model(INTENT_MODEL, temperature=0.0)
+
+# Create the prompt
+prompt = ChatPromptTemplate.from_messages([
+    ("system", system_template),
+    ("user", "{message}")
+])
+
+# Create the chain with the output parser
+intent_chain = prompt | llm | output_parser
+
+# Chain without the output parser, used as fallback
+fallback_chain = prompt | llm
+
+async def classify_intent(message: str) -> IntentType:
     """
     Classifies message intent using LangChain and OpenAI gpt-4o-mini.
     Returns "expense" for expenses, "analytics" for analytics, or "unknown".
@@ -76,29 +93,18 @@ def classify_intent(message: str) -> IntentType:
     # Log that we have an API key and will proceed
     logger.info("OpenAI API key found, proceeding with LLM classification")
     
+    cached = await stage_cache.get("intent", message, INTENT_MODEL, system_template)
+    if cached is not None:
+        logger.info(f"Intent cache hit: {cached}")
+        return cached
+    
     try:
         # Log the request
         logger.info(f"Sending request to LangChain for classification: '{message}'")
         
-        # Create the LLM inside the function
-        llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.0,
-            api_key=config.OPENAI_API_KEY
-        )
-        
-        # Create the prompt
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", system_template),
-            ("user", "{message}")
-        ])
-        
-        # Create the chain with the output parser
-        intent_chain = prompt | llm | output_parser
-        
         try:
             # Run the chain
-            result = intent_chain.invoke({"message": message})
+            result = await intent_chain.ainvoke({"message": message})
             
             # Log the parsed result
             logger.info(f"Parsed intent: {result}")
@@ -107,15 +113,17 @@ def classify_intent(message: str) -> IntentType:
             intent = result.get("intention", "unknown")
             logger.info(f"Extracted intent: {intent}")
             
-            return intent if intent in ["expense", "analytics", "unknown"] else "unknown"
+            if intent not in ["expense", "analytics", "unknown"]:
+                return "unknown"
+            
+            await stage_cache.set("intent", message, INTENT_MODEL, system_template, intent)
+            return intent
             
         except Exception as parsing_error:
             # Fallback to manual parsing if the output parser fails
             logger.warning(f"Output parser failed: {parsing_error}. Falling back to manual parsing.")
             
-            # Create a chain without the output parser as fallback
-            fallback_chain = prompt | llm
-            result = fallback_chain.invoke({"message": message})
+            result = await fallback_chain.ainvoke({"message": message})
             
             # Debug the result object
             logger.info(f"Result type: {type(result)}")
@@ -0,0 +1,95 @@
+"""
+Module for fast local language identification.
+
+Used to skip the translation request for text that is already in English
+or has no language at all (numbers, amounts, punctuation).
+"""
+import re
+from typing import Literal
+
+LanguageType = Literal["uk", "en", "neutral", "other"]
+
+# Letters specific to Ukrainian among Cyrillic alphabets
+UKRAINIAN_LETTERS = set("іїєґ")
+
+# Common English words, including the vocabulary of expense messages and analytics requests
+ENGLISH_WORDS = {
+    "a", "an", "the", "and", "or", "for", "on", "in", "at", "to", "of", "from", "by", "with", "about",
+    "i", "me", "my", "we", "our", "you", "your", "it", "this", "that", "these", "those",
+    "is", "are", "was", "were", "be", "been", "do", "did", "does", "have", "has", "had", "can",
+    "how", "much", "many", "what", "which", "when", "where", "show", "tell", "give", "list",
+    "today", "yesterday", "week", "month", "year", "last", "current", "previous",
+    "total", "spent", "spend", "spending", "bought", "buy", "paid", "pay", "purchased", "purchase",
+    "expense", "expenses", "budget", "limit", "limits", "remaining", "left", "report", "summary",
+    "category", "categories", "money", "cost", "price",
+    "food", "foods", "groceries", "grocery", "lunch", "dinner", "breakfast", "coffee", "cafe",
+    "restaurant", "supermarket", "pizza", "shopping", "clothes", "shoes", "phone", "laptop",
+    "electronics", "housing", "rent", "apartment", "utilities", "electricity", "internet", "furniture",
+    "transport", "transportation", "taxi", "bus", "subway", "metro", "gasoline", "gas", "fuel", "train",
+    "ticket", "tickets", "entertainment", "cinema", "movie", "movies", "theater", "concert", "club",
+    "bowling", "gym", "others", "other", "uah", "hryvnia", "hryvnias", "dollars", "usd"
+}
+
+# Most frequent character trigrams of English text (with word boundary marks)
+ENGLISH_TRIGRAMS = {
+    "_th", "the", "he_", "ing", "ng_", "_an", "and", "nd_", "_of", "of_", "ed_", "_to", "to_",
+    "_in", "ion", "on_", "er_", "es_", "_a_", "re_", "ent", "tio", "_co", "ly_", "is_", "at_",
+    "_wh", "for", "_fo", "or_", "ght", "ugh", "ous", "_be", "ere", "her", "ter", "hat", "tha",
+    "_ha", "st_", "_pr", "_re", "ver", "all", "ll_", "_wa", "was", "_se", "ers", "ies", "ate",
+    "_sp", "pen", "nt_", "_bo", "oug", "_pa", "aid", "id_", "ay_", "uch", "ch_"
+}
+
+# Thresholds for the English decision
+KNOWN_WORDS_RATIO = 0.5
+TRIGRAM_RATIO = 0.35
+
+def detect_language(text: str) -> LanguageType:
+    """
+    Detects the language of a short message using its script and English word/trigram statistics.
+    
+    Args:
+        text: Message text
+        
+    Returns:
+        "uk" for Cyrillic text, "en" for English, "neutral" for text without letters
+        (numbers, amounts, punctuation), "other" for any other Latin-script text
+    """
+    letters = [char for char in text.lower() if char.isalpha()]
+    if not letters:
+        return "neutral"
+    
+    cyrillic = sum(1 for char in letters if "Ѐ" <= char <= "ӿ")
+    if cyrillic:
+        # Any Cyrillic letter means the text needs translation
+        return "uk"
+    
+    if any(not char.isascii() for char in letters):
+        # Latin letters with diacritics: Polish, German, etc.
+        return "other"
+    
+    words = re.findall(r"[a-z']+", text.lower())
+    known = sum(1 for word in words if word in ENGLISH_WORDS)
+    if known / len(words) >= KNOWN_WORDS_RATIO:
+        return "en"
+    
+    trigrams = [
+        padded[index:index + 3]
+        for padded in (f"_{word}_" for word in words)
+        for index in range(len(padded) - 2)
+    ]
+    if trigrams and sum(1 for trigram in trigrams if trigram in ENGLISH_TRIGRAMS) / len(trigrams) >= TRIGRAM_RATIO:
+        return "en"
+    
+    return "other"
+
+def needs_translation(text: str) -> bool:
+    """
+    Checks whether text must be translated to English.
+    
+    Args:
+        text: Message text
+        
+    Returns:
+        False for English and language-neutral text, True otherwise
+    """
+    return detect_language(text) not in ("en", "neutral")
@@ -0,0 +1,308 @@
+"""
+Persistent, content-addressed cache for LLM stage outputs.
+
+Entries are keyed on the normalized input text, stage name, model and prompt version
+(a hash of the prompt template), so changing a prompt automatically invalidates its entries.
+The cache has two tiers: an in-memory LRU and an on-disk SQLite store with TTL
+and size-bounded eviction.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config import (
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_MEMORY_SIZE,
+    LLM_CACHE_MAX_ENTRIES
+)
+
+# Logging configuration
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for cache keys: lowercase, unified apostrophes, collapsed whitespace.
+    
+    Args:
+        text: Input text
+        
+    Returns:
+        Normalized text
+    """
+    text = text.lower().replace("’", "'").replace("ʼ", "'")
+    return " ".join(text.split()).strip(" .!")
+
+def prompt_version(prompt: str) -> str:
+    """
+    Get a short version identifier of a prompt template.
+    
+    Args:
+        prompt: Prompt template text
+        
+    Returns:
+        First 16 hex characters of the SHA-256 hash of the prompt
+    """
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+class LRUCache:
+    """Thread-safe in-memory LRU cache with TTL."""
+    
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            value, created_at = item
+            if time.time() - created_at > self.ttl_seconds:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any, created_at: Optional[float] = None):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._items[key] = (value, created_at or time.time())
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+    
+    def __len__(self) -> int:
+        return len(self._items)
+
+class DiskCache:
+    """Thread-safe SQLite key-value store with TTL and a maximum number of entries."""
+    
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int, table: str = "cache_entries"):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes_since_eviction = 0
+    
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, namespace TEXT NOT NULL, version TEXT NOT NULL, "
+                "value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{self.table}_accessed_at ON {self.table} (accessed_at)")
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{self.table}_namespace ON {self.table} (namespace, version)")
+        return self._conn
+    
+    def get(self, key: str) -> Optional[tuple]:
+        """
+        Returns:
+            (value, created_at) or None if the key is missing or expired
+        """
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            now = time.time()
+            if now - created_at > self.ttl_seconds:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return None
+            conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            return json.loads(value), created_at
+    
+    def set(self, key: str, value: Any, namespace: str = "", version: str = ""):
+        with self._lock:
+            conn = self._connection()
+            now = time.time()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, namespace, version, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, namespace, version, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            self._writes_since_eviction += 1
+            # Evict in batches to keep writes cheap
+            if self._writes_since_eviction >= max(self.max_entries // 100, 1):
+                self._evict(conn, now)
+    
+    def invalidate_other_versions(self, namespace: str, version: str) -> int:
+        """
+        Delete entries of a namespace created with a different version.
+        
+        Returns:
+            Number of deleted entries
+        """
+        with self._lock:
+            cursor = self._connection().execute(
+                f"DELETE FROM {self.table} WHERE namespace = ? AND version != ?", (namespace, version)
+            )
+            return cursor.rowcount
+    
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        self._writes_since_eviction = 0
+        conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.ttl_seconds,))
+        count = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        if count > self.max_entries:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+    
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+class LLMStageCache:
+    """Two-tier cache of LLM stage outputs with per-stage hit statistics."""
+    
+    def __init__(
+        self,
+        enabled: bool = LLM_CACHE_ENABLED,
+        path: str = LLM_CACHE_PATH,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        memory_size: int = LLM_CACHE_MEMORY_SIZE,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES
+    ):
+        self.enabled = enabled
+        self.memory = LRUCache(memory_size, ttl_seconds)
+        self.disk = DiskCache(path, ttl_seconds, max_entries) if path else None
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+        self._prompt_versions: Dict[str, str] = {}
+    
+    def make_key(self, stage: str, text: str, model: str, prompt: str) -> str:
+        """
+        Build the content-addressed key of a stage output.
+        
+        Args:
+            stage: Stage name, e.g. "translation"
+            text: Stage input text
+            model: Model name
+            prompt: Prompt template of the stage
+            
+        Returns:
+            SHA-256 hex digest
+        """
+        raw = "\x1f".join([stage, model, prompt_version(prompt), normalize_text(text)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    async def get(self, stage: str, text: str, model: str, prompt: str) -> Optional[Any]:
+        """
+        Get a cached stage output.
+        
+        Args:
+            stage: Stage name
+            text: Stage input text
+            model: Model name
+            prompt: Prompt template of the stage
+            
+        Returns:
+            Cached output or None
+        """
+        if not self.enabled:
+            return None
+        key = self.make_key(stage, text, model, prompt)
+        
+        value = self.memory.get(key)
+        if value is not None:
+            self._stats[stage]["memory_hits"] += 1
+            return value
+        
+        if self.disk is not None:
+            try:
+                await self._ensure_prompt_version(stage, prompt)
+                entry = await asyncio.to_thread(self.disk.get, key)
+            except Exception as e:
+                logger.error(f"Error reading LLM cache: {e}")
+                entry = None
+            if entry is not None:
+                value, created_at = entry
+                self.memory.set(key, value, created_at)
+                self._stats[stage]["disk_hits"] += 1
+                return value
+        
+        self._stats[stage]["misses"] += 1
+        return None
+    
+    async def set(self, stage: str, text: str, model: str, prompt: str, value: Any):
+        """
+        Store a stage output. Values must be JSON-serializable.
+        
+        Args:
+            stage: Stage name
+            text: Stage input text
+            model: Model name
+            prompt: Prompt template of the stage
+            value: Stage output
+        """
+        if not self.enabled or value is None:
+            return
+        key = self.make_key(stage, text, model, prompt)
+        self.memory.set(key, value)
+        
+        if self.disk is not None:
+            try:
+                await self._ensure_prompt_version(stage, prompt)
+                await asyncio.to_thread(self.disk.set, key, value, stage, prompt_version(prompt))
+            except Exception as e:
+                logger.error(f"Error writing LLM cache: {e}")
+    
+    async def _ensure_prompt_version(self, stage: str, prompt: str):
+        """Drop disk entries written with an older prompt of the stage (once per process)."""
+        version = prompt_version(prompt)
+        if self._prompt_versions.get(stage) == version:
+            return
+        self._prompt_versions[stage] = version
+        deleted = await asyncio.to_thread(self.disk.invalidate_other_versions, stage, version)
+        if deleted:
+            logger.info(f"Invalidated {deleted} LLM cache entries of stage '{stage}' after prompt change")
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get hit statistics per stage.
+        
+        Returns:
+            Dictionary stage -> {memory_hits, disk_hits, misses, hit_ratio}
+        """
+        result = {}
+        for stage, counters in self._stats.items():
+            hits = counters["memory_hits"] + counters["disk_hits"]
+            total = hits + counters["misses"]
+            result[stage] = dict(counters, hit_ratio=hits / total if total else 0.0)
+        return result
+
+# Shared cache instance used by all LLM stages
+stage_cache = LLMStageCache()
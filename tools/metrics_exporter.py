@@ -0,0 +1,181 @@
+"""
+Exporters of pipeline metrics: periodic log summary and Prometheus text endpoint.
+"""
+import asyncio
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from tools.tracing import MetricsRegistry, QUANTILES, metrics
+
+# Logging configuration
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+class MetricsExporter:
+    """Base class of metrics exporters."""
+    
+    def __init__(self, registry: MetricsRegistry = None):
+        self.registry = registry or metrics
+    
+    async def start(self):
+        """Start exporting."""
+    
+    async def stop(self):
+        """Stop exporting and free resources."""
+
+class LogSummaryExporter(MetricsExporter):
+    """Writes a latency summary per stage and intent to the log at a fixed interval."""
+    
+    def __init__(self, interval_seconds: float, registry: MetricsRegistry = None):
+        super().__init__(registry)
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.log_summary()
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            self.log_summary()
+    
+    def log_summary(self):
+        """Log one line per stage and intent with count and p50/p95/p99 in milliseconds."""
+        histograms = self.registry.histograms()
+        if not histograms:
+            return
+        lines = ["Pipeline latency summary (ms):"]
+        for (stage, intent), histogram in sorted(histograms.items()):
+            snapshot = histogram.snapshot()
+            quantiles = " ".join(
+                f"p{int(q * 100)}={snapshot[f'p{int(q * 100)}'] * 1000:.0f}" for q in QUANTILES
+            )
+            lines.append(f"  {stage:<24} intent={intent:<10} n={snapshot['count']:<6} {quantiles}")
+        for name, values in self.registry.collect().items():
+            lines.append(f"  {name}: {values}")
+        logger.info("\n".join(lines))
+
+class PrometheusExporter(MetricsExporter):
+    """Serves metrics in the Prometheus text exposition format on /metrics."""
+    
+    def __init__(self, port: int, host: str = "0.0.0.0", registry: MetricsRegistry = None):
+        super().__init__(registry)
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+    
+    async def start(self):
+        exporter = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render_prometheus(exporter.registry).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                # Scrapes are too frequent for the info log
+                logger.debug(format % args)
+        
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="prometheus-exporter", daemon=True).start()
+        logger.info(f"Prometheus metrics available on http://{self.host}:{self.port}/metrics")
+    
+    async def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+def _flatten(prefix: str, values: Dict[str, Any], labels: Dict[str, Any], lines: List[str]):
+    """Turn nested collector values into gauges; nested dictionary keys become labels."""
+    for key, value in values.items():
+        if isinstance(value, bool):
+            value = int(value)
+        if isinstance(value, (int, float)):
+            lines.append(f"{prefix}_{key}{_labels(labels)} {value}")
+        elif isinstance(value, dict):
+            if all(isinstance(item, (int, float)) for item in value.values()):
+                # e.g. per_user_pending: {user_id: count}
+                for label, item in value.items():
+                    lines.append(f"{prefix}_{key}{_labels(dict(labels, key=label))} {item}")
+            else:
+                # e.g. per-stage statistics: {stage: {hits: ..., misses: ...}}
+                for label, item in value.items():
+                    if isinstance(item, dict):
+                        _flatten(prefix, item, dict(labels, key=label), lines)
+
+def render_prometheus(registry: MetricsRegistry = None) -> str:
+    """
+    Render stage latencies and collector values in the Prometheus text format.
+    
+    Args:
+        registry: Metrics registry (the shared one by default)
+        
+    Returns:
+        Exposition text
+    """
+    registry = registry or metrics
+    name = "expense_bot_stage_duration_seconds"
+    lines = [
+        f"# HELP {name} Duration of message pipeline stages.",
+        f"# TYPE {name} summary"
+    ]
+    for (stage, intent), histogram in sorted(registry.histograms().items()):
+        labels = {"stage": stage, "intent": intent}
+        for q in QUANTILES:
+            lines.append(f"{name}{_labels(dict(labels, quantile=q))} {histogram.quantile(q)}")
+        lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+        lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+    
+    for collector_name, values in registry.collect().items():
+        _flatten(f"expense_bot_{collector_name}", values, {}, lines)
+    return "\n".join(lines) + "\n"
+
+def create_exporters(names: List[str], port: int, log_interval_seconds: float) -> List[MetricsExporter]:
+    """
+    Create exporters by name.
+    
+    Args:
+        names: Exporter names: "log", "prometheus"
+        port: Port of the Prometheus endpoint
+        log_interval_seconds: Interval of the log summary
+        
+    Returns:
+        List of exporters
+    """
+    exporters = []
+    for name in names:
+        if name == "log":
+            exporters.append(LogSummaryExporter(log_interval_seconds))
+        elif name == "prometheus":
+            exporters.append(PrometheusExporter(port))
+        elif name:
+            logger.warning(f"Unknown metrics exporter: {name}")
+    return exporters
@@ -0,0 +1,132 @@
+"""
+Shared registry of OpenAI and LangChain clients.
+
+All pipeline stages reuse one AsyncOpenAI client backed by a single keep-alive
+HTTP connection pool, instead of building their own client (and pool) per module or per call.
+"""
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+from langchain_openai import ChatOpenAI
+
+from config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    OPENAI_TIMEOUT_SECONDS,
+    OPENAI_CONNECT_TIMEOUT_SECONDS,
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+    OPENAI_MAX_RETRIES
+)
+
+# Logging configuration
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Default chat model of all LLM stages
+DEFAULT_CHAT_MODEL = "gpt-4o-mini"
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.AsyncClient] = None
+_openai_client: Optional[AsyncOpenAI] = None
+_chat_models: Dict[Tuple[str, float], ChatOpenAI] = {}
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared keep-alive HTTP connection pool.
+    
+    Returns:
+        httpx.AsyncClient configured with the pool limits and timeouts from config
+    """
+    global _http_client
+    with _lock:
+        if _http_client is None or _http_client.is_closed:
+            _http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(OPENAI_TIMEOUT_SECONDS, connect=OPENAI_CONNECT_TIMEOUT_SECONDS),
+                limits=httpx.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY_SECONDS
+                )
+            )
+        return _http_client
+
+def get_openai_client() -> AsyncOpenAI:
+    """
+    Get the shared AsyncOpenAI client.
+    
+    Returns:
+        AsyncOpenAI client that uses the shared HTTP connection pool
+    """
+    global _openai_client
+    http_client = get_http_client()
+    with _lock:
+        if _openai_client is None:
+            _openai_client = AsyncOpenAI(
+                api_key=OPENAI_API_KEY,
+                base_url=OPENAI_BASE_URL,
+                timeout=OPENAI_TIMEOUT_SECONDS,
+                max_retries=OPENAI_MAX_RETRIES,
+                http_client=http_client
+            )
+        return _openai_client
+
+def get_chat_model(model: str = DEFAULT_CHAT_MODEL, temperature: float = 0.0) -> ChatOpenAI:
+    """
+    Get a shared LangChain chat model.
+    
+    Args:
+        model: Model name
+        temperature: Sampling temperature
+        
+    Returns:
+        ChatOpenAI instance whose async requests go through the shared AsyncOpenAI client
+    """
+    key = (model, temperature)
+    openai_client = get_openai_client()
+    with _lock:
+        if key not in _chat_models:
+            _chat_models[key] = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                api_key=OPENAI_API_KEY,
+                base_url=OPENAI_BASE_URL,
+                timeout=OPENAI_TIMEOUT_SECONDS,
+                max_retries=OPENAI_MAX_RETRIES,
+                async_client=openai_client.chat.completions
+            )
+        return _chat_models[key]
+
+async def warm_up():
+    """
+    Open connections to the OpenAI API in advance, so the first user message
+    doesn't pay DNS, TCP and TLS setup costs.
+    """
+    if not OPENAI_API_KEY:
+        logger.warning("OpenAI API key not configured, skipping client warm-up")
+        return
+    
+    try:
+        await get_openai_client().models.retrieve(DEFAULT_CHAT_MODEL)
+        logger.info("OpenAI client warmed up")
+    except Exception as e:
+        # Warm-up is an optimization only, errors must not prevent the bot from starting
+        logger.warning(f"OpenAI client warm-up failed: {e}")
+
+async def close_clients():
+    """Close the shared HTTP connection pool."""
+    global _http_client, _openai_client
+    with _lock:
+        http_client = _http_client
+        _http_client = None
+        _openai_client = None
+        _chat_models.clear()
+    if http_client is not None:
+        await http_client.aclose()
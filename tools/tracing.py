@@ -0,0 +1,167 @@
+"""
+Per-stage latency tracing for the message pipeline.
+
+Every message handled by the bot opens a trace; pipeline stages are wrapped in spans.
+When the trace ends, span durations are recorded into histograms labeled with
+the stage and the recognized intent, so p50/p95/p99 can be reported per stage and per intent.
+"""
+import contextvars
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Logging configuration
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Quantiles reported by exporters
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Number of most recent samples kept per histogram for quantile estimation
+MAX_SAMPLES = 5000
+
+class Histogram:
+    """Latency histogram with total count/sum and a window of recent samples for quantiles."""
+    
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self.count = 0
+        self.sum = 0.0
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float):
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            self._samples.append(value)
+    
+    def quantile(self, q: float) -> float:
+        """Nearest-rank quantile of the recent samples (0.0 if empty)."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        rank = max(math.ceil(q * len(samples)) - 1, 0)
+        return samples[rank]
+    
+    def snapshot(self) -> Dict[str, float]:
+        result = {f"p{int(q * 100)}": self.quantile(q) for q in QUANTILES}
+        result.update(count=self.count, sum=self.sum)
+        return result
+
+class MetricsRegistry:
+    """Stage latency histograms keyed by (stage, intent) and registered gauge collectors."""
+    
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, stage: str, seconds: float, intent: str = "none"):
+        key = (stage, intent)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+        histogram.observe(seconds)
+    
+    def histograms(self) -> Dict[Tuple[str, str], Histogram]:
+        with self._lock:
+            return dict(self._histograms)
+    
+    def register_collector(self, name: str, collector: Callable[[], Dict[str, Any]]):
+        """
+        Register a callable returning numeric values to export alongside latencies,
+        e.g. queue depth or cache hit ratio.
+        
+        Args:
+            name: Metric name prefix
+            collector: Callable returning a dictionary of values (nested dictionaries become labels)
+        """
+        self._collectors[name] = collector
+    
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for name, collector in list(self._collectors.items()):
+            try:
+                result[name] = collector()
+            except Exception as e:
+                logger.error(f"Error collecting metrics '{name}': {e}")
+        return result
+    
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+# Shared registry of the process
+metrics = MetricsRegistry()
+
+class Trace:
+    """Spans of one message, recorded when the message is finished."""
+    
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.intent = "unknown"
+        self.spans: List[Tuple[str, float]] = []
+        self.started_at = time.perf_counter()
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+
+@contextmanager
+def message_trace(kind: str, registry: MetricsRegistry = None) -> Iterator[Trace]:
+    """
+    Trace processing of one message. Spans opened inside (including in tasks and threads
+    started from this context) are collected and recorded with the message intent at the end.
+    
+    Args:
+        kind: Message kind, e.g. "voice" or "text"
+        registry: Metrics registry (the shared one by default)
+    """
+    registry = registry or metrics
+    trace = Trace(kind)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        for stage, seconds in trace.spans:
+            registry.observe(stage, seconds, trace.intent)
+        registry.observe(f"{kind}_total", time.perf_counter() - trace.started_at, trace.intent)
+
+@contextmanager
+def span(stage: str, registry: MetricsRegistry = None) -> Iterator[None]:
+    """
+    Measure the duration of a pipeline stage.
+    
+    Args:
+        stage: Stage name, e.g. "translation"
+        registry: Metrics registry used when there is no active message trace
+    """
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started_at
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.spans.append((stage, seconds))
+        else:
+            (registry or metrics).observe(stage, seconds)
+
+def set_intent(intent: str):
+    """
+    Label the current message trace with the recognized intent.
+    
+    Args:
+        intent: "expense", "analytics" or "unknown"
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.intent = intent
@@ -2,16 +2,48 @@
 Transcriber module for working with OpenAI's Whisper API.
 
 This module provides functions for downloading Telegram voice messages
-and transcribing them to text using OpenAI's Whisper API.
+and transcribing them to text using OpenAI's Whisper API or a local
+faster-whisper model (see tools.transcription_backends).
+
+Voice messages are kept in memory and streamed straight to the API; only files larger
+than VOICE_IN_MEMORY_MAX_BYTES are spilled to a temporary file on disk.
 """
 
 import os
+import asyncio
 import logging
 import tempfile
-from openai import OpenAI
+from functools import partial
+from typing import Awaitable, Callable, Dict, Optional
 from pathlib import Path
 from telegram import File as TelegramFile
-from config import OPENAI_API_KEY
+from tools.openai_clients import get_openai_client
+from tools.transcript_cache import transcript_cache, audio_hash
+from tools.transcription_backends import (
+    AudioSource,
+    TranscriptionBackend,
+    OpenAIWhisperBackend,
+    LocalWhisperBackend
+)
+from tools import audio_chunker
+from config import (
+    TRANSCRIPTION_STRATEGY,
+    STORE_ORIGINAL_TRANSCRIPT,
+    VOICE_IN_MEMORY_MAX_BYTES,
+    LONG_AUDIO_CHUNKING_ENABLED,
+    LONG_AUDIO_THRESHOLD_SECONDS,
+    TRANSCRIPTION_CHUNK_SECONDS,
+    TRANSCRIPTION_CHUNK_MAX_SECONDS,
+    TRANSCRIPTION_CHUNK_OVERLAP_MS,
+    TRANSCRIPTION_CHUNK_CONCURRENCY,
+    TRANSCRIPTION_BACKEND,
+    LOCAL_TRANSCRIPTION_MAX_SECONDS,
+    TRANSCRIPTION_FALLBACK_ENABLED,
+    LOCAL_WHISPER_MODEL,
+    LOCAL_WHISPER_COMPUTE_TYPE,
+    LOCAL_WHISPER_WORKERS,
+    LOCAL_WHISPER_CPU_THREADS
+)
 
 # Set up logging
 logging.basicConfig(
@@ -20,20 +52,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-client = OpenAI(api_key=OPENAI_API_KEY)
+# Shared OpenAI client
+client = get_openai_client()
 
-async def download_voice_message(voice_file: TelegramFile) -> Path:
+# Speech-to-text backends
+openai_backend = OpenAIWhisperBackend(client)
+local_backend = LocalWhisperBackend(
+    LOCAL_WHISPER_MODEL,
+    compute_type=LOCAL_WHISPER_COMPUTE_TYPE,
+    workers=LOCAL_WHISPER_WORKERS,
+    cpu_threads=LOCAL_WHISPER_CPU_THREADS
+)
+
+# Requests per backend and fallbacks to the local model after API errors
+backend_stats = {"openai": 0, "local": 0, "fallbacks": 0}
+
+async def download_voice_message(voice_file: TelegramFile, max_in_memory_bytes: Optional[int] = None) -> AudioSource:
     """
     Download a voice message from Telegram.
     
     Args:
         voice_file: The Telegram File object representing the voice message
+        max_in_memory_bytes: Largest file kept in memory (defaults to VOICE_IN_MEMORY_MAX_BYTES)
         
     Returns:
-        Path: Path to the downloaded voice message file
+        Audio content as bytes, or Path to a temporary file for files above the threshold
     """
+    if max_in_memory_bytes is None:
+        max_in_memory_bytes = VOICE_IN_MEMORY_MAX_BYTES
+    
     try:
+        # The Bot API only serves files up to 20 MB, so an unknown size is kept in memory
+        if voice_file.file_size is None or voice_file.file_size <= max_in_memory_bytes:
+            audio = bytes(await voice_file.download_as_bytearray())
+            logger.info(f"Voice message downloaded to memory ({len(audio)} bytes)")
+            return audio
+        
         # Create a temporary file with .ogg extension (Telegram voice format)
         temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".ogg")
         temp_file.close()
@@ -48,35 +102,301 @@ async def download_voice_message(voice_file: TelegramFile) -> Path:
         logger.error(f"Error downloading voice message: {e}")
         raise e
 
-async def transcribe_audio(audio_file_path: Path) -> str:
+def select_backend(duration: Optional[float] = None, backend_name: Optional[str] = None) -> TranscriptionBackend:
     """
-    Transcribe an audio file using OpenAI's Whisper API.
+    Choose the speech-to-text backend for a voice message.
     
     Args:
-        audio_file_path: Path to the audio file
+        duration: Audio duration in seconds, if known
+        backend_name: "openai", "local" or "auto" (defaults to TRANSCRIPTION_BACKEND)
         
     Returns:
-        str: Transcribed text in Ukrainian
+        Backend to use
+    """
+    backend_name = backend_name or TRANSCRIPTION_BACKEND
+    if hasattr(duration, "total_seconds"):
+        duration = duration.total_seconds()
+    if local_backend.is_available():
+        if backend_name == "local" or not openai_backend.is_available():
+            return local_backend
+        if backend_name == "auto" and duration is not None and duration <= LOCAL_TRANSCRIPTION_MAX_SECONDS:
+            return local_backend
+    elif backend_name != "openai":
+        logger.warning("faster-whisper is not installed, using the Whisper API")
+    return openai_backend
+
+async def _call_backend(method: str, audio: AudioSource, backend: Optional[TranscriptionBackend]) -> str:
+    """
+    Run a backend request; API failures fall back to the local model when it is available.
+    
+    Args:
+        method: "transcribe" or "translate"
+        audio: Audio content or path to the audio file
+        backend: Backend to use (the Whisper API by default)
+        
+    Returns:
+        Recognized text
     """
+    backend = backend or openai_backend
     try:
-        with open(audio_file_path, "rb") as audio_file:
-            # Call the OpenAI API to transcribe the audio
-            response = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language="uk",  # Ukrainian language code
-                response_format="text"
-            )
+        text = await getattr(backend, method)(audio)
+        backend_stats[backend.name] += 1
+        return text
+    except Exception as e:
+        if backend is local_backend or not TRANSCRIPTION_FALLBACK_ENABLED or not local_backend.is_available():
+            raise e
+        logger.warning(f"Whisper API request failed, falling back to the local model: {e}")
+        backend_stats["fallbacks"] += 1
+        text = await getattr(local_backend, method)(audio)
+        backend_stats[local_backend.name] += 1
+        return text
+
+async def _transcribe_file(audio: AudioSource, backend: Optional[TranscriptionBackend] = None) -> str:
+    """
+    Transcribe audio in Ukrainian without deleting it.
+    
+    Args:
+        audio: Audio content or path to the audio file
+        backend: Backend to use (the Whisper API by default)
         
-        logger.info("Audio successfully transcribed")
+    Returns:
+        str: Transcribed text in Ukrainian
+    """
+    return await _call_backend("transcribe", audio, backend)
+
+async def _translate_file(audio: AudioSource, backend: Optional[TranscriptionBackend] = None) -> str:
+    """
+    Translate speech directly to English text without deleting the audio.
+    
+    Args:
+        audio: Audio content or path to the audio file
+        backend: Backend to use (the Whisper API by default)
         
-        # Clean up the temporary file
-        os.unlink(audio_file_path)
+    Returns:
+        str: English text
+    """
+    return await _call_backend("translate", audio, backend)
+
+def get_transcription_stats() -> dict:
+    """
+    Get request counters per speech-to-text backend.
+    
+    Returns:
+        Dictionary with openai, local and fallbacks
+    """
+    return dict(backend_stats)
+
+def warm_up_backends():
+    """Start the local model workers in advance when the local backend can be selected."""
+    if TRANSCRIPTION_BACKEND != "openai":
+        local_backend.warm_up()
+
+def close_backends():
+    """Stop worker processes of the local backend."""
+    local_backend.close()
+
+def _is_long_audio(duration: Optional[float]) -> bool:
+    """Check whether audio should be transcribed in chunks."""
+    if hasattr(duration, "total_seconds"):
+        duration = duration.total_seconds()
+    return (
+        LONG_AUDIO_CHUNKING_ENABLED
+        and duration is not None
+        and duration > LONG_AUDIO_THRESHOLD_SECONDS
+        and audio_chunker.is_available()
+    )
+
+async def _split_long_audio(audio: AudioSource) -> list:
+    """
+    Split long audio at pauses into chunks.
+    
+    Args:
+        audio: Audio content or path to the audio file
+        
+    Returns:
+        List of chunks, or [audio] if splitting is not possible
+    """
+    try:
+        return await asyncio.to_thread(
+            audio_chunker.split_audio,
+            audio,
+            TRANSCRIPTION_CHUNK_SECONDS,
+            TRANSCRIPTION_CHUNK_MAX_SECONDS,
+            TRANSCRIPTION_CHUNK_OVERLAP_MS
+        )
+    except Exception as e:
+        logger.warning(f"Audio splitting failed, sending audio as a whole: {e}")
+        return [audio]
+
+async def _request_chunks(
+    chunks: list,
+    request: Callable[[AudioSource], Awaitable[str]],
+    semaphore: asyncio.Semaphore
+) -> str:
+    """
+    Send chunks concurrently, so the time to transcript depends on the longest chunk
+    rather than the whole duration, and stitch the texts in order.
+    
+    Args:
+        chunks: Audio chunks in order
+        request: Transcription or translation request of one chunk
+        semaphore: Limit of concurrent chunk requests of the message
+        
+    Returns:
+        Recognized text
+    """
+    if len(chunks) == 1:
+        return await request(chunks[0])
+    
+    async def request_chunk(chunk: AudioSource) -> str:
+        async with semaphore:
+            return (await request(chunk)).strip()
+    
+    texts = await asyncio.gather(*(request_chunk(chunk) for chunk in chunks))
+    return audio_chunker.stitch_transcripts(texts)
+
+def _cleanup(audio: AudioSource):
+    """Delete the temporary audio file if the audio was spilled to disk."""
+    if isinstance(audio, (str, Path)) and os.path.exists(audio):
+        os.unlink(audio)
+
+async def transcribe_audio(audio: AudioSource) -> str:
+    """
+    Transcribe audio using OpenAI's Whisper API.
+    
+    Args:
+        audio: Audio content or path to the audio file
         
-        return response
+    Returns:
+        str: Transcribed text in Ukrainian
+    """
+    try:
+        return await _transcribe_file(audio)
     except Exception as e:
         logger.error(f"Error transcribing audio: {e}")
+        raise e
+    finally:
         # Clean up the temporary file even if transcription fails
-        if os.path.exists(audio_file_path):
-            os.unlink(audio_file_path)
-        raise e 
\ No newline at end of file
+        _cleanup(audio)
+
+async def translate_audio(audio: AudioSource) -> str:
+    """
+    Translate audio to English text using OpenAI's Whisper translation endpoint.
+    
+    Args:
+        audio: Audio content or path to the audio file
+        
+    Returns:
+        str: Text in English
+    """
+    try:
+        return await _translate_file(audio)
+    except Exception as e:
+        logger.error(f"Error translating audio: {e}")
+        raise e
+    finally:
+        _cleanup(audio)
+
+def _cache_variant(strategy: str) -> str:
+    """Cache variant of a strategy: results differ by strategy and by storing the original transcript."""
+    if strategy == "translate" and STORE_ORIGINAL_TRANSCRIPT:
+        return "translate+original"
+    return strategy
+
+async def get_cached_recognition(file_unique_id: Optional[str], strategy: str = None) -> Optional[Dict[str, Optional[str]]]:
+    """
+    Get the recognition result of an already processed voice message without downloading it.
+    
+    Args:
+        file_unique_id: Telegram file_unique_id of the voice message
+        strategy: "transcribe" or "translate" (defaults to TRANSCRIPTION_STRATEGY)
+        
+    Returns:
+        Cached result of recognize_voice or None
+    """
+    strategy = strategy or TRANSCRIPTION_STRATEGY
+    return await transcript_cache.get_by_file_id(file_unique_id, _cache_variant(strategy))
+
+async def recognize_voice(
+    audio: AudioSource,
+    strategy: str = None,
+    file_unique_id: Optional[str] = None,
+    duration: Optional[float] = None
+) -> Dict[str, Optional[str]]:
+    """
+    Convert a voice message to text with the configured strategy.
+    
+    "transcribe" - Ukrainian transcript only, translation is left to the text pipeline.
+    "translate" - English text straight from audio; with STORE_ORIGINAL_TRANSCRIPT
+    the Ukrainian transcript is requested in parallel for storage.
+    
+    Identical audio recognized before is answered from the transcript cache.
+    
+    Args:
+        audio: Audio content or path to the audio file
+        strategy: "transcribe" or "translate" (defaults to TRANSCRIPTION_STRATEGY)
+        file_unique_id: Telegram file_unique_id of the voice message, used as a cache key
+        duration: Audio duration in seconds, for the saved audio statistics
+        
+    Returns:
+        Dictionary with keys:
+        transcript - text to show and store (Ukrainian when available),
+        english - English text or None if it still has to be translated
+    """
+    strategy = strategy or TRANSCRIPTION_STRATEGY
+    if not transcript_cache.enabled:
+        return await _recognize(audio, strategy, duration)
+    
+    variant = _cache_variant(strategy)
+    try:
+        content_hash = await asyncio.to_thread(audio_hash, audio)
+    except Exception:
+        _cleanup(audio)
+        raise
+    cached = await transcript_cache.get_by_hash(content_hash, variant, file_unique_id)
+    if cached is not None:
+        _cleanup(audio)
+        return cached
+    
+    result = await _recognize(audio, strategy, duration)
+    await transcript_cache.set(content_hash, variant, result, file_unique_id, duration)
+    return result
+
+async def _recognize(audio: AudioSource, strategy: str, duration: Optional[float] = None) -> Dict[str, Optional[str]]:
+    """
+    Recognize a voice message with the selected backend and delete the temporary audio file.
+    Audio longer than LONG_AUDIO_THRESHOLD_SECONDS is transcribed in parallel chunks.
+    
+    Args:
+        audio: Audio content or path to the audio file
+        strategy: "transcribe" or "translate"
+        duration: Audio duration in seconds, if known
+        
+    Returns:
+        Dictionary with keys transcript and english (see recognize_voice)
+    """
+    try:
+        backend = select_backend(duration)
+        transcribe = partial(_transcribe_file, backend=backend)
+        translate = partial(_translate_file, backend=backend)
+        chunks = await _split_long_audio(audio) if _is_long_audio(duration) else [audio]
+        semaphore = asyncio.Semaphore(TRANSCRIPTION_CHUNK_CONCURRENCY)
+        
+        if strategy != "translate":
+            transcript = await _request_chunks(chunks, transcribe, semaphore)
+            return {"transcript": transcript, "english": None}
+        
+        if STORE_ORIGINAL_TRANSCRIPT:
+            transcript, english = await asyncio.gather(
+                _request_chunks(chunks, transcribe, semaphore),
+                _request_chunks(chunks, translate, semaphore)
+            )
+        else:
+            english = await _request_chunks(chunks, translate, semaphore)
+            transcript = english
+        return {"transcript": transcript.strip(), "english": english.strip()}
+    except Exception as e:
+        logger.error(f"Error recognizing voice message: {e}")
+        raise e
+    finally:
+        _cleanup(audio)
@@ -0,0 +1,193 @@
+"""
+Persistent cache of voice message transcripts.
+
+Forwarded or re-sent voice messages keep their Telegram file_unique_id, so a repeated
+message is answered from the cache before it is even downloaded. When the file id is new,
+the SHA-256 hash of the audio bytes catches identical audio uploaded as a different file.
+Entries are stored in the in-memory LRU and the SQLite store of tools.llm_cache.
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from config import (
+    TRANSCRIPT_CACHE_ENABLED,
+    TRANSCRIPT_CACHE_PATH,
+    TRANSCRIPT_CACHE_TTL_SECONDS,
+    TRANSCRIPT_CACHE_MEMORY_SIZE,
+    TRANSCRIPT_CACHE_MAX_ENTRIES
+)
+from tools.llm_cache import LRUCache, DiskCache
+
+# Logging configuration
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+def audio_hash(audio: Union[bytes, Path]) -> str:
+    """
+    Get the SHA-256 hex digest of audio content.
+    
+    Args:
+        audio: Audio content or path to the audio file
+        
+    Returns:
+        Hex digest
+    """
+    if isinstance(audio, (bytes, bytearray)):
+        return hashlib.sha256(audio).hexdigest()
+    digest = hashlib.sha256()
+    with open(audio, "rb") as audio_file:
+        for chunk in iter(lambda: audio_file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class TranscriptCache:
+    """Two-tier transcript cache keyed by file_unique_id with an audio hash fallback."""
+    
+    def __init__(
+        self,
+        enabled: bool = TRANSCRIPT_CACHE_ENABLED,
+        path: str = TRANSCRIPT_CACHE_PATH,
+        ttl_seconds: float = TRANSCRIPT_CACHE_TTL_SECONDS,
+        memory_size: int = TRANSCRIPT_CACHE_MEMORY_SIZE,
+        max_entries: int = TRANSCRIPT_CACHE_MAX_ENTRIES
+    ):
+        self.enabled = enabled
+        self.memory = LRUCache(memory_size, ttl_seconds)
+        self.disk = DiskCache(path, ttl_seconds, max_entries, table="transcripts") if path else None
+        self._stats = {"file_id_hits": 0, "hash_hits": 0, "misses": 0, "audio_seconds_saved": 0.0}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _key(kind: str, value: str, variant: str) -> str:
+        return f"{kind}:{variant}:{value}"
+    
+    async def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.memory.get(key)
+        if entry is not None:
+            return entry
+        if self.disk is None:
+            return None
+        try:
+            stored = await asyncio.to_thread(self.disk.get, key)
+        except Exception as e:
+            logger.error(f"Error reading transcript cache: {e}")
+            return None
+        if stored is None:
+            return None
+        entry, created_at = stored
+        self.memory.set(key, entry, created_at)
+        return entry
+    
+    def _hit(self, counter: str, entry: Dict[str, Any]) -> Dict[str, Optional[str]]:
+        with self._lock:
+            self._stats[counter] += 1
+            self._stats["audio_seconds_saved"] += entry.get("duration") or 0
+        return entry["result"]
+    
+    async def get_by_file_id(self, file_unique_id: Optional[str], variant: str) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Get a cached recognition result by Telegram file_unique_id (no download needed).
+        
+        Args:
+            file_unique_id: Telegram file_unique_id of the voice message
+            variant: Recognition variant, e.g. "transcribe" or "translate"
+            
+        Returns:
+            Cached result of recognize_voice or None
+        """
+        if not self.enabled or not file_unique_id:
+            return None
+        entry = await self._lookup(self._key("file", file_unique_id, variant))
+        if entry is None:
+            return None
+        logger.info(f"Transcript cache hit by file id {file_unique_id}")
+        return self._hit("file_id_hits", entry)
+    
+    async def get_by_hash(
+        self,
+        content_hash: str,
+        variant: str,
+        file_unique_id: Optional[str] = None
+    ) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Get a cached recognition result by the hash of the audio content.
+        Counts a miss if nothing is found.
+        
+        Args:
+            content_hash: Result of audio_hash
+            variant: Recognition variant
+            file_unique_id: Telegram file_unique_id, remembered for the next lookup on a hit
+            
+        Returns:
+            Cached result of recognize_voice or None
+        """
+        if not self.enabled:
+            return None
+        entry = await self._lookup(self._key("sha256", content_hash, variant))
+        if entry is None:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        logger.info("Transcript cache hit by audio hash")
+        if file_unique_id:
+            await self._store(self._key("file", file_unique_id, variant), entry)
+        return self._hit("hash_hits", entry)
+    
+    async def set(
+        self,
+        content_hash: str,
+        variant: str,
+        result: Dict[str, Optional[str]],
+        file_unique_id: Optional[str] = None,
+        duration: Optional[float] = None
+    ):
+        """
+        Store a recognition result under the audio hash and the file id.
+        
+        Args:
+            content_hash: Result of audio_hash
+            variant: Recognition variant
+            result: Result of recognize_voice
+            file_unique_id: Telegram file_unique_id of the voice message
+            duration: Audio duration in seconds (or timedelta), counted as saved on later hits
+        """
+        if not self.enabled or not result:
+            return
+        if hasattr(duration, "total_seconds"):
+            duration = duration.total_seconds()
+        entry = {"result": result, "duration": duration}
+        await self._store(self._key("sha256", content_hash, variant), entry)
+        if file_unique_id:
+            await self._store(self._key("file", file_unique_id, variant), entry)
+    
+    async def _store(self, key: str, entry: Dict[str, Any]):
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.set, key, entry, "transcript")
+            except Exception as e:
+                logger.error(f"Error writing transcript cache: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit and miss counters.
+        
+        Returns:
+            Dictionary with file_id_hits, hash_hits, misses, hit_ratio and audio_seconds_saved
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        hits = stats["file_id_hits"] + stats["hash_hits"]
+        total = hits + stats["misses"]
+        stats["hit_ratio"] = hits / total if total else 0.0
+        return stats
+
+# Shared transcript cache
+transcript_cache = TranscriptCache()
@@ -0,0 +1,196 @@
+"""
+Speech-to-text backends used by tools.transcriber.
+
+OpenAIWhisperBackend sends audio to the OpenAI Whisper API. LocalWhisperBackend runs
+faster-whisper (CTranslate2, int8 on CPU by default) in a process pool, which avoids the
+network round trip and per-request cost for short clips and keeps working when the API
+is unavailable. faster-whisper is an optional dependency.
+"""
+import asyncio
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from openai import AsyncOpenAI
+
+try:
+    import faster_whisper
+except ImportError:  # pragma: no cover - optional dependency
+    faster_whisper = None
+
+# Logging configuration
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Voice message content in memory or path to a spilled temporary file
+AudioSource = Union[bytes, Path]
+
+# File name sent with in-memory audio, the API detects the format by its extension
+VOICE_FILE_NAME = "voice.ogg"
+
+@contextmanager
+def _audio_file(audio: AudioSource) -> Iterator:
+    """
+    Prepare audio for upload: in-memory content is sent as is, a file on disk is streamed.
+    
+    Args:
+        audio: Audio content or path to the audio file
+    """
+    if isinstance(audio, (bytes, bytearray)):
+        yield (VOICE_FILE_NAME, bytes(audio))
+    else:
+        with open(audio, "rb") as audio_file:
+            yield audio_file
+
+class TranscriptionBackend:
+    """Base class of speech-to-text backends."""
+    
+    name = "base"
+    
+    def is_available(self) -> bool:
+        """Check whether the backend can be used."""
+        return True
+    
+    async def transcribe(self, audio: AudioSource, language: str = "uk") -> str:
+        """
+        Transcribe speech in its original language.
+        
+        Args:
+            audio: Audio content or path to the audio file
+            language: Language code of the speech
+            
+        Returns:
+            Transcribed text
+        """
+        raise NotImplementedError
+    
+    async def translate(self, audio: AudioSource) -> str:
+        """
+        Translate speech directly to English text.
+        
+        Args:
+            audio: Audio content or path to the audio file
+            
+        Returns:
+            English text
+        """
+        raise NotImplementedError
+    
+    def close(self):
+        """Free resources of the backend."""
+
+class OpenAIWhisperBackend(TranscriptionBackend):
+    """Whisper through the OpenAI API."""
+    
+    name = "openai"
+    
+    def __init__(self, client: Optional[AsyncOpenAI], model: str = "whisper-1"):
+        self.client = client
+        self.model = model
+    
+    def is_available(self) -> bool:
+        return self.client is not None
+    
+    async def transcribe(self, audio: AudioSource, language: str = "uk") -> str:
+        with _audio_file(audio) as audio_file:
+            # Call the OpenAI API to transcribe the audio
+            response = await self.client.audio.transcriptions.create(
+                model=self.model,
+                file=audio_file,
+                language=language,
+                response_format="text"
+            )
+        logger.info("Audio successfully transcribed")
+        return response
+    
+    async def translate(self, audio: AudioSource) -> str:
+        with _audio_file(audio) as audio_file:
+            # The translations endpoint always produces English
+            response = await self.client.audio.translations.create(
+                model=self.model,
+                file=audio_file,
+                response_format="text"
+            )
+        logger.info("Audio successfully translated")
+        return response
+
+# Model loaded once in each worker process of the local backend
+_worker_model = None
+
+def _load_worker_model(model_size: str, compute_type: str, cpu_threads: int):
+    """Process pool initializer: load the faster-whisper model into the worker."""
+    global _worker_model
+    _worker_model = faster_whisper.WhisperModel(
+        model_size,
+        device="cpu",
+        compute_type=compute_type,
+        cpu_threads=cpu_threads
+    )
+
+def _run_worker_model(audio: AudioSource, task: str, language: Optional[str]) -> str:
+    """Recognize audio in a worker process."""
+    source = io.BytesIO(audio) if isinstance(audio, (bytes, bytearray)) else str(audio)
+    segments, _ = _worker_model.transcribe(source, task=task, language=language, beam_size=1, vad_filter=True)
+    return " ".join(segment.text.strip() for segment in segments).strip()
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """
+    faster-whisper running on CPU in a process pool.
+    
+    Args:
+        model_size: faster-whisper model name or path, e.g. "small"
+        compute_type: CTranslate2 compute type, e.g. "int8"
+        workers: Number of worker processes (each loads its own model)
+        cpu_threads: CPU threads per worker
+    """
+    
+    name = "local"
+    
+    def __init__(self, model_size: str, compute_type: str = "int8", workers: int = 1, cpu_threads: int = 2):
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.workers = workers
+        self.cpu_threads = cpu_threads
+        self._pool: Optional[ProcessPoolExecutor] = None
+    
+    def is_available(self) -> bool:
+        return faster_whisper is not None
+    
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_load_worker_model,
+                initargs=(self.model_size, self.compute_type, self.cpu_threads)
+            )
+        return self._pool
+    
+    async def _run(self, audio: AudioSource, task: str, language: Optional[str]) -> str:
+        if not self.is_available():
+            raise RuntimeError("faster-whisper is not installed")
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(self._executor(), _run_worker_model, audio, task, language)
+        logger.info(f"Audio successfully processed by the local model ({task})")
+        return text
+    
+    async def transcribe(self, audio: AudioSource, language: str = "uk") -> str:
+        return await self._run(audio, "transcribe", language)
+    
+    async def translate(self, audio: AudioSource) -> str:
+        return await self._run(audio, "translate", None)
+    
+    def warm_up(self):
+        """Start the worker processes and load the model in advance."""
+        if self.is_available():
+            self._executor().submit(int)
+    
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
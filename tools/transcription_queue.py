@@ -0,0 +1,106 @@
+"""
+Bounded pool of transcription workers with backpressure.
+
+At most `workers` voice messages are recognized at the same time, so a burst of voice
+messages does not open unbounded concurrent uploads and trip API rate limits. Up to
+`max_waiting` messages wait for a free worker; beyond that new messages are rejected
+immediately instead of piling up. Queue wait time is recorded separately from transcription time.
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from config import TRANSCRIPTION_WORKERS, TRANSCRIPTION_QUEUE_MAX_SIZE
+from tools.tracing import span
+
+# Logging configuration
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+class TranscriptionQueueFull(Exception):
+    """Raised when all workers are busy and the waiting queue is full."""
+
+class TranscriptionQueue:
+    """Admission control for voice recognition: a fixed number of workers and a bounded waiting queue."""
+    
+    def __init__(self, workers: int, max_waiting: int):
+        """
+        Args:
+            workers: Maximum number of voice messages recognized concurrently
+            max_waiting: Maximum number of voice messages waiting for a free worker
+        """
+        if workers < 1:
+            raise ValueError("workers must be a positive integer")
+        self.workers = workers
+        self.max_waiting = max(max_waiting, 0)
+        self._semaphore = asyncio.Semaphore(workers)
+        self._busy = 0
+        self._waiting = 0
+        self._processed = 0
+        self._queued = 0
+        self._rejected = 0
+    
+    @property
+    def saturated(self) -> bool:
+        """True if a new voice message would have to wait for a worker."""
+        return self._busy + self._waiting >= self.workers
+    
+    @asynccontextmanager
+    async def slot(self, on_queued: Optional[Callable[[], Awaitable[None]]] = None) -> AsyncIterator[None]:
+        """
+        Occupy a transcription worker for the duration of the block.
+        
+        Args:
+            on_queued: Coroutine function called once if the message has to wait for a worker
+            
+        Raises:
+            TranscriptionQueueFull: If all workers are busy and the waiting queue is full
+        """
+        if self.saturated:
+            if self._waiting >= self.max_waiting:
+                self._rejected += 1
+                logger.warning(f"Transcription queue is full ({self._waiting} waiting), voice message rejected")
+                raise TranscriptionQueueFull()
+            self._queued += 1
+            self._waiting += 1
+            try:
+                if on_queued is not None:
+                    await on_queued()
+                with span("transcription_queue_wait"):
+                    await self._semaphore.acquire()
+            finally:
+                self._waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        
+        self._busy += 1
+        try:
+            yield
+        finally:
+            self._busy -= 1
+            self._processed += 1
+            self._semaphore.release()
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the queue state and counters.
+        
+        Returns:
+            Dictionary with workers, busy, waiting, max_waiting, processed, queued and rejected
+        """
+        return {
+            "workers": self.workers,
+            "busy": self._busy,
+            "waiting": self._waiting,
+            "max_waiting": self.max_waiting,
+            "processed": self._processed,
+            "queued": self._queued,
+            "rejected": self._rejected
+        }
+
+# Shared transcription queue of the process
+transcription_queue = TranscriptionQueue(TRANSCRIPTION_WORKERS, TRANSCRIPTION_QUEUE_MAX_SIZE)
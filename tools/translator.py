@@ -3,10 +3,12 @@ Module for translating text between languages using OpenAI.
 """
 import os
 import logging
-import openai
 from typing import Optional
 
-from config import OPENAI_API_KEY
+from config import OPENAI_API_KEY, LANGUAGE_DETECTION_ENABLED
+from tools.llm_cache import stage_cache
+from tools.language_detector import detect_language
+from tools.openai_clients import get_openai_client
 
 # Logging configuration
 logging.basicConfig(
@@ -15,19 +17,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Translation model and prompt
+TRANSLATION_MODEL = "gpt-4o-mini"
+TRANSLATION_PROMPT = "You are a translator. Translate the following Ukrainian text to English. Keep the meaning and context intact."
+
+# Counters of translation requests and translations avoided by language detection
+translation_stats = {
+    "translated": 0,
+    "skipped_english": 0,
+    "skipped_neutral": 0
+}
+
 # Create OpenAI client
 client = None
 if OPENAI_API_KEY:
     try:
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        client = get_openai_client()
     except Exception as e:
         logger.error(f"Error initializing OpenAI client: {e}")
 else:
     logger.warning("OPENAI_API_KEY not found in environment variables")
 
-def translate_to_english(text: str) -> Optional[str]:
+async def translate_to_english(text: str) -> Optional[str]:
     """
     Translates text from Ukrainian to English using OpenAI.
+    English and language-neutral text (e.g. only numbers) is returned as is without a request.
     
     Args:
         text: Text in Ukrainian to translate
@@ -39,22 +53,47 @@ def translate_to_english(text: str) -> Optional[str]:
         logger.error("OpenAI client not initialized")
         return None
     
+    if LANGUAGE_DETECTION_ENABLED:
+        language = detect_language(text)
+        if language in ("en", "neutral"):
+            translation_stats[f"skipped_{'english' if language == 'en' else 'neutral'}"] += 1
+            logger.info(f"Translation skipped, detected language: {language}")
+            return text.strip()
+    
+    cached = await stage_cache.get("translation", text, TRANSLATION_MODEL, TRANSLATION_PROMPT)
+    if cached is not None:
+        logger.info(f"Translation cache hit: '{cached}'")
+        return cached
+    
     try:
         logger.info(f"Translating text: '{text}'")
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = await client.chat.completions.create(
+            model=TRANSLATION_MODEL,
             messages=[
-                {"role": "system", "content": "You are a translator. Translate the following Ukrainian text to English. Keep the meaning and context intact."},
+                {"role": "system", "content": TRANSLATION_PROMPT},
                 {"role": "user", "content": text}
             ],
             temperature=0.2
         )
         
         translated_text = response.choices[0].message.content.strip()
+        translation_stats["translated"] += 1
         logger.info(f"Translation successful: '{translated_text}'")
+        await stage_cache.set("translation", text, TRANSLATION_MODEL, TRANSLATION_PROMPT, translated_text)
         return translated_text
         
     except Exception as e:
         logger.error(f"Error translating text: {e}")
-        return None 
\ No newline at end of file
+        return None
+
+def get_translation_stats() -> dict:
+    """
+    Get counters of translation requests and translations avoided by language detection.
+    
+    Returns:
+        Dictionary with translated, skipped_english, skipped_neutral and skipped_ratio
+    """
+    skipped = translation_stats["skipped_english"] + translation_stats["skipped_neutral"]
+    total = skipped + translation_stats["translated"]
+    return dict(translation_stats, skipped_ratio=skipped / total if total else 0.0)
@@ -0,0 +1,139 @@
+"""
+Recording of incoming Telegram updates for replay-based load testing.
+
+Each update is appended to a JSON Lines log as a compact record: arrival time,
+sender, chat, text or voice file reference. The log can be replayed with
+benchmarks/replay.py to reproduce real traffic shapes.
+"""
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from telegram import Update
+
+# Logging configuration
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+def compact_update(update: Update, received_at: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Build a compact record of a text or voice message update.
+    
+    Args:
+        update: Telegram update
+        received_at: Arrival time (Unix time, now by default)
+        
+    Returns:
+        Dictionary with the fields needed for replay, or None for other update types
+    """
+    message = update.message
+    if message is None or update.effective_user is None:
+        return None
+    
+    record = {
+        "t": round(received_at if received_at is not None else time.time(), 3),
+        "update_id": update.update_id,
+        "message_id": message.message_id,
+        "user_id": update.effective_user.id,
+        "chat_id": message.chat_id
+    }
+    if message.text is not None:
+        record["text"] = message.text
+    elif message.voice is not None:
+        # to_dict keeps duration in seconds in both the int and the timedelta modes of PTB
+        voice = message.voice.to_dict()
+        record["voice"] = {
+            "file_id": voice["file_id"],
+            "file_unique_id": voice["file_unique_id"],
+            "duration": voice["duration"],
+            "file_size": voice.get("file_size")
+        }
+    else:
+        return None
+    return record
+
+def update_payload(record: Dict[str, Any], date: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Convert a compact record back to a Bot API update payload.
+    
+    Args:
+        record: Record written by UpdateRecorder
+        date: Message date (Unix time, the recorded time by default)
+        
+    Returns:
+        Dictionary accepted by telegram.Update.de_json
+    """
+    message = {
+        "message_id": record["message_id"],
+        "date": int(date if date is not None else record["t"]),
+        "chat": {"id": record["chat_id"], "type": "private"},
+        "from": {"id": record["user_id"], "is_bot": False, "first_name": "Replay"}
+    }
+    if "text" in record:
+        message["text"] = record["text"]
+        if record["text"].startswith("/"):
+            command = record["text"].split()[0]
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(command)}]
+    else:
+        message["voice"] = dict(record["voice"], mime_type="audio/ogg")
+    return {"update_id": record["update_id"], "message": message}
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read records of a recorded log in arrival order.
+    
+    Args:
+        path: Path to the log
+        
+    Returns:
+        Iterator of records
+    """
+    with open(path, encoding="utf-8") as log_file:
+        for line in log_file:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+class UpdateRecorder:
+    """Appends compact records of incoming updates to a JSON Lines file."""
+    
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self.recorded = 0
+    
+    def record(self, update: Update):
+        """
+        Record an update (updates without a text or voice message are ignored).
+        
+        Args:
+            update: Telegram update
+        """
+        record = compact_update(update)
+        if record is None:
+            return
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.recorded += 1
+    
+    async def __call__(self, update: object, context: Any):
+        """Handler callback: records the update and lets other handlers process it."""
+        if isinstance(update, Update):
+            try:
+                self.record(update)
+            except Exception as e:
+                logger.error(f"Error recording update: {e}")
+    
+    def close(self):
+        with self._lock:
+            self._file.close()